@@ -2,6 +2,7 @@
 import os
 import sys
 import json
+import uuid
 import streamlit as st
 
 # -----------------------------
@@ -14,7 +15,7 @@ sys.path.append(PROJECT_ROOT)
 # Import functions
 # -----------------------------
 from src.extractions.fitness_extractor import extract_fitness_profile
-from src.nutritions_model.predict_meals import MealPredictor
+from src.service.model_registry import get_meal_predictor
 from src.generator.planner_pipeline import generate_weekly_markdown
 from src.generator.podcast_script import generate_motivational_script
 from src.audio.podcast_pipeline_murf import run_pipeline_murf
@@ -29,12 +30,26 @@ DATA_DIR = os.path.join(BASE_DIR, "..", "data")
 WEEKLY_MD = os.path.join(OUTPUTS_DIR, "weekly_plan.md")
 MOTIVATIONAL_MD = os.path.join(OUTPUTS_DIR, "motivational_script.md")
 PODCAST_MP3 = os.path.join(OUTPUTS_DIR, "podcast.mp3")
-USER_JSON = os.path.join(DATA_DIR, "fitness_profiles.json")
+# legacy JSON path: profiles already in it are imported into the store once
+PROFILE_STORE = os.path.join(DATA_DIR, "fitness_profiles.json")
 MEAL_JSON = os.path.join(DATA_DIR, "meal_plan.json")
 
+MEAL_MODEL_DIR = os.path.join(PROJECT_ROOT, "src", "nutritions_model")
+
 # Ensure outputs folder exists
 os.makedirs(OUTPUTS_DIR, exist_ok=True)
 
+# Load and warm up the meal models once per process; reruns reuse the instance
+try:
+    get_meal_predictor(MEAL_MODEL_DIR)
+except Exception as e:
+    # the registry retries on the next use, so the page still loads
+    st.error(f"Meal models unavailable: {e}")
+
+# One id per browser session, so its profiles can be looked up in the store
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+
 # -----------------------------
 # Streamlit UI
 # -----------------------------
@@ -52,15 +67,15 @@ if st.button("Generate Full Plan"):
     else:
         try:
             # --- Step 1: Extract Fitness Profile ---
-            extract_fitness_profile(user_paragraph, output_path=USER_JSON)
+            # Only this submission's profile is needed; it is appended to the store
+            user_data = extract_fitness_profile(
+                user_paragraph, output_path=PROFILE_STORE, session_id=st.session_state["session_id"]
+            )
             st.success("✅ Fitness profile generated!")
-            
-            with open(USER_JSON, "r", encoding="utf-8") as f:
-                user_data = json.load(f)
             # st.json(user_data)
 
                     # --- Step 2: Generate Meal Plan ---
-            predictor = MealPredictor(model_dir=os.path.join(PROJECT_ROOT, "src", "nutritions_model"))
+            predictor = get_meal_predictor(MEAL_MODEL_DIR)
 
             meal_plan = predictor.predict_from_json(user_data, output_file=MEAL_JSON)
             st.success("✅ Meal plan generated!")
@@ -75,7 +90,7 @@ if st.button("Generate Full Plan"):
             # st.json(meal_data)
 
             # --- Step 3: Generate Weekly Plan ---
-            generate_weekly_markdown(user_input=user_data[0])
+            generate_weekly_markdown(user_input=user_data)
             st.success("✅ Weekly plan generated!")
 
             if os.path.exists(WEEKLY_MD):
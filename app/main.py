@@ -19,6 +19,8 @@ os.makedirs(OUTPUTS_DIR, exist_ok=True)
 
 WORKOUT_PLAN_PATH = os.path.join(DATA_DIR, "workout_plan.json")
 
+from src.service.model_registry import get_meal_predictor
+
 
 # -----------------------------
 # Helper: dynamic import
@@ -30,11 +32,11 @@ def dynamic_import(module_path, func_name):
     return getattr(module, func_name)
 
 
-def generate_weekly_markdown_in_main(fitness_profile_path, meal_plan_path, workout_plan_path, output_md_path):
+def generate_weekly_markdown_in_main(fitness_profile, meal_plan_path, workout_plan_path, output_md_path):
     """Simple in-place markdown generator to avoid importing planner_pipeline.py which reads files on import.
 
     Args:
-        fitness_profile_path (str): path to fitness_profiles.json (list) or a single profile
+        fitness_profile (dict): the profile to plan for
         meal_plan_path (str): path to meal_plan.json
         workout_plan_path (str): path to workout_plan.json
         output_md_path (str): path to write the markdown file
@@ -45,16 +47,10 @@ def generate_weekly_markdown_in_main(fitness_profile_path, meal_plan_path, worko
         with open(p, 'r', encoding='utf-8') as f:
             return json.load(f)
 
-    fitness_profiles = safe_load(fitness_profile_path) or []
+    profile = fitness_profile or {}
     meal_plan = safe_load(meal_plan_path) or {}
     workout_plan = safe_load(workout_plan_path) or {}
 
-    # Choose first profile if list
-    if isinstance(fitness_profiles, list):
-        profile = fitness_profiles[0] if fitness_profiles else {}
-    else:
-        profile = fitness_profiles
-
     # Build markdown
     lines = []
     lines.append("# Your Weekly Health and Fitness Plan\n")
@@ -130,37 +126,26 @@ def generate_weekly_markdown_in_main(fitness_profile_path, meal_plan_path, worko
 # -----------------------------
 def run_full_pipeline(user_input_text: str):
     # 1️⃣ Run fitness_extractor
-    fitness_extractor_path = os.path.join(PROJECT_ROOT, "src/extractions/fitness_extractor.py")
-    extract_fitness_profile = dynamic_import(fitness_extractor_path, "extract_fitness_profile")
+    # imported once, so its compiled rules are reused across runs
+    from src.extractions.fitness_extractor import extract_fitness_profile
+    # maps to fitness_profile.sqlite3 and imports the existing JSON history once
     fitness_profile_path = os.path.join(DATA_DIR, "fitness_profile.json")
     print("Extracting fitness profile...")
-    extract_fitness_profile(user_input_text, output_path=fitness_profile_path)
+    # The profile is appended to the store and returned, so nothing is read back
+    fitness_profile = extract_fitness_profile(user_input_text, output_path=fitness_profile_path)
 
     # 2️⃣ Run MealPredictor from predict_meals.py
-    predict_meals_path = os.path.join(PROJECT_ROOT, "src/nutritions_model/predict_meals.py")
-    MealPredictor = dynamic_import(predict_meals_path, "MealPredictor")
-
     # Correct folder where your .pkl models live
     meal_models_dir = os.path.join(PROJECT_ROOT, "src", "nutritions_model")
 
     meal_plan_path = os.path.join(DATA_DIR, "meal_plan.json")
     print("Generating meal plan...")
 
-    # Pass the correct model_dir
-    meal_predictor = MealPredictor(model_dir=meal_models_dir)
-
-    # Use predict_from_json to generate the meal plan JSON
-    # Read the fitness profile JSON and pass a dict (not the filename string)
-    if not os.path.exists(fitness_profile_path):
-        raise FileNotFoundError(f"Expected fitness profile at {fitness_profile_path}")
-    with open(fitness_profile_path, 'r', encoding='utf-8') as f:
-        fitness_profiles = json.load(f)
+    # Shared across runs in this process: loaded and warmed up on first use only
+    meal_predictor = get_meal_predictor(meal_models_dir)
 
-    # If extractor appended profiles as a list, use the most recent entry
-    if isinstance(fitness_profiles, list) and len(fitness_profiles) > 0:
-        user_for_meals = fitness_profiles[-1]
-    else:
-        user_for_meals = fitness_profiles
+    # Use predict_from_json to generate the meal plan JSON from this run's profile
+    user_for_meals = fitness_profile
 
     # Normalize user_for_meals fields so MealPredictor receives acceptable dtypes
     def normalize_user_for_meals(u: dict) -> dict:
@@ -218,7 +203,7 @@ def run_full_pipeline(user_input_text: str):
     # 3️⃣ Generate weekly markdown plan (implemented here to avoid importing broken planner module)
     md_plan_path = os.path.join(OUTPUTS_DIR, "weekly_plan.md")
     print("Generating weekly markdown plan...")
-    generate_weekly_markdown_in_main(fitness_profile_path, meal_plan_path, WORKOUT_PLAN_PATH, md_plan_path)
+    generate_weekly_markdown_in_main(fitness_profile, meal_plan_path, WORKOUT_PLAN_PATH, md_plan_path)
 
     # 4️⃣ Generate motivational script
     podcast_script_path = os.path.join(PROJECT_ROOT, "src/generator/podcast_script.py")
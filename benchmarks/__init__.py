@@ -0,0 +1,5 @@
+"""Benchmarks for the Healthcast extraction and model pipelines.
+
+Run a suite as a module from the project root, e.g.
+``python -m benchmarks.bench_extraction``.
+"""
@@ -0,0 +1,161 @@
+"""Throughput and accuracy benchmark for FitnessProfileExtractor.
+
+Generates a seeded synthetic corpus (see ``benchmarks.paragraphs``), then
+reports end-to-end paragraphs per second, the time each field extractor takes
+on its own, and field-level accuracy against the ground truth. The report can
+be saved as a JSON baseline and later runs compared against it, failing when
+accuracy drops or throughput regresses beyond a tolerance.
+
+Usage:
+    python -m benchmarks.bench_extraction --save benchmarks/baselines/extraction.json
+    python -m benchmarks.bench_extraction --compare benchmarks/baselines/extraction.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.extractions.fitness_extractor import FitnessProfileExtractor
+from benchmarks.paragraphs import FIELDS, generate_paragraphs
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "extraction.json")
+
+
+def _best_time(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _matches(field: str, expected: Any, actual: Any) -> bool:
+    if expected is None or actual is None:
+        return expected is None and actual is None
+    if field in ("weight", "height"):
+        return abs(expected - actual) <= 0.051
+    return expected == actual
+
+
+def run(n: int = 5000, seed: int = 0, repeat: int = 3) -> Dict[str, Any]:
+    """Run the benchmark and return the report dict."""
+    corpus = generate_paragraphs(n, seed)
+    texts = [text for text, _ in corpus]
+    extractor = FitnessProfileExtractor()
+
+    field_extractors = {
+        "age": extractor.age_extractor,
+        "weight": extractor.weight_extractor,
+        "height": extractor.height_extractor,
+        "gender": extractor.gender_extractor,
+        "fitness_level": extractor.fitness_level_extractor,
+        "activity_level": extractor.activity_level_extractor,
+        "goals": extractor.goals_extractor,
+    }
+
+    # unusual values are expected in a benchmark corpus; keep warnings out of the timings
+    logging.disable(logging.WARNING)
+    try:
+        profiles = extractor.extract_batch(texts)
+        extract_seconds = _best_time(lambda: extractor.extract_batch(texts), repeat)
+        fields_seconds = _best_time(lambda: [extractor.extract_fields(t) for t in texts], repeat)
+        per_extractor = {
+            name: round(_best_time(lambda e=e: [e.extract(t) for t in texts], repeat) / n * 1e6, 3)
+            for name, e in field_extractors.items()
+        }
+    finally:
+        logging.disable(logging.NOTSET)
+
+    correct = {name: 0 for name in FIELDS}
+    stated = {name: 0 for name in FIELDS}
+    exact = 0
+    for (_, truth), profile in zip(corpus, profiles):
+        all_ok = True
+        for name in FIELDS:
+            ok = _matches(name, truth[name], getattr(profile, name))
+            correct[name] += ok
+            stated[name] += truth[name] is not None
+            all_ok &= ok
+        exact += all_ok
+
+    return {
+        "config": {"paragraphs": n, "seed": seed, "repeat": repeat},
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "throughput": {
+            "extract_paragraphs_per_second": round(n / extract_seconds, 1),
+            "extract_fields_paragraphs_per_second": round(n / fields_seconds, 1),
+        },
+        "extractor_us_per_paragraph": per_extractor,
+        "accuracy": {name: round(correct[name] / n, 4) for name in FIELDS},
+        "stated_fraction": {name: round(stated[name] / n, 4) for name in FIELDS},
+        "exact_profile_accuracy": round(exact / n, 4),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], throughput_tolerance: float = 0.2) -> List[str]:
+    """Return the regressions of ``report`` against ``baseline`` (empty if none).
+
+    Accuracy may not drop at all on the same corpus; throughput may fall by at
+    most ``throughput_tolerance`` (timings are noisy and machine dependent).
+    """
+    problems = []
+    if report["config"]["paragraphs"] != baseline["config"]["paragraphs"] or \
+            report["config"]["seed"] != baseline["config"]["seed"]:
+        problems.append("corpus differs from the baseline (paragraphs/seed); accuracy is not comparable")
+    for name, value in baseline["accuracy"].items():
+        current = report["accuracy"].get(name)
+        if current is None or current < value:
+            problems.append(f"accuracy[{name}] {value} -> {current}")
+    if report["exact_profile_accuracy"] < baseline["exact_profile_accuracy"]:
+        problems.append(f"exact_profile_accuracy {baseline['exact_profile_accuracy']} -> "
+                        f"{report['exact_profile_accuracy']}")
+    for name, value in baseline["throughput"].items():
+        current = report["throughput"].get(name, 0)
+        if current < value * (1 - throughput_tolerance):
+            problems.append(f"throughput[{name}] {value} -> {current}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fitness-profile extraction throughput and accuracy")
+    parser.add_argument("-n", "--paragraphs", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="Write the report as a baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="Compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative throughput drop")
+    args = parser.parse_args(argv)
+
+    report = run(args.paragraphs, args.seed, args.repeat)
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"✓ Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline, args.tolerance)
+        if problems:
+            for problem in problems:
+                print(f"❌ {problem}")
+            return 1
+        print(f"✓ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""Serving-cost benchmark for the workout and meal models.
+
+Every artifact (a workout ``.joblib`` file or bundle, a meal pickle directory
+or bundle) is loaded in a fresh process, which reports:
+
+* load time and the resident memory the loaded model adds,
+* single-row latency (p50/p99/mean) of ``predict_workout_plan`` / ``predict_meals``,
+* batch throughput at several batch sizes (``predict_workout_plan_batch`` /
+  ``predict_meals_batch``),
+* workout accuracy on seeded synthetic users, and for both kinds the share of
+  predictions that agree with the first artifact of the same kind.
+
+The meal models have no labelled evaluation set in the repository, so meal
+artifacts are only compared by agreement. The report is JSON; saving it as a
+baseline and comparing later runs flags accuracy drops and serving-cost
+regressions per artifact.
+
+Usage:
+    python -m benchmarks.bench_models --save benchmarks/baselines/models.json
+    python -m benchmarks.bench_models --workout src/planner/workout_model.joblib models/workout_small
+    python -m benchmarks.bench_models --compare benchmarks/baselines/models.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import warnings
+import argparse
+import platform
+import contextlib
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.service.model_registry import rss_bytes
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "models.json")
+DEFAULT_WORKOUT = os.path.join(PROJECT_ROOT, "src", "planner", "workout_model.joblib")
+DEFAULT_MEALS = os.path.join(PROJECT_ROOT, "src", "nutritions_model")
+BATCH_SIZES = (1, 8, 64, 512)
+
+# categories the meal encoders were fitted on, in the models' column order
+MEAL_CATEGORIES = {
+    "fitness_level": ["beginner", "intermediate", "advanced", "elite"],
+    "goals": ["weight_loss", "muscle_gain", "endurance", "strength", "flexibility", "cardio"],
+    "gender": ["female", "male", "other"],
+    "activity_level": ["sedentary", "lightly_active", "moderately_active", "very_active", "extremely_active"],
+}
+
+
+def _artifact_bytes(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def meal_profiles(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Seeded synthetic meal-model users."""
+    rng = np.random.default_rng(seed)
+    height = rng.uniform(150, 200, n).round()
+    weight = rng.uniform(45, 130, n).round()
+    profiles = {
+        "age": rng.integers(18, 71, n),
+        "weight": weight,
+        "height": height,
+        "bmi": (weight / (height / 100) ** 2).round(1),
+        **{col: rng.choice(values, n) for col, values in MEAL_CATEGORIES.items()},
+    }
+    return [{col: values[i].item() for col, values in profiles.items()} for i in range(n)]
+
+
+def _latency(fn: Callable[[Any], Any], items: Sequence[Any]) -> Dict[str, float]:
+    for item in items[:10]:
+        fn(item)
+    samples = np.empty(len(items))
+    for i, item in enumerate(items):
+        start = time.perf_counter()
+        fn(item)
+        samples[i] = time.perf_counter() - start
+    samples *= 1e3
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+    }
+
+
+def _throughput(fn: Callable[[List[Any]], Any], items: Sequence[Any], batch_size: int,
+                min_seconds: float = 0.2) -> float:
+    """Best rows/second over repeated calls of ``fn`` on one batch."""
+    batch = [items[i % len(items)] for i in range(batch_size)]
+    fn(batch)
+    best, spent = float("inf"), 0.0
+    while spent < min_seconds:
+        start = time.perf_counter()
+        fn(batch)
+        elapsed = time.perf_counter() - start
+        best, spent = min(best, elapsed), spent + elapsed
+    return round(batch_size / best, 1)
+
+
+def bench_artifact(kind: str, path: str, n: int = 1000, seed: int = 0,
+                   batch_sizes: Sequence[int] = BATCH_SIZES) -> Dict[str, Any]:
+    """Load one artifact in this process and measure it (see the module docstring)."""
+    # the models print progress and errors; keep them out of the report
+    with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+        warnings.simplefilter("ignore")
+        if kind == "workout":
+            from src.planner.workout_recommender import WorkoutRecommendationModel
+
+            data = WorkoutRecommendationModel().create_synthetic_data(n_samples=n, seed=seed)
+            users = data.drop(columns=["goal"]).to_dict("records")
+            rss = rss_bytes()
+            start = time.perf_counter()
+            model = WorkoutRecommendationModel()
+            model.load_model(path)
+            load_seconds = time.perf_counter() - start
+            predict_one, predict_batch = model.predict_workout_plan, model.predict_workout_plan_batch
+
+            def outputs(users):
+                return [plan["goal"] for plan in predict_batch(users)]
+        elif kind == "meals":
+            from src.nutritions_model.predict_meals import MealPredictor
+            # import the library up front so model_rss_mb is the models alone
+            import xgboost  # noqa: F401
+
+            users = meal_profiles(n, seed)
+            rss = rss_bytes()
+            start = time.perf_counter()
+            predictor = MealPredictor(model_dir=path)
+            load_seconds = time.perf_counter() - start
+            predict_one = predictor.predict_meals
+
+            def predict_batch(users):
+                return predictor.predict_meals_batch(users)
+
+            def outputs(users):
+                plans = predict_batch(users)
+                return (plans["breakfast_recommended"] + "/" + plans["lunch_recommended"] + "/"
+                        + plans["dinner_recommended"]).tolist()
+        else:
+            raise ValueError(f"Unknown model kind {kind!r}, expected 'workout' or 'meals'")
+        model_rss = rss_bytes() - rss
+
+        predictions = [str(p) for p in outputs(users)]
+        report = {
+            "kind": kind,
+            "path": os.path.relpath(os.path.abspath(path), PROJECT_ROOT),
+            "artifact_bytes": _artifact_bytes(path),
+            "load_seconds": round(load_seconds, 4),
+            "model_rss_mb": round(model_rss / 2**20, 2),
+            "process_rss_mb": round(rss_bytes() / 2**20, 2),
+            "single_row": _latency(predict_one, users),
+            "rows_per_second": {str(size): _throughput(predict_batch, users, size) for size in batch_sizes},
+            "predictions": predictions,
+        }
+        if kind == "workout":
+            report["accuracy"] = round(float(np.mean(np.array(predictions) == data["goal"].to_numpy())), 4)
+    return report
+
+
+def run(workout: Sequence[str] = (DEFAULT_WORKOUT,), meals: Sequence[str] = (DEFAULT_MEALS,),
+        n: int = 1000, seed: int = 0, batch_sizes: Sequence[int] = BATCH_SIZES,
+        isolate: bool = True) -> Dict[str, Any]:
+    """Benchmark every artifact, each in a fresh process when ``isolate``, and return the report dict."""
+    jobs = [("workout", path) for path in workout] + [("meals", path) for path in meals]
+    results = []
+    if isolate:
+        # a spawned interpreter per artifact, so load time and memory are not
+        # flattered by modules or pages an earlier artifact already loaded
+        context = multiprocessing.get_context("spawn")
+        for kind, path in jobs:
+            with context.Pool(1) as pool:
+                results.append(pool.apply(bench_artifact, (kind, path, n, seed, tuple(batch_sizes))))
+    else:
+        results = [bench_artifact(kind, path, n, seed, batch_sizes) for kind, path in jobs]
+
+    reference = {}
+    artifacts = {}
+    for result in results:
+        predictions = np.array(result.pop("predictions"))
+        reference.setdefault(result["kind"], predictions)
+        result["agreement"] = round(float(np.mean(predictions == reference[result["kind"]])), 4)
+        artifacts[f"{result['kind']}:{result['path']}"] = result
+
+    import sklearn
+    versions = {"python": platform.python_version(), "machine": platform.machine(),
+                "numpy": np.__version__, "sklearn": sklearn.__version__}
+    try:
+        import xgboost
+        versions["xgboost"] = xgboost.__version__
+    except Exception:
+        pass
+    return {
+        "config": {"users": n, "seed": seed, "batch_sizes": list(batch_sizes), "isolated": isolate},
+        "environment": versions,
+        "artifacts": artifacts,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Return the regressions of ``report`` against ``baseline`` (empty if none).
+
+    Artifacts are matched by name. Accuracy may not drop on the same users;
+    p99 latency, throughput, load time and model memory may worsen by at most
+    ``tolerance`` (relative).
+    """
+    problems = []
+    if report["config"]["users"] != baseline["config"]["users"] or \
+            report["config"]["seed"] != baseline["config"]["seed"]:
+        problems.append("users differ from the baseline (users/seed); accuracy is not comparable")
+    for name, old in baseline["artifacts"].items():
+        new = report["artifacts"].get(name)
+        if new is None:
+            continue
+        if "accuracy" in old and new.get("accuracy", 0) < old["accuracy"]:
+            problems.append(f"{name}: accuracy {old['accuracy']} -> {new.get('accuracy')}")
+        for key in ("load_seconds", "model_rss_mb"):
+            if new[key] > old[key] * (1 + tolerance) and new[key] - old[key] > 1e-3:
+                problems.append(f"{name}: {key} {old[key]} -> {new[key]}")
+        if new["single_row"]["p99_ms"] > old["single_row"]["p99_ms"] * (1 + tolerance):
+            problems.append(f"{name}: single_row.p99_ms {old['single_row']['p99_ms']} -> {new['single_row']['p99_ms']}")
+        for size, value in old["rows_per_second"].items():
+            current = new["rows_per_second"].get(size, 0)
+            if current < value * (1 - tolerance):
+                problems.append(f"{name}: rows_per_second[{size}] {value} -> {current}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark load time, memory, latency and accuracy of the models")
+    parser.add_argument("--workout", nargs="*", default=[DEFAULT_WORKOUT], help="Workout .joblib files or bundles")
+    parser.add_argument("--meals", nargs="*", default=[DEFAULT_MEALS], help="Meal pickle directories or bundles")
+    parser.add_argument("-n", "--users", type=int, default=1000, help="Synthetic users to score")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--no-isolate", action="store_true", help="Measure every artifact in this process")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="Write the report as a baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="Compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative serving-cost regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.workout, args.meals, args.users, args.seed, args.batch_sizes, isolate=not args.no_isolate)
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"✓ Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline, args.tolerance)
+        if problems:
+            for problem in problems:
+                print(f"❌ {problem}")
+            return 1
+        print(f"✓ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Seeded generator of synthetic intake paragraphs with known ground truth.
+
+Every paragraph is assembled from sentences that state the user's age,
+weight, height, gender, fitness level, activity level and goals in one of the
+forms users actually write ("180 lbs", "5'10\"", "1.75 m", "build muscle", ...).
+The ground truth is the value the user meant, computed independently of the
+extractor, so forms the rules miss show up as accuracy loss.
+
+Usage:
+    python -m benchmarks.paragraphs 10000 paragraphs.jsonl --seed 7
+"""
+import sys
+import json
+import random
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+FIELDS = ["age", "weight", "height", "gender", "fitness_level", "activity_level", "goals"]
+
+# canonical value -> phrasings
+GENDERS = {
+    "male": ["male", "man", "guy", "boy"],
+    "female": ["female", "woman", "girl"],
+}
+FITNESS_LEVELS = {
+    "beginner": ["a beginner", "a complete beginner"],
+    "intermediate": ["intermediate", "at an intermediate level"],
+    "advanced": ["advanced", "an advanced lifter"],
+}
+ACTIVITY_LEVELS = {
+    "sedentary": ["sedentary", "mostly sedentary"],
+    "lightly active": ["lightly active"],
+    "moderately active": ["moderately active"],
+    "very active": ["very active"],
+    "extra active": ["extra active"],
+}
+GOALS = {
+    "weight loss": ["lose weight", "weight loss", "fat loss", "slim down"],
+    "muscle building": ["build muscle", "muscle building", "gain muscle", "muscle gain", "bulking"],
+    "endurance": ["endurance", "cardio", "stamina", "cardiovascular health"],
+    "flexibility": ["flexibility", "stretching", "mobility"],
+    "general fitness": ["general fitness", "overall fitness", "get fit"],
+    "strength": ["strength", "get strong", "get stronger", "power"],
+}
+
+AGE_FORMS = ["I am {a} years old.", "I'm {a} yrs old.", "Aged {a}.", "Age: {a}.", "{a} yo here.", "I turned {a} years this spring."]
+KG_FORMS = ["I weigh {w} kg.", "My weight is about {w}kg.", "Currently {w} kilograms.", "weight {w} kg"]
+LBS_FORMS = ["I weigh {w} lbs.", "Around {w} pounds right now.", "weight {w} lb"]
+FILLER = [
+    "I work in an office.", "I have two kids.", "Mornings suit me best.",
+    "I sleep about seven hours.", "I cook at home most days.", "My commute is long.",
+    "I enjoy hiking on the weekends.", "I want a plan I can stick to.",
+]
+SEPARATORS = [" ", " ", " ", "\n"]
+
+
+def _height_sentence(rng: random.Random) -> Tuple[str, float]:
+    form = rng.choice(["feet_quote", "feet_words", "metres", "cm", "height_cm", "m_cm"])
+    if form in ("feet_quote", "feet_words"):
+        feet, inches = rng.randint(4, 6), rng.randint(0, 11)
+        truth = round(feet * 30.48 + inches * 2.54, 2)
+        if form == "feet_quote":
+            return f"I'm {feet}'{inches}\" tall.", truth
+        unit = rng.choice(["ft", "feet"])
+        inch_unit = rng.choice(["in", "inches"])
+        return f"I am {feet} {unit} {inches} {inch_unit}.", truth
+    cm = rng.randint(150, 200)
+    if form == "metres":
+        unit = rng.choice(["m", "meters"])
+        return f"I'm {cm // 100}.{cm % 100:02d} {unit} tall.", float(cm)
+    if form == "cm":
+        return f"I am {cm} cm tall.", float(cm)
+    if form == "height_cm":
+        return f"Height: {cm} cm.", float(cm)
+    return f"I measure {cm // 100} m {cm % 100} cm.", float(cm)
+
+
+def _weight_sentence(rng: random.Random) -> Tuple[str, float]:
+    if rng.random() < 0.5:
+        kg = rng.randint(45, 130) if rng.random() < 0.7 else round(rng.uniform(45, 130), 1)
+        return rng.choice(KG_FORMS).format(w=kg), round(float(kg), 1)
+    lbs = rng.randint(100, 290)
+    return rng.choice(LBS_FORMS).format(w=lbs), round(lbs * 0.453592, 1)
+
+
+def generate_paragraph(rng: random.Random, p_missing: float = 0.15) -> Tuple[str, Dict[str, Any]]:
+    """Return ``(paragraph, truth)``; truth holds ``None`` for unstated fields."""
+    truth: Dict[str, Optional[Any]] = {name: None for name in FIELDS}
+    sentences: List[str] = []
+
+    def stated() -> bool:
+        return rng.random() >= p_missing
+
+    if stated():
+        truth["age"] = rng.randint(16, 80)
+        sentences.append(rng.choice(AGE_FORMS).format(a=truth["age"]))
+    if stated():
+        sentence, truth["weight"] = _weight_sentence(rng)
+        sentences.append(sentence)
+    if stated():
+        sentence, truth["height"] = _height_sentence(rng)
+        sentences.append(sentence)
+    if stated():
+        truth["gender"] = rng.choice(list(GENDERS))
+        sentences.append(f"I'm a {rng.choice(GENDERS[truth['gender']])}.")
+    if stated():
+        truth["fitness_level"] = rng.choice(list(FITNESS_LEVELS))
+        sentences.append(f"Training-wise I'm {rng.choice(FITNESS_LEVELS[truth['fitness_level']])}.")
+    if stated():
+        truth["activity_level"] = rng.choice(list(ACTIVITY_LEVELS))
+        sentences.append(f"Day to day I'm {rng.choice(ACTIVITY_LEVELS[truth['activity_level']])}.")
+    if stated():
+        goals = rng.sample(list(GOALS), rng.randint(1, 3))
+        phrases = [rng.choice(GOALS[goal]) for goal in goals]
+        sentences.append("My goals: " + ", ".join(phrases) + ".")
+        truth["goals"] = ",".join(sorted(goals))
+
+    sentences.extend(rng.sample(FILLER, rng.randint(0, 3)))
+    rng.shuffle(sentences)
+    paragraph = ""
+    for sentence in sentences:
+        paragraph += sentence + rng.choice(SEPARATORS)
+    return paragraph.strip(), truth
+
+
+def generate_paragraphs(n: int, seed: int = 0, p_missing: float = 0.15) -> List[Tuple[str, Dict[str, Any]]]:
+    """``n`` paragraphs with ground truth; the same seed gives the same corpus."""
+    rng = random.Random(seed)
+    return [generate_paragraph(rng, p_missing) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic intake paragraphs with ground truth as JSONL")
+    parser.add_argument("count", type=int, help="Number of paragraphs")
+    parser.add_argument("output", help="Output JSONL path ('-' for stdout)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--p-missing", type=float, default=0.15, help="Probability a field is left unstated")
+    args = parser.parse_args()
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for i, (text, truth) in enumerate(generate_paragraphs(args.count, args.seed, args.p_missing)):
+            out.write(json.dumps({"id": i, "text": text, "truth": truth}, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if out is not sys.stdout:
+        print(f"✓ Wrote {args.count} paragraphs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
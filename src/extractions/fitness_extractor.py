@@ -2,21 +2,23 @@ import re
 import json
 import logging
 from dataclasses import dataclass, asdict, field
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple
 from enum import Enum
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 import os
+import copy
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-import re
-import json
-import logging
-from dataclasses import dataclass, asdict, field
-from typing import Optional, List, Dict, Any, Union
-from enum import Enum
-from abc import ABC, abstractmethod
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.extractions.profile_store import open_profile_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,7 +46,7 @@ class BMICategory(Enum):
     OVERWEIGHT = "overweight"
     OBESE = "obese"
 
-@dataclass
+@dataclass(slots=True)
 class FitnessProfile:
     """Enhanced fitness profile with validation and computed properties."""
     age: Optional[int] = None
@@ -98,6 +100,135 @@ class FitnessProfile:
             result["goals"] = result["goals"].split(",")
         return {k: v for k, v in result.items() if v is not None and v != [] and v != ""}
 
+def _import_pandas():
+    try:
+        import pandas as pd
+    except Exception:
+        raise RuntimeError("pandas is required for columnar extraction. Install it in your environment.")
+    return pd
+
+def _import_numpy():
+    try:
+        import numpy as np
+    except Exception:
+        raise RuntimeError("numpy is required for ProfileBatch. Install it in your environment.")
+    return np
+
+def _to_float(column):
+    """Parse an extracted string column into plain float64 (NaN where missing)."""
+    pd = _import_pandas()
+    return pd.to_numeric(column.astype(object), errors='coerce').astype('float64')
+
+# ------------------ Keyword Automaton ------------------
+
+def _is_word_char(ch: str) -> bool:
+    # same notion of a word character as the re module's \w / \b
+    return ch.isalnum() or ch == '_'
+
+def _fold_case(text: str) -> str:
+    """Case-fold character by character, keeping positions aligned with ``text``.
+
+    Characters whose folding expands ('ß' -> 'ss') are kept as they are, as
+    ``re.IGNORECASE`` only relates single characters.
+    """
+    if text.isascii():
+        return text.lower()
+    folded = []
+    for ch in text:
+        fold = ch.casefold()
+        folded.append(fold if len(fold) == 1 else ch)
+    return ''.join(folded)
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton mapping synonym terms to canonical values.
+
+    Terms and text are case-folded, every occurrence of every term is found
+    in one pass over the text, and occurrences are kept only when they sit on
+    word boundaries, mirroring a ``\\b(term1|term2|...)\\b`` regex with
+    ``re.IGNORECASE``. Each hit carries the term's insertion order so callers
+    can reproduce the regex's alternation preference.
+    """
+    
+    def __init__(self, terms: Optional[List[tuple]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[tuple] = [()]
+        self._size = 0
+        self._built = False
+        for term, value in terms or []:
+            self.add(term, value)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, term: str, value: Any):
+        term = _fold_case(term)
+        if not term:
+            raise ValueError("Empty keyword")
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] += ((len(term), self._size, value),)
+        self._size += 1
+        self._built = False
+    
+    def build(self):
+        """Compute failure links (breadth first) and merge suffix outputs."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+                queue.append(nxt)
+        # transitions resolved through failure links are memoized here
+        self._delta = [dict(goto) for goto in self._goto]
+        self._built = True
+    
+    def _resolve(self, state: int, ch: str) -> int:
+        fallback = state
+        while fallback and ch not in self._goto[fallback]:
+            fallback = self._fail[fallback]
+        nxt = self._goto[fallback].get(ch, 0)
+        self._delta[state][ch] = nxt
+        return nxt
+    
+    def find(self, text: str) -> List[tuple]:
+        """Return ``(start, order, end, value)`` for every word-bounded hit.
+
+        The list is sorted by start and then by insertion order of the term.
+        """
+        if not self._built:
+            self.build()
+        delta, out = self._delta, self._out
+        state = 0
+        hits = []
+        for i, ch in enumerate(_fold_case(text)):
+            nxt = delta[state].get(ch)
+            state = nxt if nxt is not None else self._resolve(state, ch)
+            if out[state]:
+                end = i + 1
+                after = end < len(text) and _is_word_char(text[end])
+                for length, order, value in out[state]:
+                    start = end - length
+                    before = start > 0 and _is_word_char(text[start - 1])
+                    if before != _is_word_char(text[start]) and after != _is_word_char(text[i]):
+                        hits.append((start, order, end, value))
+        hits.sort()
+        return hits
+
 # ------------------ Extractors ------------------
 
 class BaseExtractor(ABC):
@@ -106,66 +237,120 @@ class BaseExtractor(ABC):
         pass
 
 class PatternExtractor(BaseExtractor):
+    column_dtype = 'object'
+    
     def __init__(self, patterns: Union[str, List[str]], flags: int = re.IGNORECASE):
         self.patterns = patterns if isinstance(patterns, list) else [patterns]
         self.flags = flags
+        self.compiled = [re.compile(p, flags) for p in self.patterns]
     
     def extract(self, text: str) -> Optional[re.Match]:
-        for pattern in self.patterns:
-            match = re.search(pattern, text, self.flags)
+        for pattern in self.compiled:
+            match = pattern.search(text)
             if match:
                 return match
         return None
+    
+    def convert(self, match: Optional[re.Match]) -> Any:
+        """Turn the winning match into the extracted value."""
+        return match
+    
+    def extract_column(self, texts):
+        """Vectorized ``extract`` over a pandas string Series.
+
+        Patterns are tried in priority order, each only on the rows no earlier
+        pattern matched, and the winning groups go through ``convert_column``.
+        """
+        pd = _import_pandas()
+        values = pd.Series(index=texts.index, dtype=self.column_dtype)
+        pending = texts
+        for pattern in self.patterns:
+            if pending.empty:
+                break
+            # outer group: column 0 is the whole match, then the pattern's own groups
+            groups = pending.str.extract('(' + pattern + ')', flags=self.flags)
+            matched = groups[0].notna().to_numpy(dtype=bool)
+            if matched.any():
+                values.loc[groups.index[matched]] = self.convert_column(groups[matched])
+                pending = pending[~matched]
+        return values
+    
+    def convert_column(self, groups):
+        """Column counterpart of ``convert`` for the rows one pattern matched."""
+        return groups[0]
 
 class AgeExtractor(PatternExtractor):
+    column_dtype = 'Int64'
+    
     def __init__(self):
         patterns = [
-            r'(\d+)\s*(?:years?\s*old|yrs?\s*old|yo)',
-            r'(?:age|aged?)[:\s]*(\d+)',
-            r'\b(\d+)\s*(?:years?|yrs?)\b'
+            r'(?<!\d)(\d++)\s*+(?:years?\s*+old|yrs?\s*+old|yo)',
+            r'(?:age|aged?)[:\s]*+(\d++)',
+            r'\b(\d++)\s*+(?:years?|yrs?)\b'
         ]
         super().__init__(patterns)
     
     def extract(self, text: str) -> Optional[int]:
-        match = super().extract(text)
+        return self.convert(super().extract(text))
+    
+    def convert(self, match: Optional[re.Match]) -> Optional[int]:
         if match:
             age = int(match.group(1))
             return age if 1 <= age <= 120 else None
         return None
+    
+    def convert_column(self, groups):
+        age = _to_float(groups[1])
+        return age.where((age >= 1) & (age <= 120)).astype('Int64')
 
 class WeightExtractor(PatternExtractor):
+    column_dtype = 'float64'
+    POUNDS = re.compile(r'lbs?|pounds?', re.IGNORECASE)
+    
     def __init__(self):
         patterns = [
-            r'(?:weight|weigh)\s*(\d+(?:\.\d+)?)\s*(?:kg|kilograms?)',
-            r'(?:weight|weigh)\s*(\d+(?:\.\d+)?)\s*(?:lbs?|pounds?)',
-            r'\b(\d+(?:\.\d+)?)\s*(?:kg|kilograms?)\b',
-            r'\b(\d+(?:\.\d+)?)\s*(?:lbs?|pounds?)\b'
+            r'(?:weight|weigh)\s*+(\d++(?:\.\d++)?+)\s*+(?:kg|kilograms?)',
+            r'(?:weight|weigh)\s*+(\d++(?:\.\d++)?+)\s*+(?:lbs?|pounds?)',
+            r'\b(\d++(?:\.\d++)?+)\s*+(?:kg|kilograms?)\b',
+            r'\b(\d++(?:\.\d++)?+)\s*+(?:lbs?|pounds?)\b'
         ]
         super().__init__(patterns)
     
     def extract(self, text: str) -> Optional[float]:
-        match = super().extract(text)
+        return self.convert(super().extract(text))
+    
+    def convert(self, match: Optional[re.Match]) -> Optional[float]:
         if match:
             weight = float(match.group(1))
-            if re.search(r'lbs?|pounds?', match.group(0), re.IGNORECASE):
+            if self.POUNDS.search(match.group(0)):
                 weight *= 0.453592
             return round(weight, 1) if 20 <= weight <= 500 else None
         return None
+    
+    def convert_column(self, groups):
+        weight = _to_float(groups[1])
+        pounds = groups[0].str.contains(self.POUNDS.pattern, flags=self.POUNDS.flags, regex=True).astype(bool)
+        weight = weight.where(~pounds, weight * 0.453592)
+        return weight.where((weight >= 20) & (weight <= 500)).round(1)
 
 class HeightExtractor(PatternExtractor):
+    column_dtype = 'float64'
+    
     def __init__(self):
         patterns = [
-            r"(\d+)'(\d+)\"",
-            r'(\d+)\s*(?:feet|ft)\s*(\d+)\s*(?:inches?|in)',
-            r'(\d+\.\d+)\s*(?:m|meters?)\b',
-            r'\b(\d+)\s*(?:cm|centimeters?)\b',
-            r'(?:height|tall)[:\s]*(\d+)\s*(?:cm|centimeters?)',
-            r'(\d+)\s*(?:m|meters?)\s*(\d+)\s*(?:cm|centimeters?)'
+            r"(?<!\d)(\d++)'(\d++)\"",
+            r'(?<!\d)(\d++)\s*+(?:feet|ft)\s*+(\d++)\s*+(?:inches?|in)',
+            r'(?<!\d)(\d++\.\d++)\s*+(?:m|meters?)\b',
+            r'\b(\d++)\s*+(?:cm|centimeters?)\b',
+            r'(?:height|tall)[:\s]*+(\d++)\s*+(?:cm|centimeters?)',
+            r'(?<!\d)(\d++)\s*+(?:m|meters?)\s*+(\d++)\s*+(?:cm|centimeters?)'
         ]
         super().__init__(patterns)
     
     def extract(self, text: str) -> Optional[float]:
-        match = super().extract(text)
+        return self.convert(super().extract(text))
+    
+    def convert(self, match: Optional[re.Match]) -> Optional[float]:
         if match:
             groups = match.groups()
             if len(groups) == 1:
@@ -179,25 +364,46 @@ class HeightExtractor(PatternExtractor):
                 else:
                     return round((float(groups[0])*30.48) + (float(groups[1])*2.54), 2)
         return None
+    
+    def convert_column(self, groups):
+        whole = groups[0]
+        first = _to_float(groups[1])
+        has_m = whole.str.contains('m', regex=False).astype(bool)
+        if groups.shape[1] == 2:
+            metres = has_m & groups[1].str.contains('.', regex=False).astype(bool)
+            return first.where(~metres, (first * 100).round(1))
+        second = _to_float(groups[2])
+        metric = has_m & whole.str.contains('cm', regex=False).astype(bool)
+        return (first * 30.48 + second * 2.54).round(2).where(~metric, (first * 100 + second).round(1))
 
 class EnumExtractor(PatternExtractor):
     def __init__(self, enum_class, additional_mappings=None):
         self.enum_class = enum_class
         self.mappings = additional_mappings or {}
-        values = [e.value for e in enum_class] + list(self.mappings.keys())
-        pattern = r'\b(' + '|'.join(re.escape(v) for v in values) + r')\b'
+        self.terms = [e.value for e in enum_class] + list(self.mappings.keys())
+        # Enum values win over additional mappings with the same spelling
+        self.lookup = dict(self.mappings)
+        self.lookup.update({e.value: e.value for e in enum_class})
+        self.keywords = [(term, self.lookup[term]) for term in self.terms]
+        self.automaton = KeywordAutomaton(self.keywords)
+        pattern = r'\b(' + '|'.join(re.escape(v) for v in self.terms) + r')\b'
         super().__init__(pattern)
     
     def extract(self, text: str) -> Optional[str]:
-        match = super().extract(text)
-        if match:
-            found_value = match.group(1).lower()
-            for enum_val in self.enum_class:
-                if enum_val.value == found_value:
-                    return enum_val.value
-            if found_value in self.mappings:
-                return self.mappings[found_value]
-        return None
+        return self.select(self.automaton.find(text))
+    
+    def select(self, hits: List[tuple]) -> Optional[str]:
+        """Canonical value of the leftmost hit, as ``re.search`` would pick it."""
+        return hits[0][3] if hits else None
+    
+    def category_dtype(self):
+        pd = _import_pandas()
+        return pd.CategoricalDtype([e.value for e in self.enum_class])
+    
+    def extract_column(self, texts):
+        """Vectorized ``extract``: the leftmost term per row as a categorical."""
+        found = texts.str.extract(self.patterns[0], flags=self.flags)[0]
+        return found.str.lower().map(self.lookup).astype(self.category_dtype())
 
 class GoalsExtractor(PatternExtractor):
     def __init__(self):
@@ -209,25 +415,220 @@ class GoalsExtractor(PatternExtractor):
             'general fitness': ['general fitness', 'overall fitness', 'get fit', 'fitness'],
             'strength': ['strength', 'get strong', 'get stronger', 'power']
         }
-        all_terms = []
-        for terms in self.goal_mappings.values():
-            all_terms.extend(terms)
-        pattern = r'\b(' + '|'.join(re.escape(t) for t in all_terms) + r')\b'
+        self.terms = []
+        term_goals = {}
+        # one bit per goal for the columnar goals mask
+        self.goal_bits = {goal: 1 << i for i, goal in enumerate(self.goal_mappings)}
+        self.term_bits = {}
+        for goal, terms in self.goal_mappings.items():
+            self.terms.extend(terms)
+            for term in terms:
+                term_goals.setdefault(term, []).append(goal)
+                self.term_bits[term] = self.term_bits.get(term, 0) | self.goal_bits[goal]
+        self.keywords = [(term, tuple(term_goals[term])) for term in self.terms]
+        self.automaton = KeywordAutomaton(self.keywords)
+        pattern = r'\b(' + '|'.join(re.escape(t) for t in self.terms) + r')\b'
         super().__init__(pattern)
     
     def extract(self, text: str) -> Optional[str]:
-        matches = re.findall(self.patterns[0], text, self.flags)
+        return self.select(self.automaton.find(text))
+    
+    def select(self, hits: List[tuple]) -> Optional[str]:
+        """Goals of the non-overlapping hits ``re.findall`` would return."""
         found_goals = set()
-        for match in matches:
-            for goal, terms in self.goal_mappings.items():
-                if match.lower() in terms:
-                    found_goals.add(goal)
+        end = 0
+        for start, _, hit_end, goals in hits:
+            if start >= end:
+                found_goals.update(goals)
+                end = hit_end
         return ','.join(sorted(found_goals)) if found_goals else None
+    
+    @property
+    def mask_dtype(self) -> str:
+        for bits in (8, 16, 32):
+            if len(self.goal_bits) <= bits:
+                return f'uint{bits}'
+        return 'uint64'
+    
+    def goals_from_mask(self, mask: int) -> Optional[str]:
+        """Decode a goals bitmask back into the comma-separated ``goals`` string."""
+        found_goals = [goal for goal, bit in self.goal_bits.items() if mask & bit]
+        return ','.join(sorted(found_goals)) if found_goals else None
+    
+    def extract_column(self, texts):
+        """Vectorized ``extract``: a bitmask of the goals found in each row."""
+        pd = _import_pandas()
+        matches = texts.str.extractall(self.patterns[0], flags=self.flags)[0]
+        term_bits = matches.str.lower().map(self.term_bits).fillna(0).astype('int64')
+        mask = pd.Series(0, index=texts.index, dtype='int64')
+        for bit in self.goal_bits.values():
+            rows = (term_bits & bit).ne(0).groupby(level=0).any()
+            mask |= rows.reindex(texts.index, fill_value=False).astype('int64') * bit
+        return mask.astype(self.mask_dtype)
+
+# ------------------ Scan Engine ------------------
+
+def _pattern_anchor(pattern: str) -> Optional[Union[str, List[str]]]:
+    """Work out where a numeric/keyword pattern can start matching.
+
+    Returns ``'digits'`` for patterns that open with a digit run, the list of
+    literal keyword prefixes for patterns that open with ``(?:kw1|kw2)``, or
+    ``None`` when the pattern has no anchor the scanner understands.
+    """
+    if re.match(r'(?:\\b|\(\?<!\\d\))?\(\\d', pattern):
+        return 'digits'
+    match = re.match(r'\(\?:([a-z|?]+)\)', pattern)
+    if not match:
+        return None
+    prefixes = set()
+    for alternative in match.group(1).split('|'):
+        # 'aged?' can only start with 'age'
+        literal = re.sub(r'.\?$', '', alternative)
+        if not literal or '?' in literal:
+            return None
+        prefixes.add(literal)
+    # 'weigh' already finds every 'weight'
+    return sorted(p for p in prefixes if not any(q != p and p.startswith(q) for q in prefixes))
+
+def _trie_pattern(words: List[str]) -> str:
+    """Compile a word list into one prefix-factored regex alternation."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+    
+    return build(trie)
+
+class ProfileScanner:
+    """Single-pass scan engine over the compiled extractor rules.
+
+    One trigger regex, compiled from the numeric rules, walks the lower-cased
+    text and stops only where such a rule can start: digit runs, or keyword
+    occurrences for patterns such as ``(?:weight|weigh)``. The extractors' own
+    compiled patterns are then tried at that position, keeping pattern
+    priority and the leftmost-match semantics of ``re.search``. Goal and enum
+    terms are all found by one shared ``KeywordAutomaton`` pass. The values
+    equal running each extractor in turn; texts the trigger cannot scan
+    exactly (non-ASCII) return ``None`` so the caller can fall back to the
+    per-extractor path.
+    """
+    
+    def __init__(self, numeric_extractors: Dict[str, PatternExtractor],
+                 term_extractors: Dict[str, PatternExtractor]):
+        self.numeric = list(numeric_extractors.items())
+        self.term_fields = list(term_extractors.items())
+        self.supported = True
+        
+        # (field index, priority, compiled pattern), ordered by priority per field
+        self.digit_rules = []
+        keyword_rules = []
+        for index, (_, extractor) in enumerate(self.numeric):
+            for priority, (source, compiled) in enumerate(zip(extractor.patterns, extractor.compiled)):
+                anchor = _pattern_anchor(source)
+                if anchor is None:
+                    self.supported = False
+                elif anchor == 'digits':
+                    self.digit_rules.append((index, priority, compiled))
+                else:
+                    keyword_rules.extend((keyword, (index, priority, compiled)) for keyword in anchor)
+        
+        # Keep only the shortest keyword of each prefix chain; a rule filed
+        # under a shorter keyword is simply tried (and rejected) more often.
+        keywords = sorted({k for k, _ in keyword_rules})
+        keywords = [k for k in keywords if not any(q != k and k.startswith(q) for q in keywords)]
+        self.keyword_rules: Dict[str, list] = {k: [] for k in keywords}
+        for keyword, rule in keyword_rules:
+            shortest = next(k for k in keywords if keyword.startswith(k))
+            if rule not in self.keyword_rules[shortest]:
+                self.keyword_rules[shortest].append(rule)
+        for rules in self.keyword_rules.values():
+            rules.sort(key=lambda rule: (rule[0], rule[1]))
+        self.trigger = self._compile_trigger(keywords)
+        
+        # every term of every term extractor, tagged with its field index;
+        # insertion order keeps each extractor's own alternation order
+        self.automaton = KeywordAutomaton()
+        for index, (_, extractor) in enumerate(self.term_fields):
+            for term, value in extractor.keywords:
+                self.automaton.add(term, (index, value))
+        self.automaton.build()
+    
+    def _compile_trigger(self, keywords: List[str]) -> re.Pattern:
+        """Build the trigger as one alternation rooted on literal first characters.
+
+        Rooting every branch on a literal lets ``re`` skip straight to
+        candidate characters instead of trying each branch at every position.
+        Digit runs are consumed whole. Keywords only consume their first
+        character and capture the rest in a lookahead, so one that starts
+        inside another ('heightall') is still seen.
+        """
+        by_first: Dict[str, List[str]] = {}
+        for keyword in keywords:
+            by_first.setdefault(keyword[0], []).append(keyword[1:])
+        branches = [digit + '[0-9]*' for digit in '0123456789']
+        for first, tails in sorted(by_first.items()):
+            branches.append(re.escape(first) + '(?=(' + _trie_pattern(tails) + '))')
+        return re.compile('|'.join(branches))
+    
+    def scan(self, text: str) -> Optional[Dict[str, Any]]:
+        if not self.supported or not text.isascii():
+            return None
+        
+        best = [None] * len(self.numeric)
+        for hit in self.trigger.finditer(text.lower()):
+            if hit.lastindex:
+                rules = self.keyword_rules[hit.group() + hit.group(hit.lastindex)]
+            else:
+                rules = self.digit_rules
+            pos = hit.start()
+            for index, priority, pattern in rules:
+                current = best[index]
+                if current is not None and current[0] <= priority:
+                    continue
+                match = pattern.match(text, pos)
+                if match:
+                    best[index] = (priority, match)
+        
+        term_hits = [[] for _ in self.term_fields]
+        for start, order, end, (index, value) in self.automaton.find(text):
+            term_hits[index].append((start, order, end, value))
+        
+        values = {}
+        for (name, extractor), found in zip(self.numeric, best):
+            values[name] = extractor.convert(found[1] if found else None)
+        for (name, extractor), hits in zip(self.term_fields, term_hits):
+            values[name] = extractor.select(hits)
+        return values
 
 # ------------------ Main Extractor ------------------
 
+@dataclass(frozen=True)
+class ExtractionLimits:
+    """Guardrails for one extraction request.
+
+    Inputs longer than ``max_chars`` are truncated. Inputs longer than
+    ``window_chars`` are scanned in overlapping windows, so the work per step
+    stays bounded and fields are still found deep inside long pastes.
+    ``time_budget`` (seconds) is checked between windows; once spent, the
+    fields found so far are returned. ``None`` disables a limit.
+    """
+    max_chars: Optional[int] = 1_000_000
+    window_chars: Optional[int] = 20_000
+    window_overlap: int = 200
+    time_budget: Optional[float] = 2.0
+
 class FitnessProfileExtractor:
-    def __init__(self):
+    def __init__(self, limits: Optional[ExtractionLimits] = None):
+        self.limits = limits or ExtractionLimits()
         self.age_extractor = AgeExtractor()
         self.weight_extractor = WeightExtractor()
         self.height_extractor = HeightExtractor()
@@ -236,84 +637,519 @@ class FitnessProfileExtractor:
         self.gender_extractor = EnumExtractor(Gender, gender_mappings)
         self.fitness_level_extractor = EnumExtractor(FitnessLevel)
         self.activity_level_extractor = EnumExtractor(ActivityLevel)
+        self.scanner = ProfileScanner(
+            {'age': self.age_extractor, 'weight': self.weight_extractor, 'height': self.height_extractor},
+            {'gender': self.gender_extractor, 'fitness_level': self.fitness_level_extractor,
+             'activity_level': self.activity_level_extractor, 'goals': self.goals_extractor}
+        )
+    
+    def extract_fields(self, text: str) -> Dict[str, Any]:
+        """Run every extractor separately over the text (reference path)."""
+        return {
+            'age': self.age_extractor.extract(text),
+            'weight': self.weight_extractor.extract(text),
+            'height': self.height_extractor.extract(text),
+            'fitness_level': self.fitness_level_extractor.extract(text),
+            'goals': self.goals_extractor.extract(text),
+            'gender': self.gender_extractor.extract(text),
+            'activity_level': self.activity_level_extractor.extract(text)
+        }
+    
+    def scan_fields(self, text: str) -> Dict[str, Any]:
+        """Field values for ``text``, applying ``self.limits``."""
+        return self._scan(text)[0]
+    
+    def _scan(self, text: str) -> Tuple[Dict[str, Any], bool]:
+        # (fields, complete): complete is False when the time budget cut the scan short
+        limits = self.limits
+        if limits.max_chars is not None and len(text) > limits.max_chars:
+            logger.warning(f"Input of {len(text)} characters truncated to {limits.max_chars}")
+            text = text[:limits.max_chars]
+        if limits.window_chars is None or len(text) <= limits.window_chars:
+            return self._scan_window(text), True
+        
+        # Earlier windows win for single-valued fields, goals are merged
+        deadline = time.perf_counter() + limits.time_budget if limits.time_budget is not None else None
+        step = max(limits.window_chars - limits.window_overlap, 1)
+        fields: Dict[str, Any] = {}
+        goals = set()
+        complete = True
+        for start in range(0, len(text), step):
+            for name, value in self._scan_window(text[start:start + limits.window_chars]).items():
+                if name == 'goals':
+                    goals.update(value.split(',') if value else ())
+                elif fields.get(name) is None:
+                    fields[name] = value
+            if start + limits.window_chars >= len(text):
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                logger.warning(f"Extraction time budget spent after {start + limits.window_chars} of {len(text)} characters")
+                complete = False
+                break
+        fields['goals'] = ','.join(sorted(goals)) if goals else None
+        return fields, complete
+    
+    def _scan_window(self, text: str) -> Dict[str, Any]:
+        fields = self.scanner.scan(text)
+        return fields if fields is not None else self.extract_fields(text)
     
     def extract(self, text: str) -> FitnessProfile:
+        return self.extract_with_status(text)[0]
+    
+    def extract_with_status(self, text: str) -> Tuple[FitnessProfile, bool]:
+        """``extract`` plus whether the whole (possibly truncated) input was scanned
+        
+        The flag is False when ``limits.time_budget`` ran out first, so the
+        profile may lack fields found later in the text.
+        """
         try:
-            profile = FitnessProfile(
-                age=self.age_extractor.extract(text),
-                weight=self.weight_extractor.extract(text),
-                height=self.height_extractor.extract(text),
-                fitness_level=self.fitness_level_extractor.extract(text),
-                goals=self.goals_extractor.extract(text),
-                gender=self.gender_extractor.extract(text),
-                activity_level=self.activity_level_extractor.extract(text)
-            )
-            return profile
+            fields, complete = self._scan(text)
+            return FitnessProfile(**fields), complete
         except Exception as e:
             logger.error(f"Error extracting profile: {e}")
-            return FitnessProfile()
+            return FitnessProfile(), True
     
     def extract_batch(self, texts: List[str]) -> List[FitnessProfile]:
         return [self.extract(text) for text in texts]
+    
+    def extract_profile_batch(self, texts: List[str]) -> 'ProfileBatch':
+        """``extract_batch`` into a columnar ``ProfileBatch`` (no per-row objects kept)."""
+        fields = []
+        for text in texts:
+            try:
+                fields.append(self.scan_fields(text))
+            except Exception as e:
+                logger.error(f"Error extracting profile: {e}")
+                fields.append({})
+        return ProfileBatch.from_dicts(fields, self.goals_extractor)
+    
+    def extract_frame(self, texts) -> 'pd.DataFrame':
+        """Columnar ``extract_batch`` over a pandas Series or Arrow string array.
+
+        Every field is extracted with vectorized string operations over the
+        whole column, so no ``FitnessProfile`` is built per row. Numeric
+        columns are float64 (``age`` is nullable Int64), enums are
+        categoricals and ``goals`` is a bitmask over ``goals_extractor.goal_bits``
+        (decode with ``goals_extractor.goals_from_mask``). Texts are cut to
+        ``limits.max_chars`` but not windowed.
+        """
+        pd = _import_pandas()
+        if hasattr(texts, 'to_pandas'):
+            # pyarrow Array / ChunkedArray
+            texts = texts.to_pandas()
+        texts = pd.Series(texts)
+        index = texts.index
+        texts = texts.reset_index(drop=True).astype('string')
+        if self.limits.max_chars is not None:
+            texts = texts.str.slice(0, self.limits.max_chars)
+        
+        weight = self.weight_extractor.extract_column(texts)
+        height = self.height_extractor.extract_column(texts)
+        bmi = (weight / (height / 100.0) ** 2).round(1).where((weight != 0) & (height != 0))
+        bmi_category = pd.cut(
+            bmi, [float('-inf'), 18.5, 25, 30, float('inf')], right=False,
+            labels=[c.value for c in BMICategory]
+        )
+        frame = pd.DataFrame({
+            'age': self.age_extractor.extract_column(texts),
+            'weight_kg': weight,
+            'height_cm': height,
+            'bmi': bmi,
+            'bmi_category': bmi_category,
+            'gender': self.gender_extractor.extract_column(texts),
+            'fitness_level': self.fitness_level_extractor.extract_column(texts),
+            'activity_level': self.activity_level_extractor.extract_column(texts),
+            'goals': self.goals_extractor.extract_column(texts),
+        })
+        frame.index = index
+        return frame
+
+_default_extractor: Optional[FitnessProfileExtractor] = None
+
+def get_extractor() -> FitnessProfileExtractor:
+    """Return the process-wide extractor, building its rules on first use."""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = FitnessProfileExtractor()
+    return _default_extractor
+
+# ------------------ Profile Batch ------------------
+
+class ProfileBatch:
+    """Struct-of-arrays container for many fitness profiles.
+
+    Numeric fields are float64 arrays (NaN when missing), enum fields are
+    int8 codes into their enum's values (-1 when missing) and goals are a
+    bitmask over ``goals_extractor.goal_bits``. The free-text and list fields,
+    which the extractor never fills, are kept sparsely by row. A batch takes
+    roughly 40 bytes per profile instead of a ``FitnessProfile`` each.
+
+    Its column layout matches ``FitnessProfileExtractor.extract_frame``, so
+    ``from_frame`` and ``to_frame`` share the arrays instead of copying them
+    wherever pandas allows.
+    """
+    
+    NUMERIC = ('age', 'weight', 'height', 'bmi')
+    CATEGORIES = {
+        'bmi_category': [c.value for c in BMICategory],
+        'gender': [g.value for g in Gender],
+        'fitness_level': [f.value for f in FitnessLevel],
+        'activity_level': [a.value for a in ActivityLevel],
+    }
+    SPARSE = ('nutrition_preferences', 'schedule_preferences', 'medical_conditions', 'equipment_available')
+    # extract_frame column names of the numeric fields
+    FRAME_COLUMNS = {'age': 'age', 'weight': 'weight_kg', 'height': 'height_cm', 'bmi': 'bmi'}
+    
+    def __init__(self, columns: Dict[str, Any], goals_extractor: Optional['GoalsExtractor'] = None,
+                 sparse: Optional[Dict[str, Dict[int, Any]]] = None):
+        np = _import_numpy()
+        self.goals_extractor = goals_extractor or get_extractor().goals_extractor
+        self.columns = {}
+        for name in self.NUMERIC:
+            self.columns[name] = np.asarray(columns[name], dtype='float64')
+        for name in self.CATEGORIES:
+            self.columns[name] = np.asarray(columns[name], dtype='int8')
+        self.columns['goals'] = np.asarray(columns['goals'], dtype=self.goals_extractor.mask_dtype)
+        self.sparse = {name: dict((sparse or {}).get(name, {})) for name in self.SPARSE}
+        lengths = {len(column) for column in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"ProfileBatch columns differ in length: {sorted(lengths)}")
+    
+    def __len__(self) -> int:
+        return len(self.columns['goals'])
+    
+    def __getitem__(self, index: int) -> FitnessProfile:
+        return FitnessProfile(**self._fields(index))
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+    
+    @classmethod
+    def from_dicts(cls, records, goals_extractor: Optional['GoalsExtractor'] = None) -> 'ProfileBatch':
+        """Build a batch from profile dicts (``asdict``, ``to_dict`` or extractor fields).
+
+        ``goals`` may be a comma-separated string or a list. Missing ``bmi``
+        values are derived from weight and height as ``FitnessProfile`` does.
+        A category value outside ``CATEGORIES`` raises ``ValueError``.
+        """
+        np = _import_numpy()
+        goals_extractor = goals_extractor or get_extractor().goals_extractor
+        records = records if isinstance(records, (list, tuple)) else list(records)
+        n = len(records)
+        columns = {name: np.full(n, np.nan) for name in cls.NUMERIC}
+        codes = {name: {value: code for code, value in enumerate(values)}
+                 for name, values in cls.CATEGORIES.items()}
+        columns.update({name: np.full(n, -1, dtype='int8') for name in cls.CATEGORIES})
+        goals = np.zeros(n, dtype=goals_extractor.mask_dtype)
+        sparse = {name: {} for name in cls.SPARSE}
+        
+        for row, record in enumerate(records):
+            for name in cls.NUMERIC:
+                value = record.get(name)
+                if value is not None:
+                    columns[name][row] = value
+            weight, height = record.get('weight'), record.get('height')
+            bmi_category = record.get('bmi_category')
+            if weight and height and not record.get('bmi'):
+                bmi = FitnessProfile._calculate_bmi(weight, height)
+                columns['bmi'][row] = bmi
+                bmi_category = FitnessProfile._categorize_bmi(bmi)
+            for name in cls.CATEGORIES:
+                value = bmi_category if name == 'bmi_category' else record.get(name)
+                if value is None:
+                    continue
+                if value not in codes[name]:
+                    raise ValueError(f"Row {row}: unknown {name} {value!r} (expected one of {cls.CATEGORIES[name]})")
+                columns[name][row] = codes[name][value]
+            goals[row] = cls._goals_mask(goals_extractor, record.get('goals'))
+            for name in cls.SPARSE:
+                value = record.get(name)
+                if value:
+                    sparse[name][row] = value
+        
+        columns['goals'] = goals
+        return cls(columns, goals_extractor, sparse)
+    
+    @classmethod
+    def from_profiles(cls, profiles, goals_extractor: Optional['GoalsExtractor'] = None) -> 'ProfileBatch':
+        return cls.from_dicts([asdict(profile) for profile in profiles], goals_extractor)
+    
+    @classmethod
+    def from_frame(cls, frame, goals_extractor: Optional['GoalsExtractor'] = None) -> 'ProfileBatch':
+        """Wrap an ``extract_frame`` result, reusing its column buffers."""
+        np = _import_numpy()
+        columns = {}
+        for name, column in cls.FRAME_COLUMNS.items():
+            columns[name] = frame[column].to_numpy(dtype='float64', na_value=np.nan)
+        for name, values in cls.CATEGORIES.items():
+            column = frame[name]
+            if list(column.cat.categories) != values:
+                column = column.cat.set_categories(values)
+            columns[name] = column.cat.codes.to_numpy()
+        columns['goals'] = frame['goals'].to_numpy()
+        return cls(columns, goals_extractor)
+    
+    def to_frame(self) -> 'pd.DataFrame':
+        """DataFrame in the ``extract_frame`` layout, viewing the batch's arrays."""
+        pd = _import_pandas()
+        data = {}
+        for name, column in self.FRAME_COLUMNS.items():
+            data[column] = self.columns[name]
+        data['age'] = pd.array(self.columns['age'], dtype='Float64').astype('Int64')
+        for name, values in self.CATEGORIES.items():
+            # bmi_category is ordered, as pd.cut builds it in extract_frame
+            dtype = pd.CategoricalDtype(values, ordered=name == 'bmi_category')
+            data[name] = pd.Categorical.from_codes(self.columns[name], dtype=dtype)
+        data['goals'] = self.columns['goals']
+        order = ['age', 'weight_kg', 'height_cm', 'bmi', 'bmi_category', 'gender',
+                 'fitness_level', 'activity_level', 'goals']
+        return pd.DataFrame(data, columns=order, copy=False)
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Profiles as ``profile_record`` dicts, without building FitnessProfile objects."""
+        return [_record_from_fields(self._fields(index)) for index in range(len(self))]
+    
+    def _fields(self, index: int) -> Dict[str, Any]:
+        fields = {}
+        for name in self.NUMERIC:
+            value = self.columns[name][index]
+            fields[name] = None if value != value else float(value)
+        if fields['age'] is not None:
+            fields['age'] = int(fields['age'])
+        for name, values in self.CATEGORIES.items():
+            code = self.columns[name][index]
+            fields[name] = values[code] if code >= 0 else None
+        fields['goals'] = self.goals_extractor.goals_from_mask(int(self.columns['goals'][index]))
+        for name in self.SPARSE:
+            default = [] if name in LIST_KEYS else None
+            fields[name] = copy.copy(self.sparse[name].get(index, default))
+        return fields
+    
+    @staticmethod
+    def _goals_mask(goals_extractor: 'GoalsExtractor', goals) -> int:
+        if not goals:
+            return 0
+        if isinstance(goals, str):
+            goals = goals.split(',')
+        mask = 0
+        for goal in goals:
+            try:
+                mask |= goals_extractor.goal_bits[goal]
+            except KeyError:
+                raise ValueError(f"Unknown goal: {goal!r}")
+        return mask
+
+# ------------------ Extraction Cache ------------------
+
+def rules_fingerprint(extractor: FitnessProfileExtractor) -> str:
+    """Hash of everything the extractor's output depends on.
+
+    Covers the compiled patterns, the synonym tables, the extraction limits
+    (truncation and windowing change the result) and the source of this
+    module, so editing any rule or conversion yields a new fingerprint.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(extractor.limits).encode('utf-8'))
+    try:
+        with open(__file__, 'rb') as f:
+            digest.update(f.read())
+    except OSError:
+        pass
+    for name in sorted(vars(extractor)):
+        part = getattr(extractor, name)
+        if isinstance(part, PatternExtractor):
+            digest.update(repr((name, type(part).__name__, part.patterns, part.flags,
+                                getattr(part, 'keywords', None))).encode('utf-8'))
+    return digest.hexdigest()
+
+def normalize_text(text: str) -> str:
+    """Normalize a paragraph for cache keys without changing what it extracts to.
+
+    Only surrounding whitespace and line endings are normalized: inner spaces
+    are significant to multi-word terms such as 'lose weight'.
+    """
+    return text.strip().replace('\r\n', '\n')
+
+def _copy_profile(profile: FitnessProfile) -> FitnessProfile:
+    # cached profiles are shared, so hand out copies with their own lists
+    clone = copy.copy(profile)
+    clone.medical_conditions = list(profile.medical_conditions)
+    clone.equipment_available = list(profile.equipment_available)
+    return clone
+
+class ExtractionCache:
+    """Content-addressed cache in front of ``FitnessProfileExtractor.extract``.
+
+    Profiles are keyed by the SHA-256 of the normalized paragraph. Lookups go
+    through a size-bounded in-memory LRU first and then, when ``path`` is
+    given, a SQLite file shared across processes and restarts. The on-disk
+    tier records the rules fingerprint it was filled with and clears itself
+    when the fingerprint changes. Profiles from scans that ran out of time
+    budget are returned but not cached.
+    """
+    
+    def __init__(self, extractor: Optional[FitnessProfileExtractor] = None,
+                 maxsize: int = 1024, path: Optional[str] = None):
+        self.extractor = extractor or get_extractor()
+        self.maxsize = maxsize
+        self.path = path
+        self.fingerprint = rules_fingerprint(self.extractor)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, FitnessProfile]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = self._open_db(path) if path else None
+    
+    def _open_db(self, path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS profiles (key TEXT PRIMARY KEY, profile TEXT NOT NULL)")
+        row = db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if row is None or row[0] != self.fingerprint:
+            if row is not None:
+                logger.info("Extraction rules changed, clearing profile cache")
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM profiles")
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (self.fingerprint,))
+            db.execute("COMMIT")
+        return db
+    
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+    
+    def extract(self, text: str) -> FitnessProfile:
+        key = self.key(text)
+        with self._lock:
+            profile = self._memory.get(key)
+            if profile is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return _copy_profile(profile)
+        
+        profile = self._load(key)
+        if profile is not None:
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+        else:
+            profile, complete = self.extractor.extract_with_status(text)
+            with self._lock:
+                self.misses += 1
+            if not complete:
+                return profile
+            self._store(key, profile)
+        self._remember(key, profile)
+        return _copy_profile(profile)
+    
+    def _remember(self, key: str, profile: FitnessProfile):
+        with self._lock:
+            self._memory[key] = profile
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+    
+    def _load(self, key: str) -> Optional[FitnessProfile]:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT profile FROM profiles WHERE key = ?", (key,)).fetchone()
+        return FitnessProfile(**json.loads(row[0])) if row else None
+    
+    def _store(self, key: str, profile: FitnessProfile):
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO profiles VALUES (?, ?)",
+                             (key, json.dumps(asdict(profile), ensure_ascii=False)))
+    
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM profiles")
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'memory_entries': len(self._memory),
+            'maxsize': self.maxsize,
+        }
+    
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+_caches: Dict[Optional[str], ExtractionCache] = {}
+
+def get_cache(path: Optional[str] = None) -> ExtractionCache:
+    """Return the process-wide cache for ``path`` (memory-only when ``None``)."""
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = ExtractionCache(get_extractor(), path=path)
+    return cache
 
 # ------------------ Main ------------------
 
-def extract_fitness_profile(paragraph: str, output_path: str):
-    extractor = FitnessProfileExtractor()
-    profile_obj = extractor.extract(paragraph)
-    profile_dict = profile_obj.to_dict()
+PROFILE_KEYS = [
+    "age", "gender", "weight", "height", "bmi", "bmi_category",
+    "fitness_level", "activity_level", "goals",
+    "nutrition_preferences", "schedule_preferences",
+    "medical_conditions", "equipment_available"
+]
+LIST_KEYS = ["medical_conditions", "equipment_available", "goals"]
+
+def profile_record(profile: FitnessProfile) -> Dict[str, Any]:
+    """Profile dict with every key present, as written to the profile files."""
+    return _record_from_fields(asdict(profile))
 
+def _record_from_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    # same shape as FitnessProfile.to_dict, then every key filled in
+    profile_dict = {name: fields.get(name) for name in FitnessProfile.__dataclass_fields__}
+    if profile_dict.get("goals"):
+        profile_dict["goals"] = profile_dict["goals"].split(",")
+    profile_dict = {k: v for k, v in profile_dict.items() if v is not None and v != [] and v != ""}
     # Ensure consistent keys
-    all_keys = [
-        "age", "gender", "weight", "height", "bmi", "bmi_category",
-        "fitness_level", "activity_level", "goals",
-        "nutrition_preferences", "schedule_preferences",
-        "medical_conditions", "equipment_available"
-    ]
-    for key in all_keys:
+    for key in PROFILE_KEYS:
         if key not in profile_dict:
-            profile_dict[key] = None if key not in ["medical_conditions", "equipment_available", "goals"] else []
-
-    # Append to JSON file
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    if os.path.exists(output_path):
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing_profiles = json.load(f)
-        # 🔥 FIX: ensure it's a list
-        if isinstance(existing_profiles, dict):
-            existing_profiles = [existing_profiles]
-    else:
-        existing_profiles = []
-
-    existing_profiles.append(profile_dict)
+            profile_dict[key] = None if key not in LIST_KEYS else []
+    return profile_dict
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(existing_profiles, f, indent=2, ensure_ascii=False)
+def extract_fitness_profile(paragraph: str, output_path: str, user_id: Optional[str] = None,
+                            session_id: Optional[str] = None):
+    """Extract a profile and append it to the profile store at ``output_path``.
 
+    A legacy ``fitness_profiles.json`` path is mapped to a sibling
+    ``.sqlite3`` store (see ``open_profile_store``), so each call is one
+    append instead of rewriting every earlier profile.
+    """
+    cache = get_cache(os.path.join(os.path.dirname(output_path), "extraction_cache.sqlite3"))
+    profile_dict = profile_record(cache.extract(paragraph))
+    open_profile_store(output_path).append(profile_dict, user_id=user_id, session_id=session_id)
     return profile_dict
 
 
 
 
 def main():
-    extractor = FitnessProfileExtractor()
+    extractor = get_extractor()
 
     # Get user input live from terminal
     user_input = input("Please enter your fitness info paragraph:\n")
 
-    profile_obj = extractor.extract(user_input)
-    profile_dict = profile_obj.to_dict()
-
-    # Ensure all keys exist for consistency
-    all_keys = [
-        "age", "gender", "weight", "height", "bmi", "bmi_category",
-        "fitness_level", "activity_level", "goals",
-        "nutrition_preferences", "schedule_preferences",
-        "medical_conditions", "equipment_available"
-    ]
-    for key in all_keys:
-        if key not in profile_dict:
-            profile_dict[key] = None if key not in ["medical_conditions", "equipment_available", "goals"] else []
+    profile_dict = profile_record(extractor.extract(user_input))
 
     # Determine script directory
     script_dir = os.path.dirname(__file__)
@@ -322,21 +1158,11 @@ def main():
     output_dir = os.path.join(script_dir, "..", "..", "data")
     os.makedirs(output_dir, exist_ok=True)
 
-    # Output file path
-    output_path = os.path.join(output_dir, "fitness_profiles.json")
-
-    # Save JSON (append if file exists)
-    if os.path.exists(output_path):
-        # Load existing profiles
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing_profiles = json.load(f)
-    else:
-        existing_profiles = []
-
-    existing_profiles.append(profile_dict)
+    # Output store path
+    output_path = os.path.join(output_dir, "fitness_profiles.sqlite3")
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(existing_profiles, f, indent=2, ensure_ascii=False)
+    # Append to the profile store
+    open_profile_store(output_path).append(profile_dict)
 
     print(f"Profile saved to '{output_path}'")
 
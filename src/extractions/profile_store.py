@@ -0,0 +1,181 @@
+"""Append-only store for extracted fitness profiles.
+
+Profiles are rows in a SQLite database in WAL mode: an insert is a single
+O(1) append, concurrent writers (Streamlit sessions, pipeline runs) are
+serialized by SQLite instead of overwriting each other's file, and readers
+fetch one profile by id, user or session without loading the rest.
+
+Usage:
+    store = open_profile_store("data/fitness_profiles.sqlite3")
+    record_id = store.append(profile_dict, session_id="abc")
+    store.latest(session_id="abc")
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    session_id TEXT,
+    created_at REAL NOT NULL,
+    profile TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_user ON profiles (user_id, id);
+CREATE INDEX IF NOT EXISTS profiles_session ON profiles (session_id, id);
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    imported_at REAL NOT NULL
+);
+"""
+
+# rows fetched per lock acquisition while streaming records
+PAGE_SIZE = 500
+
+
+class ProfileStore:
+    """Indexed, append-only profile log backed by SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def append(self, profile: Dict[str, Any], user_id: Optional[str] = None,
+               session_id: Optional[str] = None) -> int:
+        """Append one profile and return its record id."""
+        row = (user_id, session_id, time.time(), json.dumps(profile, ensure_ascii=False))
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO profiles (user_id, session_id, created_at, profile) VALUES (?, ?, ?, ?)", row
+            )
+        return cursor.lastrowid
+
+    def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        return self._one("SELECT profile FROM profiles WHERE id = ?", (record_id,))
+
+    def latest(self, user_id: Optional[str] = None, session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Most recent profile, optionally restricted to a user and/or session."""
+        where, params = self._filter(user_id, session_id)
+        return self._one(f"SELECT profile FROM profiles{where} ORDER BY id DESC LIMIT 1", params)
+
+    def history(self, user_id: Optional[str] = None, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream matching profiles oldest first, one row at a time."""
+        where, params = self._filter(user_id, session_id)
+        for record in self.records(where, params):
+            yield record["profile"]
+
+    def records(self, where: str = "", params: tuple = ()) -> Iterator[Dict[str, Any]]:
+        """Stream full records (id, user_id, session_id, created_at, profile)."""
+        # pages are read by id under the lock, so other threads can use the
+        # shared connection (and append) between pages
+        page_where = f"{where} AND id > ?" if where else " WHERE id > ?"
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT id, user_id, session_id, created_at, profile FROM profiles{page_where} "
+                    f"ORDER BY id LIMIT {PAGE_SIZE}", params + (last_id,)
+                ).fetchall()
+            for record_id, user_id, session_id, created_at, profile in rows:
+                yield {
+                    "id": record_id,
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "created_at": created_at,
+                    "profile": json.loads(profile),
+                }
+            if len(rows) < PAGE_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.history()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def imported(self, json_path: str) -> bool:
+        """Whether the legacy file at ``json_path`` was already imported."""
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM imports WHERE source = ?", (os.path.abspath(json_path),)).fetchone()
+        return row is not None
+
+    def import_json(self, json_path: str) -> int:
+        """Append the profiles of a legacy ``fitness_profiles.json`` file (recorded, so once per file)."""
+        with open(json_path, "r", encoding="utf-8") as f:
+            profiles = json.load(f)
+        if isinstance(profiles, dict):
+            profiles = [profiles]
+        now = time.time()
+        rows = [(None, None, now, json.dumps(p, ensure_ascii=False)) for p in profiles]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "INSERT INTO profiles (user_id, session_id, created_at, profile) VALUES (?, ?, ?, ?)", rows
+            )
+            self._db.execute("INSERT OR REPLACE INTO imports (source, imported_at) VALUES (?, ?)",
+                             (os.path.abspath(json_path), now))
+            self._db.execute("COMMIT")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _filter(user_id: Optional[str], session_id: Optional[str]):
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+    def _one(self, query: str, params: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+_stores: Dict[str, ProfileStore] = {}
+_stores_lock = threading.Lock()
+
+
+def store_path(path: str) -> str:
+    """Map a legacy ``*.json`` profile path to its store file."""
+    root, ext = os.path.splitext(path)
+    return root + ".sqlite3" if ext.lower() == ".json" else path
+
+
+def open_profile_store(path: str) -> ProfileStore:
+    """Return the process-wide store for ``path``.
+
+    A legacy JSON path is mapped to a sibling ``.sqlite3`` file, and the
+    profiles already in the JSON file are imported into it once (the store
+    records which files it has imported).
+    """
+    db_path = os.path.abspath(store_path(path))
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = ProfileStore(db_path)
+            if db_path != os.path.abspath(path) and os.path.exists(path) and not store.imported(path):
+                try:
+                    store.import_json(path)
+                except (OSError, ValueError):
+                    pass
+        return store
@@ -0,0 +1,136 @@
+"""Native-booster inference for the XGBoost meal models.
+
+``BoosterPredictor`` takes the underlying ``xgboost.Booster`` out of each
+``XGBClassifier`` once. It then scores contiguous float32 rows with
+``Booster.inplace_predict``, so there is no sklearn wrapper, no input
+validation and no DMatrix on the request path.
+
+* Thread count: ``nthread`` sets the default, and each call can override it.
+  Every thread count gets its own copy of the boosters, configured once and
+  reused, so concurrent calls with different counts do not touch each
+  other's settings. At most ``max_thread_configs`` copies are kept (least
+  recently used dropped first).
+* Fused mode (``fused=True``): the three multi-class boosters are merged
+  into one booster over all meals' classes, and every meal is scored in a
+  single call. Its raw margins are bit-identical to the separate boosters.
+  The per-meal softmax is then applied in NumPy, which can differ from
+  XGBoost's own by one float32 ulp. Without fusing, probabilities are exactly
+  what ``predict_proba`` returns.
+
+Usage:
+    boosters = BoosterPredictor(models, fused=True, nthread=1)
+    probabilities = boosters.predict_proba(X)   # {meal: (n_users, n_dishes)}
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def fuse_boosters(boosters: Dict[str, object]) -> Tuple[object, Dict[str, slice]]:
+    """Merge multi-class boosters into one booster over all their classes.
+
+    Returns the merged booster and, per model, the slice of its margin
+    columns. Trees are renumbered and each tree's class is shifted past the
+    earlier models' classes. Boosting rounds are interleaved, so every
+    class still adds up its trees in the original order.
+    """
+    import xgboost as xgb
+
+    docs = {name: json.loads(booster.save_raw("json")) for name, booster in boosters.items()}
+    merged = json.loads(json.dumps(next(iter(docs.values()))))
+    slices, bases, gbtrees, offset = {}, [], {}, 0
+    for name, doc in docs.items():
+        learner = doc["learner"]
+        if learner["objective"]["name"] != "multi:softprob":
+            raise ValueError(f"Only multi:softprob boosters can be fused, {name} is {learner['objective']['name']}")
+        n_classes = int(learner["learner_model_param"]["num_class"])
+        slices[name] = slice(offset, offset + n_classes)
+        bases.append(learner["learner_model_param"]["base_score"].strip("[]"))
+        gbtrees[name] = (learner["gradient_booster"]["model"], offset)
+        offset += n_classes
+
+    trees, tree_info, indptr = [], [], [0]
+    n_rounds = max(len(model["iteration_indptr"]) - 1 for model, _ in gbtrees.values())
+    for round_ in range(n_rounds):
+        for model, class_offset in gbtrees.values():
+            bounds = model["iteration_indptr"]
+            if round_ + 1 >= len(bounds):
+                continue
+            for i in range(bounds[round_], bounds[round_ + 1]):
+                tree = dict(model["trees"][i], id=len(trees))
+                trees.append(tree)
+                tree_info.append(model["tree_info"][i] + class_offset)
+        indptr.append(len(trees))
+
+    learner = merged["learner"]
+    learner["learner_model_param"]["num_class"] = str(offset)
+    learner["learner_model_param"]["base_score"] = "[" + ",".join(bases) + "]"
+    learner["objective"]["softmax_multiclass_param"]["num_class"] = str(offset)
+    gbtree = learner["gradient_booster"]["model"]
+    gbtree.update(trees=trees, tree_info=tree_info, iteration_indptr=indptr)
+    gbtree["gbtree_model_param"]["num_trees"] = str(len(trees))
+
+    fused = xgb.Booster()
+    fused.load_model(bytearray(json.dumps(merged).encode()))
+    return fused, slices
+
+
+def softmax(margins: np.ndarray) -> np.ndarray:
+    """Row-wise softmax computed the way XGBoost's multi:softprob does (float32 out)."""
+    shifted = margins - margins.max(axis=1, keepdims=True)
+    exp = np.exp(shifted.astype(np.float64)).astype(np.float32)
+    return exp / exp.sum(axis=1, keepdims=True, dtype=np.float64).astype(np.float32)
+
+
+class BoosterPredictor:
+    """Per-meal class probabilities straight from the native XGBoost boosters."""
+
+    def __init__(self, models: Dict[str, object], fused: bool = False, nthread: Optional[int] = None,
+                 max_thread_configs: int = 4):
+        self.meal_types = list(models)
+        self.fused = fused
+        self.nthread = nthread
+        self.max_thread_configs = max_thread_configs
+        boosters = {meal_type: model.get_booster() for meal_type, model in models.items()}
+        if fused:
+            booster, self.slices = fuse_boosters(boosters)
+            boosters = {"fused": booster}
+        # the originals, left at XGBoost's default thread count
+        self._base = boosters
+        # thread count -> boosters configured for it, least recently used first
+        self._boosters: 'OrderedDict[int, Dict[str, object]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def boosters(self, nthread: Optional[int] = None) -> Dict[str, object]:
+        """The boosters configured for ``nthread`` threads (copied on first use)."""
+        if nthread is None:
+            return self._base
+        with self._lock:
+            found = self._boosters.get(nthread)
+            if found is None:
+                found = {}
+                for name, booster in self._base.items():
+                    found[name] = booster.copy()
+                    found[name].set_param({"nthread": nthread})
+                self._boosters[nthread] = found
+                while len(self._boosters) > self.max_thread_configs:
+                    self._boosters.popitem(last=False)
+            self._boosters.move_to_end(nthread)
+            return found
+
+    def predict_proba(self, X, nthread: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Class probabilities for every meal model, ``{meal: (n_rows, n_dishes)}``
+
+        ``X`` holds feature rows in the models' column order (see
+        ``FeatureVectorizer``). ``nthread`` overrides the default thread count
+        for this call.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        boosters = self.boosters(self.nthread if nthread is None else nthread)
+        if self.fused:
+            margins = boosters["fused"].inplace_predict(X, predict_type="margin")
+            return {meal_type: softmax(margins[:, self.slices[meal_type]]) for meal_type in self.meal_types}
+        return {meal_type: boosters[meal_type].inplace_predict(X) for meal_type in self.meal_types}
@@ -0,0 +1,101 @@
+"""Precompiled feature rows for the meal models.
+
+``FeatureVectorizer`` is built once from the fitted label encoders and
+scaler. Category codes become plain dicts (anything unseen maps to the
+"unknown" class, if the encoder has one), and the scaler's ``mean_`` / ``scale_`` become NumPy arrays.
+A user dict then turns into the model's feature row with a few dict lookups
+and one array expression, with no DataFrame, ``LabelEncoder.transform`` or
+``StandardScaler.transform`` on the request path.
+
+Rows are identical to what ``LabelEncoder.transform`` + ``StandardScaler.transform``
+produce, in the boosters' column order.
+
+Usage:
+    vectorizer = FeatureVectorizer(feature_names, encoders, scaler)
+    X = vectorizer.transform(user)            # (1, n_features)
+    X = vectorizer.transform(users_frame)     # (n_users, n_features)
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+NUMERICAL_COLS = ["age", "weight", "height", "bmi"]
+
+
+class FeatureVectorizer:
+    """User profiles -> float64 feature rows for the meal boosters."""
+
+    def __init__(self, feature_names: Sequence[str], encoders: Dict[str, object], scaler,
+                 categorical_cols: Sequence[str]):
+        self.feature_names = list(feature_names)
+        self.categorical_cols = list(categorical_cols)
+        self.numerical_cols = list(getattr(scaler, "feature_names_in_", NUMERICAL_COLS))
+        self.codes = {col: {str(value): code for code, value in enumerate(encoders[col].classes_)}
+                      for col in self.categorical_cols}
+        # fallback code per column; None if the encoder has no "unknown" class
+        self.unknown = {col: self.codes[col].get("unknown") for col in self.categorical_cols}
+        self._indexes = {col: pd.Index(list(self.codes[col])) for col in self.categorical_cols}
+
+        n = len(self.numerical_cols)
+        mean = scaler.mean_ if getattr(scaler, "with_mean", True) and scaler.mean_ is not None else np.zeros(n)
+        scale = scaler.scale_ if getattr(scaler, "with_std", True) and scaler.scale_ is not None else np.ones(n)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+        position = {name: i for i, name in enumerate(self.feature_names)}
+        missing = [col for col in self.numerical_cols + self.categorical_cols if col not in position]
+        if missing:
+            raise ValueError(f"Model features {self.feature_names} lack {missing}")
+        self._num_positions = np.array([position[col] for col in self.numerical_cols])
+        self._cat_positions = [(position[col], col) for col in self.categorical_cols]
+
+    def missing_categoricals(self, columns) -> list:
+        return [col for col in self.categorical_cols if col not in columns]
+
+    def transform(self, users) -> np.ndarray:
+        """Feature rows for one user dict, a list of user dicts or a DataFrame."""
+        if isinstance(users, pd.DataFrame):
+            return self._transform_frame(users)
+        if isinstance(users, dict):
+            users = [users]
+        X = np.empty((len(users), len(self.feature_names)))
+        for i, user in enumerate(users):
+            self._fill_row(X[i], user)
+        return X
+
+    def _check_numerical(self, columns):
+        missing_cols = [col for col in self.numerical_cols if col not in columns]
+        if missing_cols:
+            raise ValueError(f"Missing required numerical columns: {missing_cols}")
+
+    def _fallback(self, col: str, value) -> int:
+        code = self.unknown[col]
+        if code is None:
+            raise ValueError(f"Value {value!r} is not a known '{col}' and its encoder has no 'unknown' class")
+        return code
+
+    def _fill_row(self, row: np.ndarray, user: dict):
+        self._check_numerical(user)
+        numbers = [np.nan if user[col] is None else float(user[col]) for col in self.numerical_cols]
+        row[self._num_positions] = (np.array(numbers) - self.mean) / self.scale
+        for position, col in self._cat_positions:
+            # str() like DataFrame.astype(str); missing and unseen values are "unknown"
+            code = self.codes[col].get(str(user[col])) if col in user else None
+            row[position] = code if code is not None else self._fallback(col, user.get(col))
+
+    def _transform_frame(self, users: pd.DataFrame) -> np.ndarray:
+        self._check_numerical(users.columns)
+        X = np.empty((len(users), len(self.feature_names)))
+        numbers = np.asarray(users[self.numerical_cols], dtype=np.float64)
+        X[:, self._num_positions] = (numbers - self.mean) / self.scale
+        for position, col in self._cat_positions:
+            if col in users.columns:
+                codes = self._indexes[col].get_indexer(users[col].astype(str))
+                unseen = codes < 0
+                if unseen.any():
+                    codes[unseen] = self._fallback(col, users[col].to_numpy()[unseen][0])
+                X[:, position] = codes
+            else:
+                X[:, position] = self._fallback(col, None)
+        return X
@@ -0,0 +1,44 @@
+"""Generate meal plans for many users at once
+
+Reads profiles (the fields of user.json, one per row) from a JSONL file or a
+Parquet file/directory, scores them in batches and writes one columnar row
+per user: recommended dish, alternatives and confidences for every meal.
+
+Usage:
+    python src/nutritions_model/plan_meals.py --input users.jsonl --output data/meal_plans.parquet
+    python src/nutritions_model/plan_meals.py --input data/users/ --output plans.csv --alternatives 2
+    python src/nutritions_model/plan_meals.py --input users.jsonl --output plans.parquet --fused --nthread 4
+"""
+from predict_meals import MealPredictor
+import os
+import sys
+import time
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch meal planning over JSONL or Parquet user profiles")
+    parser.add_argument("--input", required=True, help="JSONL file, Parquet file or directory of Parquet files")
+    parser.add_argument("--output", required=True, help="Output file: Parquet, or CSV if it ends in .csv")
+    parser.add_argument("--model-dir", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Pickle directory or meal bundle")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Profiles scored per batch")
+    parser.add_argument("--alternatives", type=int, default=3, help="Alternative dishes per meal")
+    parser.add_argument("--nthread", type=int, default=None, help="XGBoost threads (default: all cores)")
+    parser.add_argument("--fused", action="store_true", help="Score all meals with one merged booster")
+    args = parser.parse_args()
+
+    try:
+        predictor = MealPredictor(model_dir=args.model_dir, fused=args.fused, nthread=args.nthread)
+    except RuntimeError:
+        # the reason has already been printed
+        sys.exit(1)
+    start = time.perf_counter()
+    rows = predictor.plan_meals_file(args.input, args.output, args.chunk_size, args.alternatives)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Wrote meal plans for {rows} users to {os.path.abspath(args.output)} "
+          f"({rows / elapsed:,.0f} users/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,22 +3,51 @@ import json
 import joblib
 import numpy as np
 import argparse
+import os
 import sys
+import logging
+import tempfile
 from pathlib import Path
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.nutritions_model.feature_vectorizer import FeatureVectorizer
+from src.nutritions_model.booster_inference import BoosterPredictor
+
+logger = logging.getLogger(__name__)
+
 class MealPredictor:
-    def __init__(self, model_dir="./"):
+    def __init__(self, model_dir="./", fused=False, nthread=None, verbose=True):
         """
         Initialize the meal predictor by loading trained models and preprocessors
         
         Args:
-            model_dir (str): Directory containing the saved model files
+            model_dir (str): Directory containing the saved model files, or a
+                model bundle written by save_bundle
+            fused (bool): Score all meals with one merged booster call
+                (probabilities may differ from predict_proba by one float32 ulp)
+            nthread (int): Default XGBoost thread count for predictions
+            verbose (bool): Print progress and warnings; when False they go to
+                this module's logger instead (for services and threads)
         """
         self.model_dir = Path(model_dir)
+        self.fused = fused
+        self.nthread = nthread
+        self.verbose = verbose
         self.models = None
         self.encoders = None
         self.scaler = None
         self.food_encoders = None
+        # meal type -> dish name of every predict_proba column
+        self.dishes = {}
+        # model input columns, in the order the boosters were trained on
+        self.feature_names = ["age", "weight", "height", "bmi", "fitness_level", "goals", "gender", "activity_level"]
+        # user dicts -> feature rows, compiled from the encoders and scaler at load
+        self.vectorizer = None
+        # native boosters taken out of the models once, used for every prediction
+        self.boosters = None
         self.categorical_cols = ["gender", "fitness_level", "activity_level", "goals"]
         
         # Food library with portions
@@ -39,31 +68,99 @@ class MealPredictor:
         self.load_models()
     
     def load_models(self):
-        """Load all trained models and preprocessors"""
+        """Load all trained models and preprocessors
+        
+        Raises:
+            RuntimeError: If the model files are missing or cannot be loaded
+        """
         try:
-            print("Loading trained models and preprocessors...")
+            self._report("Loading trained models and preprocessors...")
             
-            # Load models and preprocessors
-            self.models = joblib.load(self.model_dir / "xgb_meal_models.pkl")
-            self.encoders = joblib.load(self.model_dir / "encoders.pkl")
-            self.scaler = joblib.load(self.model_dir / "scaler.pkl")
-            self.food_encoders = joblib.load(self.model_dir / "food_encoders.pkl")
+            if (self.model_dir / "manifest.json").exists():
+                self.load_bundle(self.model_dir)
+            else:
+                # Load models and preprocessors
+                self.models = joblib.load(self.model_dir / "xgb_meal_models.pkl")
+                self.encoders = joblib.load(self.model_dir / "encoders.pkl")
+                self.scaler = joblib.load(self.model_dir / "scaler.pkl")
+                self.food_encoders = joblib.load(self.model_dir / "food_encoders.pkl")
+            self.dishes = {meal_type: np.asarray(self.food_encoders[f"{meal_type}_food"].classes_)
+                           for meal_type in self.models}
+            booster_names = next(iter(self.models.values())).get_booster().feature_names
+            if booster_names:
+                self.feature_names = list(booster_names)
+            self.vectorizer = FeatureVectorizer(self.feature_names, self.encoders, self.scaler, self.categorical_cols)
+            self.boosters = BoosterPredictor(self.models, fused=self.fused, nthread=self.nthread)
             
-            print("✓ Models loaded successfully!")
-            print(f"✓ Available meal models: {list(self.models.keys())}")
+            self._report("✓ Models loaded successfully!")
+            self._report(f"✓ Available meal models: {list(self.models.keys())}")
             
         except FileNotFoundError as e:
-            print(f"❌ Error: Could not find model files in {self.model_dir}")
-            print("Make sure you have run the training script first and have these files:")
-            print("  - xgb_meal_models.pkl")
-            print("  - encoders.pkl")
-            print("  - scaler.pkl") 
-            print("  - food_encoders.pkl")
-            sys.exit(1)
+            self._report(f"❌ Error: Could not find model files in {self.model_dir}\n"
+                         "Make sure you have run the training script first and have these files:\n"
+                         "  - xgb_meal_models.pkl\n"
+                         "  - encoders.pkl\n"
+                         "  - scaler.pkl\n"
+                         "  - food_encoders.pkl", logging.ERROR)
+            raise RuntimeError(f"Could not find model files in {self.model_dir}") from e
         except Exception as e:
-            print(f"❌ Error loading models: {e}")
-            sys.exit(1)
+            self._report(f"❌ Error loading models: {e}", logging.ERROR)
+            raise RuntimeError(f"Error loading meal models from {self.model_dir}: {e}") from e
+    
+    def _report(self, message, level=logging.INFO):
+        """Print ``message`` when verbose, else send it to the module logger"""
+        if self.verbose:
+            print(message)
+        else:
+            logger.log(level, message)
     
+    def load_bundle(self, path, verify=True):
+        """Load models and preprocessors from a bundle written by save_bundle"""
+        from xgboost import XGBClassifier
+        from src.service.model_bundle import BundleError, ModelBundle
+
+        bundle = ModelBundle(path, verify=verify)
+        if bundle.kind != "meals":
+            raise BundleError(f"{path} holds a '{bundle.kind}' bundle, not meal models")
+        meta = bundle.metadata
+        self.models = {}
+        for meal_type in meta["meal_types"]:
+            model = XGBClassifier()
+            model.load_model(bytearray(bundle.blob(f"{meal_type}.ubj")))
+            self.models[meal_type] = model
+        self.encoders = {col: bundle.estimator(f"encoder.{col}") for col in meta["encoders"]}
+        self.scaler = bundle.estimator("scaler")
+        self.food_encoders = {name: bundle.estimator(f"food_encoder.{name}") for name in meta["food_encoders"]}
+
+    def save_bundle(self, path):
+        """Save models and preprocessors as one versioned bundle (no pickles)
+
+        Boosters are stored in XGBoost's native UBJSON format; encoders and the
+        scaler as parameters plus arrays.
+        """
+        import xgboost
+        from src.service.model_bundle import BundleWriter
+
+        metadata = {
+            "meal_types": list(self.models),
+            "encoders": list(self.encoders),
+            "food_encoders": list(self.food_encoders),
+            "xgboost_version": xgboost.__version__,
+        }
+        with BundleWriter(path, kind="meals", metadata=metadata) as bundle:
+            with tempfile.TemporaryDirectory() as tmp:
+                for meal_type, model in self.models.items():
+                    model_path = os.path.join(tmp, f"{meal_type}.ubj")
+                    model.save_model(model_path)
+                    with open(model_path, "rb") as f:
+                        bundle.add_blob(f"{meal_type}.ubj", f.read())
+            for col, encoder in self.encoders.items():
+                bundle.add_estimator(f"encoder.{col}", encoder)
+            bundle.add_estimator("scaler", self.scaler)
+            for name, encoder in self.food_encoders.items():
+                bundle.add_estimator(f"food_encoder.{name}", encoder)
+        return os.path.abspath(path)
+
     def expand_meal(self, pred):
         """Expand predicted dish into full meal with portions"""
         return [{"food": food, "amount": amount} 
@@ -71,16 +168,24 @@ class MealPredictor:
     
     def get_prediction_probabilities(self, user_features, meal_type):
         """Get prediction probabilities for better insights"""
-        model = self.models[meal_type]
-        probabilities = model.predict_proba(user_features)[0]
-        classes = self.food_encoders[f"{meal_type}_food"].classes_
-        
-        # Create probability dictionary
-        prob_dict = dict(zip(classes, probabilities))
-        # Sort by probability
-        sorted_probs = sorted(prob_dict.items(), key=lambda x: x[1], reverse=True)
-        
-        return sorted_probs
+        probabilities = self.boosters.predict_proba(user_features)[meal_type][0]
+        dishes = self.dishes[meal_type]
+        return [(dishes[i], probabilities[i]) for i in self.top_k(probabilities, len(probabilities))]
+
+    @staticmethod
+    def top_k(probabilities, k):
+        """Indices of the ``k`` most probable dishes, highest first
+
+        Ties keep dish order, like a stable sort by descending probability.
+        """
+        k = min(k, len(probabilities))
+        if k < len(probabilities):
+            top = np.argpartition(-probabilities, k - 1)[:k]
+            # widen to every dish tied with the k-th, then break ties by index
+            top = np.flatnonzero(probabilities >= probabilities[top].min())
+        else:
+            top = np.arange(len(probabilities))
+        return top[np.lexsort((top, -probabilities[top]))][:k]
     
     def preprocess_user_data(self, user_data):
         """
@@ -90,37 +195,11 @@ class MealPredictor:
             user_data (dict): User information dictionary
             
         Returns:
-            pandas.DataFrame: Preprocessed features ready for prediction
+            numpy.ndarray: One feature row (shape ``(1, n_features)``) in the models' column order
         """
-        # Convert to DataFrame
-        user_df = pd.DataFrame([user_data])
-        
-        # Encode categorical variables with fallback to "unknown"
-        for col in self.categorical_cols:
-            if col in user_df.columns:
-                user_df[col] = user_df[col].astype(str)
-                # Handle unknown categories
-                user_df[col] = user_df[col].apply(
-                    lambda x: x if x in self.encoders[col].classes_ else "unknown"
-                )
-                user_df[col] = self.encoders[col].transform(user_df[col])
-            else:
-                print(f"⚠️  Warning: Column '{col}' not found in user data, using 'unknown'")
-                user_df[col] = self.encoders[col].transform(["unknown"])
-        
-        # Scale numerical features
-        numerical_cols = ["age", "weight", "height", "bmi"]
-        if all(col in user_df.columns for col in numerical_cols):
-            user_df[numerical_cols] = self.scaler.transform(user_df[numerical_cols])
-        else:
-            missing_cols = [col for col in numerical_cols if col not in user_df.columns]
-            raise ValueError(f"Missing required numerical columns: {missing_cols}")
-        
-        # Remove user_id if present
-        if "user_id" in user_df.columns:
-            user_df = user_df.drop(columns=["user_id"])
-        
-        return user_df
+        for col in self.vectorizer.missing_categoricals(user_data):
+            self._report(f"⚠️  Warning: Column '{col}' not found in user data, using 'unknown'", logging.WARNING)
+        return self.vectorizer.transform(user_data)
     
     def predict_meals(self, user_data, show_alternatives=True, top_alternatives=3):
         """
@@ -137,44 +216,75 @@ class MealPredictor:
         try:
             # Preprocess user data
             X_user = self.preprocess_user_data(user_data)
-            
-            meal_plan = {"meal_plan": []}
-            
-            for meal_type in ['breakfast', 'lunch', 'dinner']:
-                # Main prediction
-                pred_encoded = self.models[meal_type].predict(X_user)[0]
-                main_pred = self.food_encoders[f"{meal_type}_food"].inverse_transform([pred_encoded])[0]
-                
-                meal_info = {
-                    "meal": meal_type,
-                    "recommended": main_pred,
-                    "foods": self.expand_meal(main_pred)
-                }
-                
-                # Add alternatives if requested
-                if show_alternatives:
-                    probabilities = self.get_prediction_probabilities(X_user, meal_type)
-                    alternatives = []
-                    
-                    # Get top alternatives (excluding the main prediction)
-                    for food, prob in probabilities[1:top_alternatives+1]:
-                        alternatives.append({
-                            "dish": food,
-                            "confidence": f"{prob:.2%}",
-                            "foods": self.expand_meal(food)
-                        })
-                    
-                    meal_info["alternatives"] = alternatives
-                    meal_info["main_confidence"] = f"{probabilities[0][1]:.2%}"
-                
-                meal_plan["meal_plan"].append(meal_info)
+            # One call scores every meal; each row gives the main prediction
+            # (its argmax, exactly what predict returns) and the alternatives
+            meal_probabilities = self.boosters.predict_proba(X_user)
+            meal_plan = self._meal_plan(meal_probabilities, 0, show_alternatives, top_alternatives)
             
             return meal_plan
             
         except Exception as e:
-            print(f"❌ Error during prediction: {e}")
+            self._report(f"❌ Error during prediction: {e}", logging.ERROR)
             return None
     
+    def predict_meal_plans(self, users, show_alternatives=True, top_alternatives=3):
+        """
+        predict_meals for many users with one vectorized model call
+        
+        Args:
+            users (list of dict): User information, one dict per user
+            show_alternatives (bool): Whether to include alternative meal suggestions
+            top_alternatives (int): Number of alternative suggestions to include
+            
+        Returns:
+            list: One meal plan per user, identical to predict_meals
+            
+        Raises:
+            ValueError, TypeError: If any profile cannot be preprocessed (unlike
+                predict_meals, which returns None for that user)
+        """
+        missing = {col for user in users for col in self.vectorizer.missing_categoricals(user)}
+        for col in sorted(missing):
+            self._report(f"⚠️  Warning: Column '{col}' not found in user data, using 'unknown'", logging.WARNING)
+        meal_probabilities = self.boosters.predict_proba(self.vectorizer.transform(list(users)))
+        return [self._meal_plan(meal_probabilities, row, show_alternatives, top_alternatives)
+                for row in range(len(users))]
+    
+    def _meal_plan(self, meal_probabilities, row, show_alternatives, top_alternatives):
+        """Meal plan dict for one row of the per-meal probabilities"""
+        meal_plan = {"meal_plan": []}
+        
+        for meal_type in ['breakfast', 'lunch', 'dinner']:
+            probabilities = meal_probabilities[meal_type][row]
+            dishes = self.dishes[meal_type]
+            ranked = self.top_k(probabilities, top_alternatives + 1 if show_alternatives else 1)
+            main_pred = dishes[ranked[0]]
+            
+            meal_info = {
+                "meal": meal_type,
+                "recommended": main_pred,
+                "foods": self.expand_meal(main_pred)
+            }
+            
+            # Add alternatives if requested
+            if show_alternatives:
+                alternatives = []
+                
+                # Get top alternatives (excluding the main prediction)
+                for i in ranked[1:]:
+                    alternatives.append({
+                        "dish": dishes[i],
+                        "confidence": f"{probabilities[i]:.2%}",
+                        "foods": self.expand_meal(dishes[i])
+                    })
+                
+                meal_info["alternatives"] = alternatives
+                meal_info["main_confidence"] = f"{probabilities[ranked[0]]:.2%}"
+            
+            meal_plan["meal_plan"].append(meal_info)
+        
+        return meal_plan
+    
     def predict_from_json(self, json_input, output_file=None):
         """
         Generate meal plan from JSON input
@@ -191,7 +301,7 @@ class MealPredictor:
             try:
                 user_data = json.loads(json_input)
             except json.JSONDecodeError as e:
-                print(f"❌ Error parsing JSON: {e}")
+                self._report(f"❌ Error parsing JSON: {e}", logging.ERROR)
                 return None
         else:
             user_data = json_input
@@ -207,18 +317,135 @@ class MealPredictor:
             try:
                 with open(output_file, 'w') as f:
                     json.dump(meal_plan, f, indent=2)
-                print(f"✓ Meal plan saved to: {output_file}")
+                self._report(f"✓ Meal plan saved to: {output_file}")
             except Exception as e:
-                print(f"❌ Error saving to file: {e}")
+                self._report(f"❌ Error saving to file: {e}", logging.ERROR)
         
         return meal_plan
 
+    def preprocess_batch(self, users):
+        """
+        Vectorized preprocess_user_data for many users at once
+        
+        Args:
+            users (pandas.DataFrame): One row per user
+            
+        Returns:
+            numpy.ndarray: One feature row per user, in the models' column order
+        """
+        for col in self.vectorizer.missing_categoricals(users.columns):
+            self._report(f"⚠️  Warning: Column '{col}' not found in user data, using 'unknown'", logging.WARNING)
+        return self.vectorizer.transform(users)
+    
+    def predict_meals_batch(self, users, top_alternatives=3, nthread=None):
+        """
+        Score every meal model once for a whole batch of users
+        
+        Args:
+            users (pandas.DataFrame or list of dict): User information, one row per user
+            top_alternatives (int): Number of alternative suggestions per meal
+            nthread (int): XGBoost thread count for this batch (default: the predictor's)
+            
+        Returns:
+            pandas.DataFrame: One row per user with, for each meal, the
+                recommended dish and its probability, then the alternatives
+                and theirs (``<meal>_alternative_<i>[_confidence]``)
+        """
+        if not isinstance(users, pd.DataFrame):
+            users = pd.DataFrame(list(users))
+        X_users = self.preprocess_batch(users)
+        meal_probabilities = self.boosters.predict_proba(X_users, nthread)
+        
+        plans = pd.DataFrame(index=users.index)
+        if "user_id" in users.columns:
+            plans["user_id"] = users["user_id"]
+        rows = np.arange(len(users))[:, np.newaxis]
+        for meal_type in ['breakfast', 'lunch', 'dinner']:
+            probabilities = meal_probabilities[meal_type]
+            dishes = self.dishes[meal_type]
+            # highest first, ties in dish order (like predict_meals)
+            ranked = np.argsort(-probabilities, axis=1, kind="stable")[:, :top_alternatives + 1]
+            confidence = probabilities[rows, ranked]
+            plans[f"{meal_type}_recommended"] = dishes[ranked[:, 0]]
+            plans[f"{meal_type}_confidence"] = confidence[:, 0]
+            for i in range(1, top_alternatives + 1):
+                available = i < ranked.shape[1]
+                plans[f"{meal_type}_alternative_{i}"] = dishes[ranked[:, i]] if available else None
+                plans[f"{meal_type}_alternative_{i}_confidence"] = confidence[:, i] if available else np.nan
+        return plans
+    
+    @staticmethod
+    def iter_profile_chunks(source, chunk_size=100_000):
+        """Yield user profiles from a DataFrame, JSONL file or Parquet file/directory in chunks"""
+        if isinstance(source, pd.DataFrame):
+            for start in range(0, len(source), chunk_size):
+                yield source.iloc[start:start + chunk_size]
+            return
+        path = Path(source)
+        if path.suffix in (".jsonl", ".json"):
+            with pd.read_json(path, lines=True, chunksize=chunk_size) as reader:
+                yield from reader
+            return
+        try:
+            import pyarrow.parquet as pq
+        except Exception:
+            raise RuntimeError("pyarrow is required to read Parquet profiles. Install it in your environment.")
+        for shard in (sorted(path.glob("*.parquet")) if path.is_dir() else [path]):
+            for batch in pq.ParquetFile(shard).iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+    
+    def plan_meals_file(self, source, output_file, chunk_size=100_000, top_alternatives=3, nthread=None):
+        """
+        Write meal plans for every profile in ``source`` to a Parquet (or .csv) file
+        
+        Args:
+            source: DataFrame, JSONL file, or Parquet file/directory of user profiles
+            output_file (str): Output path; Parquet unless it ends in .csv
+            chunk_size (int): Profiles scored per batch, which bounds memory use
+            top_alternatives (int): Number of alternative suggestions per meal
+            nthread (int): XGBoost thread count (default: the predictor's)
+            
+        Returns:
+            int: Number of profiles written
+        """
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        as_csv = output_file.suffix == ".csv"
+        if not as_csv:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except Exception:
+                raise RuntimeError("pyarrow is required to write Parquet meal plans. Install it in your environment.")
+        
+        writer = None
+        written = 0
+        try:
+            for chunk in self.iter_profile_chunks(source, chunk_size):
+                plans = self.predict_meals_batch(chunk, top_alternatives, nthread)
+                if as_csv:
+                    plans.to_csv(output_file, mode="w" if written == 0 else "a", header=written == 0, index=False)
+                else:
+                    table = pa.Table.from_pandas(plans, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_file, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+                written += len(plans)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
 def main():
     # Get the directory where this script is located
     script_dir = Path(__file__).parent
 
     # Initialize predictor with the script's folder as model_dir
-    predictor = MealPredictor(model_dir=script_dir)
+    try:
+        predictor = MealPredictor(model_dir=script_dir)
+    except RuntimeError:
+        # the reason has already been printed
+        sys.exit(1)
 
     # Input JSON file (same folder as script)
     input_file = script_dir / "user.json"
@@ -0,0 +1,268 @@
+"""Flat-array inference engine for the workout RandomForest pipeline.
+
+``CompiledForest.from_pipeline`` flattens a fitted ``StandardScaler`` +
+``RandomForestClassifier`` pipeline into a handful of contiguous NumPy arrays
+(one node table shared by all trees). The scaler is folded into the split
+thresholds, so raw feature rows are scored by array indexing alone, with no
+sklearn validation or DataFrame handling in the loop.
+
+Scores are bit-identical to ``pipeline.predict_proba``:
+
+* sklearn compares ``float32((x - mean) / scale) <= threshold``. That is a
+  monotone function of the raw ``x``, so each split has an exact raw-space
+  cut-off ``x <= t``, found by bisecting over the ordered float64 values.
+* leaf class fractions are summed over the trees in estimator order, then
+  divided by the tree count, like ``RandomForestClassifier.predict_proba``.
+
+``compress`` trades that exactness for size and speed: it keeps fewer
+trees, caps their depth, stores thresholds as float32 and leaf fractions as
+8- or 16-bit integers.
+
+Usage:
+    forest = CompiledForest.from_pipeline(model)
+    forest.predict_proba(X)         # X: (n_rows, n_features) or one row
+    small = forest.compress(n_trees=25, max_depth=6, float32_thresholds=True, leaf_bits=8)
+    forest.save("workout_forest.npz"); CompiledForest.load("workout_forest.npz")
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+_SIGN = np.uint64(1 << 63)
+
+
+def _ordered_keys(x: np.ndarray) -> np.ndarray:
+    """Map float64 values to uint64 keys with the same ordering."""
+    bits = np.ascontiguousarray(x, dtype=np.float64).view(np.uint64)
+    return np.where(bits & _SIGN, ~bits, bits | _SIGN)
+
+
+def _from_ordered_keys(keys: np.ndarray) -> np.ndarray:
+    bits = np.where(keys & _SIGN, keys & ~_SIGN, ~keys)
+    return bits.view(np.float64)
+
+
+def fold_thresholds(thresholds: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Raw-space cut-offs equivalent to ``float32((x - mean) / scale) <= threshold``.
+
+    Returns, per split, the largest float64 ``x`` that still goes left.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    mean = np.broadcast_to(np.asarray(mean, dtype=np.float64), thresholds.shape)
+    scale = np.broadcast_to(np.asarray(scale, dtype=np.float64), thresholds.shape)
+
+    def goes_left(keys):
+        x = _from_ordered_keys(keys)
+        with np.errstate(over="ignore", invalid="ignore"):
+            scaled = ((x - mean) / scale).astype(np.float32)
+        return scaled <= thresholds
+
+    lo = np.full(thresholds.shape, _ordered_keys(np.array(-np.inf))[()], dtype=np.uint64)
+    hi = np.full(thresholds.shape, _ordered_keys(np.array(np.inf))[()], dtype=np.uint64)
+    # invariant: lo goes left (-inf always does), hi goes right unless it is +inf
+    done = goes_left(hi)
+    lo[done] = hi[done]
+    while True:
+        open_ = hi - lo > 1
+        if not open_.any():
+            break
+        mid = lo + (hi - lo) // np.uint64(2)
+        left = goes_left(mid)
+        lo = np.where(open_ & left, mid, lo)
+        hi = np.where(open_ & ~left, mid, hi)
+    return _from_ordered_keys(lo)
+
+
+class CompiledForest:
+    """A fitted scaler + random forest as flat arrays.
+
+    Nodes of all trees share one table; ``roots[t]`` is tree ``t``'s first
+    node. Leaves point to themselves, so every row takes exactly ``depth``
+    steps and a whole batch advances through all trees at once.
+    """
+
+    ARRAYS = ("roots", "feature", "threshold", "children", "missing_left", "value", "classes")
+
+    def __init__(self, roots, feature, threshold, children, missing_left, value, classes,
+                 depth: int, feature_names: Optional[Sequence[str]] = None):
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        # float32 only in compressed forests; comparisons still happen in float64
+        threshold = np.asarray(threshold)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32 if threshold.dtype == np.float32 else np.float64)
+        # children[2 * node + go_right]: left and right child side by side
+        self.children = np.ascontiguousarray(children, dtype=np.int32)
+        self.missing_left = np.ascontiguousarray(missing_left, dtype=bool)
+        # class fractions, or fractions scaled to the full range of an unsigned dtype (see compress)
+        value = np.asarray(value)
+        self.value = np.ascontiguousarray(value, dtype=value.dtype if value.dtype.kind == "u" else np.float64)
+        self.classes = np.asarray(classes)
+        self.depth = int(depth)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.n_features = len(self.feature_names) if self.feature_names is not None else int(self.feature.max()) + 1
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def value_scale(self) -> int:
+        """What a stored leaf value of 1.0 is (1 unless leaves are quantized)."""
+        return int(np.iinfo(self.value.dtype).max) if self.value.dtype.kind == "u" else 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> "CompiledForest":
+        """Compile a fitted ``Pipeline([scaler, RandomForestClassifier])`` (or a bare forest)."""
+        steps = [step for _, step in pipeline.steps] if hasattr(pipeline, "steps") else [pipeline]
+        *transforms, forest = steps
+        if not hasattr(forest, "estimators_") or not hasattr(forest, "classes_"):
+            raise ValueError("Expected a fitted RandomForestClassifier as the last step")
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        n_features = forest.n_features_in_
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if len(transforms) > 1 or any(type(step).__name__ != "StandardScaler" for step in transforms):
+            raise ValueError(f"Only a single StandardScaler can be folded, got {transforms}")
+        for scaler in transforms:
+            if scaler.mean_ is not None:
+                mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if scaler.scale_ is not None:
+                scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+        roots, feature, threshold, children, missing_left, value = [], [], [], [], [], []
+        offset = 0
+        for tree in (estimator.tree_ for estimator in forest.estimators_):
+            n = tree.node_count
+            nodes = np.arange(offset, offset + n)
+            leaf = tree.children_left == -1
+            f = np.where(leaf, 0, tree.feature)
+            roots.append(offset)
+            feature.append(f)
+            threshold.append(np.where(leaf, np.inf, fold_thresholds(tree.threshold, mean[f], scale[f])))
+            left = np.where(leaf, nodes, tree.children_left + offset)
+            right = np.where(leaf, nodes, tree.children_right + offset)
+            children.append(np.stack([left, right], axis=1).ravel())
+            missing_left.append(np.asarray(getattr(tree, "missing_go_to_left", np.zeros(n)), dtype=bool))
+            # class fractions, exactly what DecisionTreeClassifier.predict_proba returns
+            value.append(tree.value[:, 0, :forest.n_classes_])
+            offset += n
+
+        depth = max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        feature_names = getattr(pipeline, "feature_names_in_", None)
+        return cls(np.array(roots), np.concatenate(feature), np.concatenate(threshold),
+                   np.concatenate(children), np.concatenate(missing_left),
+                   np.concatenate(value), forest.classes_, depth, feature_names)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index of every row in every tree, shape ``(n_trees, n_rows)``."""
+        n = X.shape[0]
+        # feature-major copy, so feature f of row i is columns[f * n + i]
+        columns = np.ascontiguousarray(X.T).ravel()
+        rows = np.tile(np.arange(n, dtype=np.int32), self.n_trees) if n > 1 else None
+        nodes = np.repeat(self.roots, n)
+        check_missing = np.isnan(columns).any() and not self.missing_left.all()
+        for _ in range(self.depth):
+            index = self.feature.take(nodes)
+            if rows is not None:
+                index = index * n + rows
+            x = columns.take(index)
+            go_right = x > self.threshold.take(nodes)
+            if check_missing:
+                go_right |= np.isnan(x) & ~self.missing_left.take(nodes)
+            nodes = self.children.take(2 * nodes + go_right)
+        return nodes.reshape(self.n_trees, n)
+
+    def _as_matrix(self, X) -> np.ndarray:
+        if hasattr(X, "columns") and self.feature_names is not None:
+            missing = [name for name in self.feature_names if name not in X.columns]
+            if missing:
+                raise ValueError(f"Missing features: {missing}")
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows of {self.n_features} features, got shape {X.shape}")
+        return X
+
+    def predict_proba(self, X, chunk_size: int = 128) -> np.ndarray:
+        """Class probabilities, bit-identical to the source pipeline's ``predict_proba``."""
+        X = self._as_matrix(X)
+        out = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], chunk_size):
+            stop = start + chunk_size
+            # small chunks keep the node tables in cache; summing over axis 0
+            # adds the trees in estimator order, like the forest's accumulator
+            out[start:stop] = self.value[self.apply(X[start:stop])].sum(axis=0)
+        out /= self.n_trees * self.value_scale
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes.take(self.predict_proba(X).argmax(axis=1))
+
+    def compress(self, n_trees: Optional[int] = None, max_depth: Optional[int] = None,
+                 float32_thresholds: bool = False, leaf_bits: Optional[int] = None) -> "CompiledForest":
+        """A smaller, approximate copy of this forest.
+
+        Args:
+            n_trees: keep only the first ``n_trees`` trees (bootstrap trees are
+                exchangeable, so any subset is an unbiased smaller forest)
+            max_depth: turn every node at this depth into a leaf predicting
+                its class fractions; nodes below it are dropped
+            float32_thresholds: store split thresholds as float32
+            leaf_bits: store class fractions as 8- or 16-bit integers
+        """
+        if leaf_bits not in (None, 8, 16):
+            raise ValueError(f"leaf_bits must be 8 or 16, got {leaf_bits}")
+        roots = self.roots[:n_trees]
+        depth = self.depth if max_depth is None else min(self.depth, max_depth)
+        if depth < 0:
+            raise ValueError(f"max_depth must be >= 0, got {max_depth}")
+
+        # reachable nodes level by level; anything at the cap becomes a leaf
+        keep = np.zeros(self.n_nodes, dtype=bool)
+        leaf = self.children[0::2] == np.arange(self.n_nodes)
+        frontier = roots
+        for level in range(depth + 1):
+            keep[frontier] = True
+            if level == depth:
+                leaf = leaf.copy()
+                leaf[frontier] = True
+                break
+            frontier = frontier[~leaf[frontier]]
+            frontier = self.children.reshape(-1, 2)[frontier].ravel()
+
+        # renumber the kept nodes; each tree stays contiguous, root first
+        nodes = np.flatnonzero(keep)
+        new_id = np.cumsum(keep) - 1
+        children = self.children.reshape(-1, 2)[nodes]
+        children = np.where(leaf[nodes, np.newaxis], nodes[:, np.newaxis], children)
+        threshold = np.where(leaf[nodes], np.inf, self.threshold[nodes])
+        value = self.value[nodes] / self.value_scale
+        if leaf_bits:
+            dtype = np.uint8 if leaf_bits == 8 else np.uint16
+            value = np.rint(value * np.iinfo(dtype).max).astype(dtype)
+        return CompiledForest(new_id[roots], np.where(leaf[nodes], 0, self.feature[nodes]),
+                              threshold.astype(np.float32) if float32_thresholds else threshold,
+                              new_id[children].ravel(), self.missing_left[nodes], value,
+                              self.classes, depth, self.feature_names)
+
+    def save(self, path: str):
+        np.savez(path, depth=self.depth, feature_names=np.array(self.feature_names or [], dtype=str),
+                 **{name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in cls.ARRAYS}
+            names = data["feature_names"].tolist() or None
+            return cls(depth=int(data["depth"]), feature_names=names, **arrays)
@@ -0,0 +1,183 @@
+"""Precomputed goal table for the workout forest.
+
+The workout model's inputs are five low-cardinality categoricals plus age,
+height and weight (BMI is derived from the last two). ``DecisionTable.build``
+enumerates every known category combination across a grid of numeric bins,
+scores each cell centre once with the compiled forest and stores the winning
+goal plus its margin over the runner-up, one byte each.
+
+Lookups are a single array index. A row is served from the table only when
+it is on the grid (known categories, numerics inside the bins, BMI matching
+weight and height up to rounding) and the cell's margin is at least ``min_margin``;
+anything else falls back to the forest. ``evaluate`` measures how often the
+table agrees with the forest on sample traffic, which ``build`` records as the
+table's error bound.
+
+Usage:
+    table = DecisionTable.build(model.compiled, model.label_encoders)
+    goals = table.lookup(X)          # goal codes, -1 where the forest is needed
+"""
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+NUMERIC_FEATURES = ("age", "height", "weight")
+
+# extracted profiles round BMI to one decimal
+BMI_TOLERANCE = 0.051
+
+# (low, high, step) per numeric feature; age bins are centred on whole years
+DEFAULT_GRID = {
+    "age": (16.5, 69.5, 1.0),
+    "height": (140.0, 210.0, 5.0),
+    "weight": (35.0, 125.0, 5.0),
+}
+
+
+def _bmi(weight, height):
+    return weight / (height/100)**2
+
+
+class DecisionTable:
+    """Goal codes and margins for every cell of the categorical x numeric grid."""
+
+    def __init__(self, goal: np.ndarray, margin: np.ndarray, feature_names: Sequence[str],
+                 categorical: Sequence[str], grid: Dict[str, Tuple[float, float, float]],
+                 min_margin: float = 0.05, report: Optional[dict] = None):
+        self.goal = goal
+        self.margin = margin
+        self.feature_names = list(feature_names)
+        self.categorical = list(categorical)
+        self.grid = {name: tuple(float(v) for v in grid[name]) for name in NUMERIC_FEATURES}
+        self.min_margin = min_margin
+        self.report = dict(report or {})
+        self.shape = goal.shape
+        index = {name: i for i, name in enumerate(self.feature_names)}
+        self._cat_cols = [index[name] for name in self.categorical]
+        self._num_cols = [index[name] for name in NUMERIC_FEATURES]
+        self._bmi_col = index["bmi"]
+        self._lows = np.array([self.grid[name][0] for name in NUMERIC_FEATURES])
+        self._steps = np.array([self.grid[name][2] for name in NUMERIC_FEATURES])
+        self._goal_flat = self.goal.reshape(-1)
+        self._margin_flat = self.margin.reshape(-1)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.goal.nbytes + self.margin.nbytes
+
+    @staticmethod
+    def bins(low: float, high: float, step: float) -> int:
+        return int(round((high - low) / step))
+
+    @classmethod
+    def build(cls, forest, label_encoders, grid=None, min_margin: float = 0.05) -> "DecisionTable":
+        """Score every cell centre with ``forest`` (a CompiledForest)."""
+        grid = {**DEFAULT_GRID, **(grid or {})}
+        feature_names = forest.feature_names
+        categorical = [name for name in feature_names if name in label_encoders]
+        cat_sizes = [len(label_encoders[name].classes_) for name in categorical]
+        centres = [low + (np.arange(cls.bins(low, high, step)) + 0.5) * step
+                   for low, high, step in (grid[name] for name in NUMERIC_FEATURES)]
+        num_shape = tuple(len(c) for c in centres)
+        numeric = np.stack([c.ravel() for c in np.meshgrid(*centres, indexing="ij")], axis=1)
+
+        index = {name: i for i, name in enumerate(feature_names)}
+        X = np.empty((len(numeric), len(feature_names)))
+        for j, name in enumerate(NUMERIC_FEATURES):
+            X[:, index[name]] = numeric[:, j]
+        X[:, index["bmi"]] = _bmi(X[:, index["weight"]], X[:, index["height"]])
+
+        n_combos = int(np.prod(cat_sizes))
+        goal = np.empty((n_combos, len(numeric)), dtype=np.int8)
+        margin = np.empty((n_combos, len(numeric)), dtype=np.uint8)
+        for combo, codes in enumerate(np.ndindex(*cat_sizes)):
+            X[:, [index[name] for name in categorical]] = codes
+            proba = forest.predict_proba(X)
+            top2 = np.sort(proba, axis=1)[:, -2:]
+            goal[combo] = forest.classes.take(proba.argmax(axis=1))
+            # margins are stored in 1/255 steps, rounded down
+            margin[combo] = np.floor((top2[:, 1] - top2[:, 0]) * 255)
+        shape = tuple(cat_sizes) + num_shape
+        return cls(goal.reshape(shape), margin.reshape(shape), feature_names, categorical, grid, min_margin)
+
+    def lookup(self, X: np.ndarray) -> np.ndarray:
+        """Goal code per row of encoded features, or -1 where the forest must decide."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        cats = X[:, self._cat_cols]
+        nums = X[:, self._num_cols]
+        with np.errstate(invalid="ignore"):
+            bins = np.floor((nums - self._lows) / self._steps)
+            ok = (cats >= 0).all(axis=1) & (cats < self.shape[:len(self._cat_cols)]).all(axis=1)
+            ok &= (bins >= 0).all(axis=1) & (bins < self.shape[len(self._cat_cols):]).all(axis=1)
+            # the grid assumes BMI derived from weight and height
+            bmi = _bmi(X[:, self._num_cols[2]], X[:, self._num_cols[1]])
+            ok &= np.abs(X[:, self._bmi_col] - bmi) <= BMI_TOLERANCE
+        goals = np.full(len(X), -1, dtype=np.int64)
+        if ok.any():
+            cell = np.ravel_multi_index(tuple(np.concatenate([cats[ok], bins[ok]], axis=1).astype(np.intp).T),
+                                        self.shape)
+            confident = self.margin.ravel()[cell] >= self.min_margin * 255
+            goals[np.flatnonzero(ok)[confident]] = self.goal.ravel()[cell[confident]]
+        served = int((goals >= 0).sum())
+        self.hits += served
+        self.misses += len(X) - served
+        return goals
+
+    def lookup_row(self, row: Sequence[float]) -> int:
+        """``lookup`` for a single row, in plain Python (no per-call NumPy overhead)."""
+        row = row.tolist() if hasattr(row, "tolist") else list(row)
+        cell = 0
+        sizes = iter(self.shape)
+        for col in self._cat_cols:
+            size, code = next(sizes), row[col]
+            if not 0 <= code < size:
+                return self._miss()
+            cell = cell * size + int(code)
+        for col, low, step in zip(self._num_cols, self._lows.tolist(), self._steps.tolist()):
+            size, value = next(sizes), row[col]
+            # same binning as lookup; NaN fails the comparison
+            position = (value - low) / step
+            if not 0 <= position < size or not 0 <= math.floor(position) < size:
+                return self._miss()
+            cell = cell * size + math.floor(position)
+        weight, height = row[self._num_cols[2]], row[self._num_cols[1]]
+        if not abs(row[self._bmi_col] - _bmi(weight, height)) <= BMI_TOLERANCE:
+            return self._miss()
+        if self._margin_flat[cell] < self.min_margin * 255:
+            return self._miss()
+        self.hits += 1
+        return int(self._goal_flat[cell])
+
+    def _miss(self) -> int:
+        self.misses += 1
+        return -1
+
+    def evaluate(self, forest, X: np.ndarray) -> dict:
+        """Coverage and agreement with ``forest`` on sample rows ``X`` (encoded features)."""
+        X = np.asarray(X, dtype=np.float64)
+        hits, misses = self.hits, self.misses
+        goals = self.lookup(X)
+        self.hits, self.misses = hits, misses
+        served = goals >= 0
+        n = int(served.sum())
+        disagree = int((goals[served] != forest.predict(X[served])).sum()) if n else 0
+        rate = disagree / n if n else 0.0
+        # one-sided 95% Wilson upper bound on the disagreement rate
+        z = 1.645
+        upper = ((rate + z * z / (2 * n) + z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)))
+                 / (1 + z * z / n)) if n else 1.0
+        return {
+            "rows": len(X),
+            "coverage": round(n / len(X), 4) if len(X) else 0.0,
+            "agreement": round(1 - rate, 4),
+            "disagreement_upper_95": round(upper, 4),
+            "min_margin": self.min_margin,
+        }
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None, **self.report}
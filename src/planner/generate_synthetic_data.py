@@ -0,0 +1,33 @@
+"""Generate synthetic workout training data as Parquet shards
+
+Rows are produced in fixed-size chunks, so memory stays bounded however many
+rows are requested (load tests and scale-up training use 10M+).
+
+Usage:
+    python src/planner/generate_synthetic_data.py --rows 10000000 --chunk-size 1000000 --out data/synthetic_workouts
+"""
+from workout_recommender import WorkoutRecommendationModel
+import os
+import time
+import argparse
+
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), "..", "..", "data", "synthetic_workouts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic workout training data as Parquet shards")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="Rows per shard")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="Output directory for part-*.parquet")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = WorkoutRecommendationModel().write_synthetic_parquet(args.out, args.rows, args.chunk_size, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Wrote {args.rows} rows in {len(paths)} shards to {os.path.abspath(args.out)} "
+          f"({args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,54 @@
 """Small runner for WorkoutRecommendationModel
 
 This script trains the model on synthetic data, saves it to disk, and demonstrates a sample prediction.
+
+Usage:
+    python src/planner/run_workout_recommender.py                      # exhaustive grid search
+    python src/planner/run_workout_recommender.py --search halving --candidates 60 --cache-dir .cache
+    python src/planner/run_workout_recommender.py --data data/synthetic_workouts --checkpoint-dir .cache   # out of core
+    python src/planner/run_workout_recommender.py --compress-trees 25 --compress-depth 6   # smaller, approximate model
 """
 from workout_recommender import WorkoutRecommendationModel
 import os
+import argparse
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "workout_model.joblib")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Train and save the workout recommendation model")
+    parser.add_argument("--samples", type=int, default=2000, help="Synthetic training rows")
+    parser.add_argument("--search", choices=["grid", "halving"], default="grid")
+    parser.add_argument("--candidates", type=int, default=None,
+                        help="With --search halving, sample this many parameter combinations")
+    parser.add_argument("--factor", type=int, default=3, help="Successive-halving rate")
+    parser.add_argument("--cache-dir", default=None, help="Cache the preprocessed folds here")
+    parser.add_argument("--data", default=None,
+                        help="Train incrementally from Parquet shards or JSONL instead of in-memory synthetic data")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="With --data, rows read per chunk")
+    parser.add_argument("--trees-per-chunk", type=int, default=10, help="With --data, trees added per chunk")
+    parser.add_argument("--checkpoint-dir", default=None, help="With --data, checkpoint after every chunk and resume")
+    parser.add_argument("--compress", action="store_true",
+                        help="Store float32 thresholds and 8-bit leaf fractions (implied by the options below)")
+    parser.add_argument("--compress-trees", type=int, default=None, help="Keep only this many trees")
+    parser.add_argument("--compress-depth", type=int, default=None, help="Cap every tree at this depth")
+    args = parser.parse_args()
+
     model = WorkoutRecommendationModel()
-    print("Generating synthetic data...")
-    data = model.create_synthetic_data(n_samples=2000)
-    print(f"Training on {len(data)} samples")
-    results = model.train_model(data)
+    if args.data:
+        print(f"Training incrementally on {args.data}")
+        results = model.train_incremental(args.data, chunk_size=args.chunk_size,
+                                          trees_per_chunk=args.trees_per_chunk, checkpoint_dir=args.checkpoint_dir)
+        print(f"Trained {results['n_trees']} trees on {results['rows']} rows in {results['chunks']} chunks")
+    else:
+        print("Generating synthetic data...")
+        data = model.create_synthetic_data(n_samples=args.samples)
+        print(f"Training on {len(data)} samples")
+        results = model.train_model(data, search=args.search, n_candidates=args.candidates,
+                                    factor=args.factor, cache_dir=args.cache_dir)
+    if args.compress or args.compress_trees or args.compress_depth is not None:
+        print("Compressing model...")
+        model.compress_model(n_trees=args.compress_trees, max_depth=args.compress_depth)
     print("Training complete, saving model...")
     model.save_model(MODEL_PATH)
     print(f"Saved model to: {MODEL_PATH}")
@@ -1,6 +1,9 @@
+import os
+import sys
+import time
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
+from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
@@ -9,11 +12,46 @@ import json
 import warnings
 warnings.filterwarnings('ignore')
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.planner.compiled_forest import CompiledForest
+from src.planner.decision_table import DecisionTable
+
+FEATURE_COLUMNS = ['age', 'height', 'weight', 'bmi', 'gender', 'fitness_level',
+                   'activity_level', 'schedule', 'nutrition']
+
+# Hyperparameter tuning to avoid overfitting
+PARAM_GRID = {
+    'classifier__n_estimators': [50, 100, 200],
+    'classifier__max_depth': [3, 5, 7, None],
+    'classifier__min_samples_split': [2, 5, 10],
+    'classifier__min_samples_leaf': [1, 2, 4],
+    'classifier__max_features': ['sqrt', 'log2']
+}
+
+# forest settings for train_incremental (the shipped model's best grid parameters)
+INCREMENTAL_PARAMS = {
+    'max_depth': 7,
+    'min_samples_split': 2,
+    'min_samples_leaf': 1,
+    'max_features': 'sqrt',
+}
+
+
 class WorkoutRecommendationModel:
     def __init__(self):
         self.model = None
+        # flat-array copy of self.model used for prediction (see compile_model)
+        self.compiled = None
+        # optional precomputed goals over a grid of inputs (see build_decision_table)
+        self.decision_table = None
+        # held-out (X_test, y_test) of the last train_model call, for compress_model
+        self.holdout = None
         self.label_encoders = {}
         self.scaler = StandardScaler()
+        self._category_lookups = {}
         self.workout_plans = {
             'muscle_gain': ["Day 1: Push", "Day 2: Pull", "Day 3: Legs", "Day 4: Push", "Day 5: Pull", "Day 6: HIIT", "Day 7: Rest"],
             'weight_loss': ["Day 1: HIIT", "Day 2: Full Body", "Day 3: Cardio", "Day 4: Upper Body", "Day 5: Lower Body", "Day 6: Cardio", "Day 7: Rest"],
@@ -21,53 +59,112 @@ class WorkoutRecommendationModel:
             'cardio': ["Day 1: Running", "Day 2: Cycling", "Day 3: Swimming", "Day 4: HIIT", "Day 5: Dance Cardio", "Day 6: Walking", "Day 7: Rest"]
         }
     
-    def create_synthetic_data(self, n_samples=1000):
+    def create_synthetic_data(self, n_samples=1000, seed=42):
         """Create synthetic training data based on the structure shown in your datasets"""
-        np.random.seed(42)
-        
+        return self._synthetic_frame(np.random.default_rng(seed), n_samples)
+
+    def iter_synthetic_data(self, n_samples, chunk_size=100_000, seed=42):
+        """Yield synthetic data in DataFrames of at most ``chunk_size`` rows.
+
+        Each chunk has its own generator spawned from ``seed``, so the output
+        is reproducible and memory stays bounded by one chunk.
+        """
+        n_chunks = -(-n_samples // chunk_size)
+        for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+            size = min(chunk_size, n_samples - i * chunk_size)
+            yield self._synthetic_frame(np.random.default_rng(child), size)
+
+    def write_synthetic_parquet(self, out_dir, n_samples, chunk_size=1_000_000, seed=42):
+        """Write synthetic data as Parquet shards (one per chunk) and return their paths"""
+        try:
+            import pyarrow  # noqa: F401
+        except Exception:
+            raise RuntimeError("pyarrow is required to write Parquet shards. Install it in your environment.")
+
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for i, chunk in enumerate(self.iter_synthetic_data(n_samples, chunk_size, seed)):
+            path = os.path.join(out_dir, f"part-{i:05d}.parquet")
+            chunk.to_parquet(path, index=False)
+            paths.append(path)
+        return paths
+
+    def iter_training_chunks(self, source, chunk_size=100_000, columns=None):
+        """Yield a training source in DataFrames of at most ``chunk_size`` rows.
+
+        ``source`` is a DataFrame, a Parquet file, a directory of Parquet
+        shards (read in name order, see write_synthetic_parquet) or a JSONL
+        file. Only one chunk is in memory at a time.
+        """
+        if isinstance(source, pd.DataFrame):
+            for start in range(0, len(source), chunk_size):
+                chunk = source.iloc[start:start + chunk_size]
+                yield chunk[columns] if columns else chunk
+            return
+        path = os.fspath(source)
+        if path.endswith(('.jsonl', '.json')):
+            with pd.read_json(path, lines=True, chunksize=chunk_size) as reader:
+                for chunk in reader:
+                    yield chunk[[c for c in columns if c in chunk.columns]] if columns else chunk
+            return
+        try:
+            import pyarrow.parquet as pq
+        except Exception:
+            raise RuntimeError("pyarrow is required to read Parquet shards. Install it in your environment.")
+        if os.path.isdir(path):
+            paths = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.parquet'))
+        else:
+            paths = [path]
+        for shard in paths:
+            parquet = pq.ParquetFile(shard)
+            names = [c for c in columns if c in parquet.schema_arrow.names] if columns else None
+            for batch in parquet.iter_batches(batch_size=chunk_size, columns=names):
+                yield batch.to_pandas()
+
+    @staticmethod
+    def _synthetic_frame(rng, n_samples):
+        def choice(options, p=None):
+            return np.asarray(options, dtype=object)[rng.choice(len(options), n_samples, p=p)]
+
         # Generate user data
-        ages = np.random.randint(17, 70, n_samples)
-        heights = np.random.normal(170, 15, n_samples)  # cm
-        weights = np.random.normal(70, 20, n_samples)   # kg
-        
+        ages = rng.integers(17, 70, n_samples)
+        heights = rng.normal(170, 15, n_samples)  # cm
+        weights = rng.normal(70, 20, n_samples)   # kg
+
         # Calculate BMI
         bmis = weights / (heights/100)**2
-        
+
         # Generate categorical features
-        genders = np.random.choice(['male', 'female', 'other'], n_samples, p=[0.5, 0.45, 0.05])
-        fitness_levels = np.random.choice(['beginner', 'intermediate', 'advanced'], n_samples, p=[0.3, 0.5, 0.2])
-        activity_levels = np.random.choice(['sedentary', 'lightly_active', 'very_active', 'extremely_active'], n_samples, p=[0.2, 0.3, 0.4, 0.1])
-        
+        genders = choice(['male', 'female', 'other'], p=[0.5, 0.45, 0.05])
+        fitness_levels = choice(['beginner', 'intermediate', 'advanced'], p=[0.3, 0.5, 0.2])
+        activity_levels = choice(['sedentary', 'lightly_active', 'very_active', 'extremely_active'], p=[0.2, 0.3, 0.4, 0.1])
+
         # Generate schedule preferences
-        schedules = np.random.choice([
-            'morning weekdays', 'evening weekdays', '6pm weekdays + weekends', 
+        schedules = choice([
+            'morning weekdays', 'evening weekdays', '6pm weekdays + weekends',
             'weekends only', 'flexible', 'morning + evening'
-        ], n_samples)
-        
+        ])
+
         # Generate nutrition patterns
-        nutrition_patterns = np.random.choice([
-            'balanced', 'high protein, low carbs', 'low protein, high carbs', 
+        nutrition_patterns = choice([
+            'balanced', 'high protein, low carbs', 'low protein, high carbs',
             'high fat, low carbs', 'vegetarian', 'vegan'
-        ], n_samples)
-        
-        # Generate goals based on user characteristics
-        goals = []
-        for i in range(n_samples):
-            bmi = bmis[i]
-            age = ages[i]
-            fitness_level = fitness_levels[i]
-            
-            if bmi > 25 and age > 30:
-                goal = np.random.choice(['weight_loss', 'cardio'], p=[0.7, 0.3])
-            elif bmi < 20 and age < 30:
-                goal = np.random.choice(['muscle_gain', 'endurance'], p=[0.8, 0.2])
-            elif fitness_level == 'advanced':
-                goal = np.random.choice(['muscle_gain', 'endurance'], p=[0.6, 0.4])
-            else:
-                goal = np.random.choice(['muscle_gain', 'weight_loss', 'endurance', 'cardio'], p=[0.3, 0.3, 0.2, 0.2])
-            
-            goals.append(goal)
-        
+        ])
+
+        # Generate goals based on user characteristics; the first matching rule wins
+        goal_rules = [
+            ((bmis > 25) & (ages > 30), ['weight_loss', 'cardio'], [0.7, 0.3]),
+            ((bmis < 20) & (ages < 30), ['muscle_gain', 'endurance'], [0.8, 0.2]),
+            (fitness_levels == 'advanced', ['muscle_gain', 'endurance'], [0.6, 0.4]),
+            (True, ['muscle_gain', 'weight_loss', 'endurance', 'cardio'], [0.3, 0.3, 0.2, 0.2]),
+        ]
+        goals = np.empty(n_samples, dtype=object)
+        unassigned = np.ones(n_samples, dtype=bool)
+        for condition, options, p in goal_rules:
+            mask = unassigned & condition
+            goals[mask] = np.asarray(options, dtype=object)[rng.choice(len(options), mask.sum(), p=p)]
+            unassigned &= ~mask
+
         # Create DataFrame
         data = pd.DataFrame({
             'age': ages,
@@ -81,18 +178,22 @@ class WorkoutRecommendationModel:
             'nutrition': nutrition_patterns,
             'goal': goals
         })
-        
+
         return data
-    
-    def preprocess_data(self, data):
-        """Preprocess the data for training"""
+
+    def preprocess_data(self, data, impute=True):
+        """Preprocess the data for training
+
+        ``impute=False`` leaves missing numeric values as NaN, so a batch is
+        encoded exactly like each of its rows would be on its own.
+        """
         # Create a copy to avoid modifying original data
         processed_data = data.copy()
 
         # Fill missing numeric values with column median
         numeric_cols = ['age', 'height', 'weight', 'bmi']
         for col in numeric_cols:
-            if col in processed_data.columns:
+            if impute and col in processed_data.columns:
                 median = processed_data[col].median()
                 processed_data[col] = processed_data[col].fillna(median)
 
@@ -110,20 +211,8 @@ class WorkoutRecommendationModel:
                     # store classes_ so we can handle unseen categories later
                     self.label_encoders[col] = le
                 else:
-                    le = self.label_encoders[col]
-                    # For unseen categories, map them to a reserved index (len(classes_)) and extend classes_
-                    known_classes = set(le.classes_)
-                    vals = processed_data[col].astype(str).tolist()
-                    mapped = []
-                    for v in vals:
-                        if v in known_classes:
-                            mapped.append(v)
-                        else:
-                            mapped.append('__unseen__')
-                    # Temporarily fit transform by extending classes_ if needed
-                    if '__unseen__' not in le.classes_:
-                        le.classes_ = np.append(le.classes_, '__unseen__')
-                    processed_data[col] = le.transform(mapped)
+                    # Unseen categories get the reserved code, encoders are left untouched
+                    processed_data[col] = self.encode_column(col, processed_data[col])
 
         # Encode target variable if present
         y = None
@@ -134,21 +223,171 @@ class WorkoutRecommendationModel:
                 y = self.label_encoders['goal'].fit_transform(processed_data['goal'])
             else:
                 # handle unseen goal labels similarly
-                le_goal = self.label_encoders['goal']
-                vals = processed_data['goal'].astype(str).tolist()
-                known = set(le_goal.classes_)
-                mapped = [v if v in known else '__unseen__' for v in vals]
-                if '__unseen__' not in le_goal.classes_:
-                    le_goal.classes_ = np.append(le_goal.classes_, '__unseen__')
-                y = le_goal.transform(mapped)
+                y = self.encode_column('goal', processed_data['goal']).to_numpy()
 
         # Select features
-        feature_columns = [c for c in ['age', 'height', 'weight', 'bmi', 'gender', 'fitness_level',
-                                       'activity_level', 'schedule', 'nutrition'] if c in processed_data.columns]
+        feature_columns = [c for c in FEATURE_COLUMNS if c in processed_data.columns]
         X = processed_data[feature_columns]
 
         return X, y
 
+    def _category_lookup(self, col):
+        """Frozen class index, reserved unseen code and code dict for a fitted encoder."""
+        classes = self.label_encoders[col].classes_
+        cached = self._category_lookups.get(col)
+        if cached is None or cached[0] is not classes:
+            known = [c for c in classes if c != '__unseen__']
+            # '__unseen__' keeps its slot if an older model appended it to classes_
+            unseen = list(classes).index('__unseen__') if len(known) < len(classes) else len(classes)
+            cached = (classes, pd.Index(list(classes)), unseen,
+                      {str(c): code for code, c in enumerate(classes)})
+            self._category_lookups[col] = cached
+        return cached[1:]
+
+    def encode_column(self, col, values):
+        """Encode a column with the fitted encoder in one vectorized step.
+
+        Values the encoder has not seen map to the reserved ``'__unseen__'``
+        code (``len(classes_)``) without changing the encoder.
+        """
+        index, unseen, _ = self._category_lookup(col)
+        codes = index.get_indexer(values.astype(str)).astype('int64')
+        codes[codes < 0] = unseen
+        return pd.Series(codes, index=values.index, name=values.name)
+
+    def compile_model(self):
+        """Flatten the fitted pipeline into a CompiledForest used for prediction.
+
+        Predictions are bit-identical to ``self.model``; models that cannot be
+        compiled (anything but a scaler + random forest) keep using sklearn.
+        """
+        self.decision_table = None
+        if self.model is None:
+            self.compiled = None
+            return None
+        try:
+            self.compiled = CompiledForest.from_pipeline(self.model)
+        except ValueError as e:
+            print(f"⚠️ Model not compiled, using sklearn for prediction: {e}")
+            self.compiled = None
+        return self.compiled
+
+    def compress_model(self, n_trees=None, max_depth=None, float32_thresholds=True, leaf_bits=8, data=None):
+        """Replace the compiled forest with a smaller, approximate one and report the trade-off
+
+        See CompiledForest.compress for the options. Accuracy is compared on
+        ``data`` (labelled users), by default the held-out split of the last
+        train_model call, or fresh synthetic users for a loaded model. The
+        sklearn pipeline no longer matches the predictions afterwards, so it
+        is dropped; save_model and save_bundle store the compressed forest.
+        """
+        if self.compiled is None:
+            raise ValueError("Only a compiled model can be compressed (see compile_model)")
+        if data is not None:
+            X_eval, y_eval = self.preprocess_data(self._batch_frame(data), impute=False)
+        elif self.holdout is not None:
+            X_eval, y_eval = self.holdout
+        else:
+            X_eval, y_eval = self.preprocess_data(self.create_synthetic_data(n_samples=5000, seed=11), impute=False)
+        X_eval = X_eval[self.compiled.feature_names].to_numpy(dtype=float)
+        y_eval = np.asarray(y_eval)
+
+        def measure(forest):
+            # best of a few runs, batch and one row at a time
+            batch = min(self._timed(forest.predict_proba, X_eval) for _ in range(5))
+            rows = X_eval[:200]
+            single = min(self._timed(lambda: [forest.predict_proba(row) for row in rows]) for _ in range(3)) / len(rows)
+            return {'accuracy': float(accuracy_score(y_eval, forest.predict(X_eval))), 'nbytes': forest.nbytes,
+                    'n_nodes': forest.n_nodes, 'batch_ms': batch * 1e3, 'single_row_us': single * 1e6}
+
+        compressed = self.compiled.compress(n_trees, max_depth, float32_thresholds, leaf_bits)
+        before, after = measure(self.compiled), measure(compressed)
+        report = {
+            'before': before,
+            'after': after,
+            'rows': len(X_eval),
+            'accuracy_change': after['accuracy'] - before['accuracy'],
+            'agreement': float((compressed.predict(X_eval) == self.compiled.predict(X_eval)).mean()),
+            'size_ratio': before['nbytes'] / after['nbytes'],
+            'batch_speedup': before['batch_ms'] / after['batch_ms'],
+            'single_row_speedup': before['single_row_us'] / after['single_row_us'],
+        }
+        print(f"✓ Compressed forest: {before['n_nodes']} -> {after['n_nodes']} nodes, "
+              f"{before['nbytes'] / 1e3:.0f} -> {after['nbytes'] / 1e3:.0f} KB ({report['size_ratio']:.1f}x smaller)")
+        print(f"  Accuracy on {len(X_eval)} held-out rows: {before['accuracy']:.4f} -> {after['accuracy']:.4f} "
+              f"({report['accuracy_change']:+.4f}), {report['agreement']:.2%} of predictions unchanged")
+        print(f"  Latency: batch {before['batch_ms']:.1f} -> {after['batch_ms']:.1f} ms "
+              f"({report['batch_speedup']:.1f}x), single row {before['single_row_us']:.0f} -> "
+              f"{after['single_row_us']:.0f} us ({report['single_row_speedup']:.1f}x)")
+        self.compiled = compressed
+        self.model = None
+        self.decision_table = None
+        return report
+
+    @staticmethod
+    def _timed(fn, *args):
+        start = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - start
+
+    def build_decision_table(self, grid=None, min_margin=0.05, sample=None):
+        """Precompute goals over a grid of inputs; the forest covers everything else
+
+        See DecisionTable. The table's agreement with the forest is measured on
+        ``sample`` (users, synthetic traffic by default) and kept in its report.
+        """
+        if self.compiled is None:
+            raise ValueError("The decision table is built from the compiled model (see compile_model)")
+        table = DecisionTable.build(self.compiled, self.label_encoders, grid, min_margin)
+        if sample is None:
+            sample = self.create_synthetic_data(n_samples=20000, seed=7)
+        sample = self._batch_frame(sample).drop(columns=['goal'], errors='ignore')
+        X_sample, _ = self.preprocess_data(sample, impute=False)
+        table.report = table.evaluate(self.compiled, X_sample[self.compiled.feature_names].to_numpy(dtype=float))
+        print(f"✓ Decision table: {table.goal.size} cells, {table.nbytes / 1e6:.1f} MB, "
+              f"serves {table.report['coverage']:.1%} of the sample at {table.report['agreement']:.2%} agreement")
+        self.decision_table = table
+        return table
+
+    def _goal_codes(self, X):
+        """Encoded goal per feature row: from the decision table where possible, else the forest"""
+        if self.decision_table is None:
+            return self.compiled.predict(X)
+        codes = self.decision_table.lookup(X)
+        rest = codes < 0
+        if rest.any():
+            codes[rest] = self.compiled.predict(X[rest])
+        return codes
+
+    def missing_features(self, user_input):
+        """Model features absent from a user dict (BMI counts as present if weight and height are)."""
+        names = (self.compiled.feature_names if self.compiled is not None else None) or FEATURE_COLUMNS
+        derivable = {'bmi'} if 'weight' in user_input and 'height' in user_input else set()
+        return [name for name in names if name not in user_input and name not in derivable]
+
+    def check_profile(self, user_input):
+        """Raise the ValueError predict_workout_plan gives a profile that lacks features."""
+        missing = self.missing_features(user_input)
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+
+    def _feature_row(self, user_input):
+        """Feature row for one user, encoded exactly as preprocess_data would."""
+        names = self.compiled.feature_names or FEATURE_COLUMNS
+        missing = [name for name in names if name not in user_input]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+        row = np.empty(len(names))
+        for i, name in enumerate(names):
+            value = user_input[name]
+            is_missing = value is None or (np.ndim(value) == 0 and pd.isna(value))
+            if name in self.label_encoders:
+                _, unseen, codes = self._category_lookup(name)
+                row[i] = codes.get('__missing__' if is_missing else str(value), unseen)
+            else:
+                row[i] = np.nan if is_missing else float(value)
+        return row
+
     def save_model(self, path):
         """Save trained model, label encoders and scaler to disk using joblib"""
         try:
@@ -161,9 +400,15 @@ class WorkoutRecommendationModel:
             'label_encoders': self.label_encoders,
             'workout_plans': self.workout_plans
         }
+        if self.model is None and self.compiled is not None:
+            # a compressed model has no matching sklearn pipeline
+            payload['compiled'] = self.compiled
         joblib.dump(payload, path)
 
     def load_model(self, path):
+        """Load a model saved by save_model, or a bundle directory written by save_bundle"""
+        if os.path.isdir(path):
+            return self.load_bundle(path)
         try:
             import joblib
         except Exception:
@@ -171,14 +416,102 @@ class WorkoutRecommendationModel:
 
         payload = joblib.load(path)
         self.model = payload.get('model')
+        self.holdout = None
         self.label_encoders = payload.get('label_encoders', {})
         self.workout_plans = payload.get('workout_plans', self.workout_plans)
+        # build the category lookups now rather than on the first request
+        self._category_lookups = {}
+        for col in self.label_encoders:
+            self._category_lookup(col)
+        self.compile_model()
+        if self.compiled is None:
+            self.compiled = payload.get('compiled')
+
+    def save_bundle(self, path, include_estimator=True):
+        """Save the compiled forest, encoders and plans as a versioned model bundle
+
+        The forest arrays are memory-mapped on load, so worker processes share
+        them. ``include_estimator`` also stores the sklearn pipeline (pickled)
+        for retraining; serving never loads it.
+        """
+        from src.service.model_bundle import BundleWriter
+
+        if self.compiled is None:
+            raise ValueError("Only a compiled model can be bundled (see compile_model)")
+        import sklearn
+
+        metadata = {
+            'feature_names': self.compiled.feature_names,
+            'depth': self.compiled.depth,
+            'n_trees': self.compiled.n_trees,
+            'encoders': sorted(self.label_encoders),
+            'sklearn_version': sklearn.__version__,
+        }
+        with BundleWriter(path, kind='workout', metadata=metadata) as bundle:
+            for name in CompiledForest.ARRAYS:
+                bundle.add_array(f"forest.{name}", getattr(self.compiled, name))
+            for col, le in self.label_encoders.items():
+                bundle.add_estimator(f"encoder.{col}", le)
+            bundle.add_document('workout_plans', self.workout_plans)
+            if self.decision_table is not None:
+                table = self.decision_table
+                bundle.add_array('decision_table.goal', table.goal)
+                bundle.add_array('decision_table.margin', table.margin)
+                bundle.add_document('decision_table', {
+                    'categorical': table.categorical, 'grid': table.grid,
+                    'min_margin': table.min_margin, 'report': table.report,
+                })
+            if include_estimator and self.model is not None:
+                import io
+                import joblib
+
+                buffer = io.BytesIO()
+                joblib.dump(self.model, buffer)
+                bundle.add_blob('estimator.joblib', buffer.getvalue())
+        return os.path.abspath(path)
+
+    def load_bundle(self, path, verify=True, load_estimator=False):
+        """Load a bundle written by save_bundle (the sklearn pipeline only if asked)"""
+        from src.service.model_bundle import BundleError, ModelBundle
+
+        bundle = ModelBundle(path, verify=verify)
+        if bundle.kind != 'workout':
+            raise BundleError(f"{path} holds a '{bundle.kind}' bundle, not a workout model")
+        meta = bundle.metadata
+        self.compiled = CompiledForest(depth=meta['depth'], feature_names=meta['feature_names'],
+                                       **{name: bundle.array(f"forest.{name}") for name in CompiledForest.ARRAYS})
+        self.label_encoders = {col: bundle.estimator(f"encoder.{col}") for col in meta['encoders']}
+        self.workout_plans = bundle.document('workout_plans')
+        self.decision_table = None
+        if 'documents/decision_table.json' in bundle.manifest['files']:
+            spec = bundle.document('decision_table')
+            self.decision_table = DecisionTable(bundle.array('decision_table.goal'),
+                                                bundle.array('decision_table.margin'),
+                                                self.compiled.feature_names, **spec)
+        self.model = None
+        self.holdout = None
+        if load_estimator:
+            import io
+            import joblib
+
+            self.model = joblib.load(io.BytesIO(bundle.blob('estimator.joblib')))
+        self._category_lookups = {}
+        for col in self.label_encoders:
+            self._category_lookup(col)
 
     def predict_proba(self, user_input):
         """Return probability distribution over goals for a single user input"""
-        if self.model is None:
+        if self.model is None and self.compiled is None:
             raise ValueError("Model not trained yet!")
 
+        self.check_profile(user_input)
+        if self.compiled is not None:
+            user = dict(user_input)
+            if 'bmi' not in user and 'weight' in user and 'height' in user:
+                user['bmi'] = user['weight'] / (user['height']/100)**2
+            probs = self.compiled.predict_proba(self._feature_row(user))[0]
+            return dict(zip(self.label_encoders['goal'].classes_[:len(probs)], probs.tolist()))
+
         user_df = pd.DataFrame([user_input])
         if 'bmi' not in user_df.columns and 'weight' in user_df.columns and 'height' in user_df.columns:
             user_df['bmi'] = user_df['weight'] / (user_df['height']/100)**2
@@ -194,13 +527,125 @@ class WorkoutRecommendationModel:
             cls = self.label_encoders['goal'].inverse_transform([pred])[0]
             return {cls: 1.0}
     
-    def train_model(self, data):
-        """Train the model with cross-validation to avoid overfitting"""
-        print("Preprocessing data...")
+    def _batch_frame(self, users):
+        """DataFrame for a batch of users (DataFrame or list of dicts), BMI filled in.
+
+        Raises the same ``ValueError`` as ``predict_workout_plan`` if any user
+        lacks a feature, naming every incomplete row, instead of scoring the
+        gap as a missing value.
+        """
+        if isinstance(users, pd.DataFrame):
+            self.check_profile(users.columns)
+            user_df = users.copy()
+        else:
+            users = list(users)
+            bad = {i: missing for i, missing in enumerate(map(self.missing_features, users)) if missing}
+            if bad:
+                rows = "; ".join(f"row {i}: {missing}" for i, missing in bad.items())
+                raise ValueError(f"Missing features: {rows}")
+            user_df = pd.DataFrame(users)
+        if 'weight' in user_df.columns and 'height' in user_df.columns:
+            computed = user_df['weight'] / (user_df['height']/100)**2
+            user_df['bmi'] = user_df['bmi'].fillna(computed) if 'bmi' in user_df.columns else computed
+        return user_df
+
+    def predict_proba_batch(self, users):
+        """Goal probabilities for a batch of users in one forest call.
+
+        Args:
+            users: DataFrame or list of user dicts
+
+        Returns:
+            DataFrame with one column per goal, aligned with ``users``
+        """
+        if self.model is None and self.compiled is None:
+            raise ValueError("Model not trained yet!")
+
+        user_df = self._batch_frame(users)
+        X_users, _ = self.preprocess_data(user_df, impute=False)
+        model = self.compiled if self.compiled is not None else self.model
+        probs = model.predict_proba(X_users)
+        classes = self.label_encoders['goal'].inverse_transform(np.arange(probs.shape[1]))
+        return pd.DataFrame(probs, index=user_df.index, columns=[str(c) for c in classes])
+
+    def predict_workout_plan_batch(self, users):
+        """Predict workout plans for a batch of users
+
+        One preprocessing pass and one forest call for the whole batch; the
+        result records match ``predict_workout_plan`` row for row.
+        """
+        required = ['gender', 'age', 'height', 'weight', 'schedule', 'nutrition']
+        user_df = self._batch_frame(users)
+
+        if self.decision_table is not None:
+            X_users, _ = self.preprocess_data(user_df, impute=False)
+            X_users = X_users[self.compiled.feature_names].to_numpy(dtype=float)
+            goals = self.label_encoders['goal'].classes_[self._goal_codes(X_users)]
+        else:
+            probs = self.predict_proba_batch(user_df)
+            # the forest predicts the most probable class, so one call gives both
+            goals = probs.columns.to_numpy()[probs.to_numpy().argmax(axis=1)]
+
+        echoed = {col: user_df[col].tolist() for col in required}
+        results = []
+        for i, goal in enumerate(goals):
+            result = {col: echoed[col][i] for col in required}
+            result["goal"] = goal
+            result["workouts"] = self.workout_plans.get(goal, self.workout_plans['muscle_gain'])
+            results.append(result)
+        return results
+
+    def _training_split(self, data, cv=5, cache_dir=None):
+        """Preprocessed train/test split plus the CV folds of the training part.
+
+        With ``cache_dir`` the result (and the fitted label encoders) is stored
+        under a hash of the data and the current encoders, so repeated
+        experiments on the same data skip preprocessing and splitting.
+        """
+        path = None
+        if cache_dir:
+            try:
+                import joblib
+            except Exception:
+                raise RuntimeError("joblib is required to cache training folds. Install it in your environment.")
+            encoders = {col: le.classes_ for col, le in sorted(self.label_encoders.items())}
+            key = joblib.hash((data, encoders, cv))
+            path = os.path.join(cache_dir, f"training_split_{key}.joblib")
+            if os.path.exists(path):
+                cached = joblib.load(path)
+                self.label_encoders = cached['label_encoders']
+                self._category_lookups = {}
+                print(f"✓ Loaded cached training folds from {path}")
+                return cached['split']
+
         X, y = self.preprocess_data(data)
-        
+
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        # the same folds GridSearchCV(cv=5) would make, computed once
+        folds = list(StratifiedKFold(n_splits=cv).split(X_train, y_train))
+        split = (X_train, X_test, y_train, y_test, folds)
+
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            joblib.dump({'split': split, 'label_encoders': self.label_encoders}, path)
+        return split
+
+    def train_model(self, data, search='grid', n_candidates=None, factor=3, cache_dir=None):
+        """Train the model with cross-validation to avoid overfitting
+
+        Args:
+            data: training DataFrame (see create_synthetic_data)
+            search: 'grid' tries every PARAM_GRID combination on all folds;
+                'halving' runs successive halving, giving all candidates a
+                small sample and only the best 1/factor of them more data
+            n_candidates: with 'halving', sample this many combinations from
+                the grid instead of starting from all of them (compute budget)
+            factor: halving rate for 'halving' search
+            cache_dir: directory to cache the preprocessed split and folds in
+        """
+        print("Preprocessing data...")
+        X_train, X_test, y_train, y_test, folds = self._training_split(data, cache_dir=cache_dir)
         
         # Create pipeline with scaling and random forest
         pipeline = Pipeline([
@@ -208,32 +653,37 @@ class WorkoutRecommendationModel:
             ('classifier', RandomForestClassifier(random_state=42))
         ])
         
-        # Hyperparameter tuning to avoid overfitting
-        param_grid = {
-            'classifier__n_estimators': [50, 100, 200],
-            'classifier__max_depth': [3, 5, 7, None],
-            'classifier__min_samples_split': [2, 5, 10],
-            'classifier__min_samples_leaf': [1, 2, 4],
-            'classifier__max_features': ['sqrt', 'log2']
-        }
-        
-        print("Performing hyperparameter tuning...")
-        grid_search = GridSearchCV(
-            pipeline, 
-            param_grid, 
-            cv=5, 
-            scoring='accuracy',
-            n_jobs=-1,
-            verbose=1
-        )
-        
-        grid_search.fit(X_train, y_train)
-        self.model = grid_search.best_estimator_
+        print(f"Performing hyperparameter tuning ({search} search)...")
+        if search == 'grid':
+            search_cv = GridSearchCV(pipeline, PARAM_GRID, cv=folds, scoring='accuracy', n_jobs=-1, verbose=1)
+        elif search == 'halving':
+            from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+            from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV
+
+            if n_candidates:
+                search_cv = HalvingRandomSearchCV(pipeline, PARAM_GRID, n_candidates=n_candidates, factor=factor,
+                                                  cv=folds, scoring='accuracy', random_state=42, n_jobs=-1, verbose=1)
+            else:
+                search_cv = HalvingGridSearchCV(pipeline, PARAM_GRID, factor=factor, cv=folds,
+                                                scoring='accuracy', random_state=42, n_jobs=-1, verbose=1)
+        else:
+            raise ValueError(f"Unknown search {search!r}, expected 'grid' or 'halving'")
+
+        search_cv.fit(X_train, y_train)
+        self.model = search_cv.best_estimator_
+        self.compile_model()
+        self.holdout = (X_test, y_test)
         
-        print(f"Best parameters: {grid_search.best_params_}")
+        print(f"Best parameters: {search_cv.best_params_}")
         
-        # Cross-validation to check for overfitting
-        cv_scores = cross_val_score(self.model, X_train, y_train, cv=5, scoring='accuracy')
+        # Cross-validation to check for overfitting: the search already scored
+        # the best parameters on every fold, so reuse those scores
+        results = search_cv.cv_results_
+        best = search_cv.best_index_
+        cv_scores = np.array([results[f'split{i}_test_score'][best] for i in range(len(folds))])
+        if 'n_resources' in results:
+            print(f"Scored on {results['n_resources'][best]} of {len(X_train)} training samples "
+                  f"({len(results['params'])} candidate evaluations)")
         print(f"Cross-validation scores: {cv_scores}")
         print(f"Mean CV accuracy: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
         
@@ -262,27 +712,138 @@ class WorkoutRecommendationModel:
             'cv_accuracy': cv_scores.mean(),
             'test_accuracy': test_accuracy,
             'train_accuracy': train_accuracy,
-            'overfitting_gap': train_accuracy - test_accuracy
+            'overfitting_gap': train_accuracy - test_accuracy,
+            'best_params': search_cv.best_params_
         }
     
+    def train_incremental(self, source, chunk_size=100_000, trees_per_chunk=10, params=None,
+                          holdout_size=0.1, checkpoint_dir=None):
+        """Train on data that does not fit in memory, one chunk at a time
+
+        A first pass reads only the categorical columns to fit the label
+        encoders. The second pass grows one RandomForest with ``warm_start``:
+        every chunk adds ``trees_per_chunk`` trees fitted on that chunk alone.
+        A share of the first chunk is held out and scored after every chunk.
+
+        Args:
+            source: anything iter_training_chunks reads (Parquet, JSONL, DataFrame)
+            chunk_size: rows per chunk, which bounds memory use
+            trees_per_chunk: trees added per chunk
+            params: RandomForestClassifier parameters (default INCREMENTAL_PARAMS)
+            holdout_size: fraction of the first chunk kept out of training
+            checkpoint_dir: save progress here after every chunk; a later call
+                with the same source and chunk_size resumes from it
+        """
+        try:
+            import joblib
+        except Exception:
+            raise RuntimeError("joblib is required for incremental training. Install it in your environment.")
+
+        checkpoint = os.path.join(checkpoint_dir, 'workout_incremental.joblib') if checkpoint_dir else None
+        if checkpoint and os.path.exists(checkpoint):
+            state = joblib.load(checkpoint)
+            if state['chunk_size'] != chunk_size:
+                raise ValueError(f"{checkpoint} was written with chunk_size={state['chunk_size']}, not {chunk_size}")
+            print(f"✓ Resuming from {checkpoint} after {state['chunks_done']} chunks ({state['rows_seen']} rows)")
+        else:
+            state = {'chunk_size': chunk_size, 'chunks_done': 0, 'rows_seen': 0,
+                     'model': None, 'holdout': None, 'label_encoders': self._stream_encoders(source, chunk_size)}
+        self.label_encoders = state['label_encoders']
+        self._category_lookups = {}
+        pipeline = state['model']
+        n_classes = len(self.label_encoders['goal'].classes_)
+
+        start = time.perf_counter()
+        for i, chunk in enumerate(self.iter_training_chunks(source, chunk_size)):
+            if i < state['chunks_done']:
+                continue
+            X, y = self.preprocess_data(chunk)
+            if state['holdout'] is None:
+                X, X_hold, y, y_hold = train_test_split(X, y, test_size=holdout_size, random_state=42)
+                state['holdout'] = (X_hold, y_hold)
+            if pipeline is None:
+                # trees ignore scaling, so fitting the scaler on the first chunk is enough
+                forest = RandomForestClassifier(**{**INCREMENTAL_PARAMS, **(params or {})},
+                                                n_estimators=0, warm_start=True, random_state=42)
+                pipeline = Pipeline([('scaler', StandardScaler().fit(X)), ('classifier', forest)])
+            scaler, forest = pipeline.named_steps['scaler'], pipeline.named_steps['classifier']
+
+            # goals missing from this chunk get a zero-weight row each, so
+            # every tree is fitted against the full list of classes
+            X_fit, y_fit = scaler.transform(X), np.asarray(y)
+            weight = np.ones(len(y_fit))
+            absent = np.setdiff1d(np.arange(n_classes), y_fit)
+            if len(absent):
+                X_fit = np.vstack([X_fit, np.repeat(X_fit[:1], len(absent), axis=0)])
+                y_fit = np.concatenate([y_fit, absent])
+                weight = np.concatenate([weight, np.zeros(len(absent))])
+            forest.n_estimators += trees_per_chunk
+            forest.fit(X_fit, y_fit, sample_weight=weight)
+
+            state.update(model=pipeline, chunks_done=i + 1, rows_seen=state['rows_seen'] + len(X))
+            X_hold, y_hold = state['holdout']
+            accuracy = pipeline.score(X_hold, y_hold)
+            print(f"✓ Chunk {i + 1}: {len(X)} rows, {forest.n_estimators} trees, "
+                  f"{state['rows_seen']} rows seen, holdout accuracy {accuracy:.4f} "
+                  f"({time.perf_counter() - start:.1f}s)")
+            if checkpoint:
+                os.makedirs(checkpoint_dir, exist_ok=True)
+                joblib.dump(state, checkpoint + '.tmp')
+                os.replace(checkpoint + '.tmp', checkpoint)
+
+        if pipeline is None:
+            raise ValueError("No training data in source")
+        self.model = pipeline
+        self.compile_model()
+        self.holdout = state['holdout']
+        return {
+            'chunks': state['chunks_done'],
+            'rows': state['rows_seen'],
+            'n_trees': pipeline.named_steps['classifier'].n_estimators,
+            'holdout_accuracy': pipeline.score(*state['holdout']),
+        }
+
+    def _stream_encoders(self, source, chunk_size):
+        """Label encoders fitted on every category in ``source``, one chunk at a time"""
+        columns = ['gender', 'fitness_level', 'activity_level', 'schedule', 'nutrition', 'goal']
+        seen = {col: set() for col in columns}
+        for chunk in self.iter_training_chunks(source, chunk_size, columns=columns):
+            for col in columns:
+                if col in chunk.columns:
+                    seen[col].update(chunk[col].fillna('__missing__').unique().tolist())
+        if not seen['goal']:
+            raise ValueError("Training data needs a 'goal' column")
+        return {col: LabelEncoder().fit(sorted(values)) for col, values in seen.items() if values}
+
     def predict_workout_plan(self, user_input):
         """Predict workout plan for a new user"""
-        if self.model is None:
+        if self.model is None and self.compiled is None:
             raise ValueError("Model not trained yet!")
         
-        # Convert user input to DataFrame
-        user_df = pd.DataFrame([user_input])
-        
-        # Calculate BMI if not provided
-        if 'bmi' not in user_df.columns:
-            user_df['bmi'] = user_df['weight'] / (user_df['height']/100)**2
-        
-        # Preprocess
-        X_user, _ = self.preprocess_data(user_df)
-        
-        # Predict
-        goal_encoded = self.model.predict(X_user)[0]
-        goal = self.label_encoders['goal'].inverse_transform([goal_encoded])[0]
+        self.check_profile(user_input)
+        if self.compiled is not None:
+            user = dict(user_input)
+            if 'bmi' not in user:
+                user['bmi'] = user['weight'] / (user['height']/100)**2
+            row = self._feature_row(user)
+            goal_encoded = self.decision_table.lookup_row(row) if self.decision_table is not None else -1
+            if goal_encoded < 0:
+                goal_encoded = self.compiled.predict(row)[0]
+            goal = self.label_encoders['goal'].classes_[goal_encoded]
+        else:
+            # Convert user input to DataFrame
+            user_df = pd.DataFrame([user_input])
+
+            # Calculate BMI if not provided
+            if 'bmi' not in user_df.columns:
+                user_df['bmi'] = user_df['weight'] / (user_df['height']/100)**2
+
+            # Preprocess
+            X_user, _ = self.preprocess_data(user_df)
+
+            # Predict
+            goal_encoded = self.model.predict(X_user)[0]
+            goal = self.label_encoders['goal'].inverse_transform([goal_encoded])[0]
         
         # Get workout plan
         workout_plan = self.workout_plans.get(goal, self.workout_plans['muscle_gain'])
@@ -0,0 +1,117 @@
+"""Request micro-batching for asyncio services.
+
+Concurrent callers ``await batcher.submit(item)``; a single worker task
+collects items until ``max_batch_size`` is reached or ``max_wait_ms`` has
+passed since the first one arrived, then runs the batch handler once in a
+thread so the event loop keeps accepting requests meanwhile.
+"""
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[List[Any]], List[Any]]
+
+
+class MicroBatcher:
+    """Group concurrent ``submit`` calls into batches for ``handler``.
+
+    ``handler`` takes a list of items and returns a list of results in the
+    same order. A result that is an ``Exception`` instance is raised to that
+    item's caller only; an exception raised by the handler fails the batch.
+    """
+
+    def __init__(self, handler: BatchHandler, max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 name: Optional[str] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name or getattr(handler, "__name__", "batcher")
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+
+    async def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(), name=f"{self.name}-batcher")
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, item: Any) -> Any:
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # take whatever is already queued without waiting
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # callers that gave up (client disconnect) are skipped
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.handler, items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                logger.exception(f"Batch of {len(items)} failed in {self.name}")
+                results = [e] * len(items)
+            self.busy_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
@@ -0,0 +1,217 @@
+"""Async HTTP service for profile extraction, meal and workout prediction.
+
+Each endpoint feeds a ``MicroBatcher``, so concurrent requests reach
+``FitnessProfileExtractor``, ``MealPredictor`` and
+``WorkoutRecommendationModel`` as batches instead of one row at a time.
+
+Endpoints (JSON in, JSON out):
+    POST /extract   {"text": "..."}     or {"texts": [...]}     -> {"profile": {...}} / {"profiles": [...]}
+    POST /meals     {"profile": {...}}  or {"profiles": [...]}  -> {"meal_plan": {...}} / {"meal_plans": [...]}
+    POST /workouts  {"profile": {...}}  or {"profiles": [...]}  -> {"workout_plan": {...}} / {"workout_plans": [...]}
+    GET  /health
+
+Usage:
+    python src/service/http_service.py --port 8080 --max-batch-size 64 --max-wait-ms 5
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import functools
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from src.service.batching import MicroBatcher
+from src.service.model_registry import (DEFAULT_MEAL_MODEL_DIR, DEFAULT_WORKOUT_MODEL, get_meal_predictor,
+                                        get_workout_model, registry)
+from src.extractions.fitness_extractor import get_extractor
+
+logger = logging.getLogger(__name__)
+
+
+def _import_aiohttp_web():
+    try:
+        from aiohttp import web
+    except Exception:
+        raise RuntimeError("aiohttp is required for the HTTP service. Install it in your environment.")
+    return web
+
+
+class RequestError(ValueError):
+    """A problem with one request's input (reported as HTTP 400)."""
+
+
+# NaN and Infinity are not JSON; refuse them rather than send them to clients
+dumps = functools.partial(json.dumps, allow_nan=False)
+
+
+def extract_profiles(texts: List[str]) -> List[Dict[str, Any]]:
+    # columnar batch extraction; a text that fails yields an empty profile
+    return get_extractor().extract_profile_batch(texts).to_dicts()
+
+
+class ScoringService:
+    """Owns the models and one micro-batcher per endpoint."""
+
+    def __init__(self, meal_model_dir: Optional[str] = DEFAULT_MEAL_MODEL_DIR,
+                 workout_model_path: Optional[str] = DEFAULT_WORKOUT_MODEL,
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.meal_model_dir = meal_model_dir
+        self.workout_model_path = workout_model_path
+        self.meal_predictor = None
+        self.workout_model = None
+        self.batchers = {
+            "extract": MicroBatcher(extract_profiles, max_batch_size, max_wait_ms, name="extract"),
+            "meals": MicroBatcher(self.meal_plans, max_batch_size, max_wait_ms, name="meals"),
+            "workouts": MicroBatcher(self.workout_plans, max_batch_size, max_wait_ms, name="workouts"),
+        }
+
+    def load_models(self):
+        """Load (and warm up) the shared models; a model that fails to load disables its endpoint."""
+        get_extractor()
+        if self.meal_model_dir:
+            try:
+                self.meal_predictor = get_meal_predictor(self.meal_model_dir)
+            except Exception as e:
+                logger.error(f"Meal models unavailable: {e}")
+        if self.workout_model_path:
+            try:
+                self.workout_model = get_workout_model(self.workout_model_path)
+            except Exception as e:
+                logger.error(f"Workout model unavailable: {e}")
+
+    def meal_plans(self, profiles: List[Dict[str, Any]]) -> List[Any]:
+        try:
+            return self.meal_predictor.predict_meal_plans(profiles)
+        except (KeyError, ValueError, TypeError):
+            # a bad profile fails the whole batch; score row by row to isolate it
+            pass
+        results = []
+        for profile in profiles:
+            plan = self.meal_predictor.predict_meals(profile)
+            results.append(plan if plan is not None else RequestError("Meal prediction failed for this profile"))
+        return results
+
+    def workout_plans(self, profiles: List[Dict[str, Any]]) -> List[Any]:
+        # incomplete profiles fail on their own, whatever else is in the batch
+        results: List[Any] = [None] * len(profiles)
+        valid = []
+        for i, profile in enumerate(profiles):
+            try:
+                self.workout_model.check_profile(profile)
+                valid.append(i)
+            except ValueError as e:
+                results[i] = RequestError(f"Invalid profile: {e!r}")
+        if not valid:
+            return results
+        try:
+            plans = self.workout_model.predict_workout_plan_batch([profiles[i] for i in valid])
+        except (KeyError, ValueError, TypeError):
+            # a bad value fails the whole batch; score row by row to isolate it
+            plans = []
+            for i in valid:
+                try:
+                    plans.append(self.workout_model.predict_workout_plan(profiles[i]))
+                except (KeyError, ValueError, TypeError) as e:
+                    plans.append(RequestError(f"Invalid profile: {e!r}"))
+        for i, plan in zip(valid, plans):
+            results[i] = plan
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "models": {
+                "extract": True,
+                "meals": self.meal_predictor is not None,
+                "workouts": self.workout_model is not None,
+            },
+            "batchers": {name: batcher.stats() for name, batcher in self.batchers.items()},
+            "loaded_models": registry.stats(),
+        }
+
+    async def submit_all(self, name: str, items: List[Any]) -> List[Any]:
+        return await asyncio.gather(*(self.batchers[name].submit(item) for item in items))
+
+    def create_app(self):
+        web = _import_aiohttp_web()
+        app = web.Application(client_max_size=4 * 1024 * 1024)
+
+        async def on_startup(app):
+            await asyncio.get_running_loop().run_in_executor(None, self.load_models)
+            for batcher in self.batchers.values():
+                await batcher.start()
+
+        async def on_cleanup(app):
+            for batcher in self.batchers.values():
+                await batcher.close()
+
+        def respond(data: Any, status: int = 200):
+            try:
+                return web.json_response(data, status=status, dumps=dumps)
+            except ValueError as e:
+                logger.error(f"Response is not valid JSON: {e}")
+                return web.json_response({"error": "Prediction produced a non-JSON value"}, status=500)
+
+        def endpoint(name: str, single: str, many: str, out_single: str, out_many: str, item_type: type):
+            async def handle(request):
+                if not self.stats()["models"][name]:
+                    return respond({"error": f"{name} model is not loaded"}, status=503)
+                try:
+                    body = await request.json()
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    return respond({"error": "Body must be JSON"}, status=400)
+                if not isinstance(body, dict) or (single in body) == (many in body):
+                    return respond({"error": f"Send exactly one of '{single}' or '{many}'"}, status=400)
+                items = [body[single]] if single in body else body[many]
+                if not isinstance(items, list) or not all(isinstance(item, item_type) for item in items):
+                    return respond({"error": f"'{single}' must be a {item_type.__name__}"}, status=400)
+                try:
+                    results = await self.submit_all(name, items)
+                except RequestError as e:
+                    return respond({"error": str(e)}, status=400)
+                except Exception as e:
+                    logger.exception(f"{name} request failed")
+                    return respond({"error": str(e)}, status=500)
+                if single in body:
+                    return respond({out_single: results[0]})
+                return respond({out_many: results})
+            return handle
+
+        async def health(request):
+            return respond(self.stats())
+
+        app.on_startup.append(on_startup)
+        app.on_cleanup.append(on_cleanup)
+        app.router.add_post("/extract", endpoint("extract", "text", "texts", "profile", "profiles", str))
+        app.router.add_post("/meals", endpoint("meals", "profile", "profiles", "meal_plan", "meal_plans", dict))
+        app.router.add_post("/workouts", endpoint("workouts", "profile", "profiles", "workout_plan", "workout_plans", dict))
+        app.router.add_get("/health", health)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve profile extraction, meal and workout prediction over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Largest batch handed to a model")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Longest a request waits for its batch to fill")
+    parser.add_argument("--meal-model-dir", default=DEFAULT_MEAL_MODEL_DIR, help="Pickle directory or meal bundle")
+    parser.add_argument("--workout-model", default=DEFAULT_WORKOUT_MODEL, help="joblib file or workout bundle")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    web = _import_aiohttp_web()
+    service = ScoringService(args.meal_model_dir, args.workout_model, args.max_batch_size, args.max_wait_ms)
+    print(f"✓ Serving on http://{args.host}:{args.port} "
+          f"(batch size {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    web.run_app(service.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Versioned on-disk bundle for serving models.
+
+A bundle is a directory with a ``manifest.json`` (format, schema version,
+kind, metadata and a SHA-256 checksum for every file) and the files it lists:
+
+    manifest.json
+    arrays/<name>.npy          NumPy arrays, opened memory-mapped read-only
+    documents/<name>.json      small JSON documents (plans, class lists, ...)
+    blobs/<name>               opaque bytes (e.g. a native XGBoost model)
+    estimators/<name>.json     a fitted LabelEncoder/StandardScaler, rebuilt
+                               from its parameters and arrays (no pickle)
+
+Arrays are memory-mapped, so every worker process that opens the same
+bundle shares one read-only copy through the page cache instead of
+unpickling its own.
+
+Usage:
+    python src/service/model_bundle.py --out models      # convert the shipped pickles
+    python src/service/model_bundle.py --decision-table  # ... and precompute the workout goal table
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import importlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = "healthcast-model-bundle"
+SCHEMA_VERSION = 1
+MANIFEST = "manifest.json"
+
+# estimators that can be stored as parameters + arrays instead of a pickle
+ESTIMATOR_CLASSES = {
+    "sklearn.preprocessing.LabelEncoder",
+    "sklearn.preprocessing.StandardScaler",
+}
+
+
+class BundleError(ValueError):
+    """A bundle that is missing, corrupt or written by a newer schema."""
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_bundle(path) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class BundleWriter:
+    """Build a bundle in a temporary directory and move it into place on ``close``."""
+
+    def __init__(self, path, kind: str, metadata: Optional[Dict[str, Any]] = None):
+        self.path = os.path.abspath(path)
+        self.kind = kind
+        self.metadata = dict(metadata or {})
+        self._tmp = f"{self.path}.tmp-{os.getpid()}"
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        os.makedirs(self._tmp)
+        self._files = {}
+
+    def _target(self, relpath: str) -> str:
+        target = os.path.join(self._tmp, relpath)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        self._files[relpath] = None
+        return target
+
+    def add_array(self, name: str, array) -> str:
+        array = np.asarray(array)
+        if array.dtype.hasobject:
+            raise BundleError(f"Array '{name}' has dtype object; store it as a document")
+        relpath = f"arrays/{name}.npy"
+        np.save(self._target(relpath), np.ascontiguousarray(array), allow_pickle=False)
+        return relpath
+
+    def add_document(self, name: str, document) -> str:
+        relpath = f"documents/{name}.json"
+        with open(self._target(relpath), "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, default=_json_value)
+        return relpath
+
+    def add_blob(self, name: str, data: bytes) -> str:
+        relpath = f"blobs/{name}"
+        with open(self._target(relpath), "wb") as f:
+            f.write(data)
+        return relpath
+
+    def add_estimator(self, name: str, estimator) -> str:
+        """Store a fitted estimator from ``ESTIMATOR_CLASSES`` as parameters and arrays."""
+        cls = type(estimator)
+        qualname = f"{cls.__module__.split('._')[0]}.{cls.__name__}"
+        if qualname not in ESTIMATOR_CLASSES:
+            raise BundleError(f"Cannot store {qualname} without pickling")
+        state = {"class": qualname, "params": estimator.get_params(), "values": {}, "arrays": {}, "objects": {}}
+        for attr, value in vars(estimator).items():
+            if not attr.endswith("_") or attr.startswith("_"):
+                continue
+            if isinstance(value, np.ndarray) and value.dtype.hasobject:
+                state["objects"][attr] = value.tolist()
+            elif isinstance(value, np.ndarray):
+                state["arrays"][attr] = self.add_array(f"{name}.{attr}", value)
+            else:
+                state["values"][attr] = value
+        relpath = f"estimators/{name}.json"
+        with open(self._target(relpath), "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, default=_json_value)
+        return relpath
+
+    def close(self) -> str:
+        files = {}
+        for relpath in sorted(self._files):
+            full = os.path.join(self._tmp, relpath)
+            files[relpath] = {"sha256": _sha256(full), "bytes": os.path.getsize(full)}
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "schema_version": SCHEMA_VERSION,
+            "kind": self.kind,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "metadata": self.metadata,
+            "files": files,
+        }
+        with open(os.path.join(self._tmp, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, default=_json_value)
+
+        # swap the finished bundle in; readers never see a half-written one
+        old = f"{self.path}.old-{os.getpid()}"
+        if os.path.exists(self.path):
+            os.replace(self.path, old)
+        os.replace(self._tmp, self.path)
+        shutil.rmtree(old, ignore_errors=True)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+class ModelBundle:
+    """Read access to a bundle written by ``BundleWriter``."""
+
+    def __init__(self, path, verify: bool = True):
+        self.path = os.path.abspath(path)
+        manifest_path = os.path.join(self.path, MANIFEST)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            raise BundleError(f"No {MANIFEST} in {self.path}")
+        except json.JSONDecodeError as e:
+            raise BundleError(f"Corrupt {manifest_path}: {e}")
+        if self.manifest.get("format") != BUNDLE_FORMAT:
+            raise BundleError(f"{self.path} is not a {BUNDLE_FORMAT}")
+        if self.manifest.get("schema_version", 0) > SCHEMA_VERSION:
+            raise BundleError(f"{self.path} has schema version {self.manifest['schema_version']}, "
+                              f"this code reads up to {SCHEMA_VERSION}")
+        if verify:
+            self.verify()
+
+    @property
+    def kind(self) -> str:
+        return self.manifest["kind"]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.manifest.get("metadata", {})
+
+    def verify(self):
+        """Check every listed file against its manifest checksum."""
+        for relpath, info in self.manifest["files"].items():
+            full = os.path.join(self.path, relpath)
+            if not os.path.isfile(full) or _sha256(full) != info["sha256"]:
+                raise BundleError(f"Checksum mismatch for {relpath} in {self.path}")
+
+    def _file(self, relpath: str) -> str:
+        if relpath not in self.manifest["files"]:
+            raise BundleError(f"{relpath} is not listed in the manifest of {self.path}")
+        return os.path.join(self.path, relpath)
+
+    def array(self, name: str, mmap: bool = True) -> np.ndarray:
+        return np.load(self._file(f"arrays/{name}.npy"), mmap_mode="r" if mmap else None, allow_pickle=False)
+
+    def document(self, name: str):
+        with open(self._file(f"documents/{name}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def blob(self, name: str) -> bytes:
+        with open(self._file(f"blobs/{name}"), "rb") as f:
+            return f.read()
+
+    def estimator(self, name: str):
+        with open(self._file(f"estimators/{name}.json"), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state["class"] not in ESTIMATOR_CLASSES:
+            raise BundleError(f"Refusing to build {state['class']} from {self.path}")
+        module, cls_name = state["class"].rsplit(".", 1)
+        estimator = getattr(importlib.import_module(module), cls_name)(**state["params"])
+        for attr, value in state["values"].items():
+            setattr(estimator, attr, value)
+        for attr, value in state["objects"].items():
+            setattr(estimator, attr, np.array(value, dtype=object))
+        for attr, relpath in state["arrays"].items():
+            # estimator arrays are tiny; only the large model arrays are worth mapping
+            estimator.__dict__[attr] = np.load(self._file(relpath), allow_pickle=False)
+        return estimator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the pickled models into versioned bundles")
+    parser.add_argument("--out", default=os.path.join(PROJECT_ROOT, "models"), help="Directory for the bundles")
+    parser.add_argument("--workout-model", default=os.path.join(PROJECT_ROOT, "src", "planner", "workout_model.joblib"))
+    parser.add_argument("--meal-model-dir", default=os.path.join(PROJECT_ROOT, "src", "nutritions_model"))
+    parser.add_argument("--decision-table", action="store_true",
+                        help="Precompute the workout decision table into the bundle (a few minutes)")
+    parser.add_argument("--min-margin", type=float, default=0.05,
+                        help="Smallest top-1/top-2 probability gap the table answers on its own")
+    args = parser.parse_args()
+
+    from src.planner.workout_recommender import WorkoutRecommendationModel
+    from src.nutritions_model.predict_meals import MealPredictor
+
+    workout = WorkoutRecommendationModel()
+    workout.load_model(args.workout_model)
+    if args.decision_table:
+        workout.build_decision_table(min_margin=args.min_margin)
+    path = workout.save_bundle(os.path.join(args.out, "workout"))
+    start = time.perf_counter()
+    WorkoutRecommendationModel().load_model(path)
+    print(f"✓ Workout bundle written to {path} (loads in {time.perf_counter() - start:.3f}s)")
+
+    meals = MealPredictor(model_dir=args.meal_model_dir)
+    path = meals.save_bundle(os.path.join(args.out, "meals"))
+    start = time.perf_counter()
+    MealPredictor(model_dir=path)
+    print(f"✓ Meal bundle written to {path} (loads in {time.perf_counter() - start:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Process-wide registry of loaded models.
+
+Each artifact (a meal model directory or bundle, a workout model file or
+bundle) is loaded once per process and the same instance is handed to every
+caller, from any thread. Loading also runs one synthetic prediction, so the
+first real request does not pay for lazy initialisation, and records how
+long the load took and how much resident memory it added.
+
+Usage:
+    from src.service.model_registry import get_meal_predictor, get_workout_model, registry
+
+    predictor = get_meal_predictor()      # loads on first call, shared afterwards
+    registry.stats()                      # load time, warm-up time and memory per model
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEAL_MODEL_DIR = os.path.join(PROJECT_ROOT, "src", "nutritions_model")
+DEFAULT_WORKOUT_MODEL = os.path.join(PROJECT_ROOT, "src", "planner", "workout_model.joblib")
+
+# warm-up inputs, shaped like user.json / a workout request
+SAMPLE_MEAL_USER = {
+    "age": 30, "weight": 70, "height": 175, "bmi": 22.9, "fitness_level": "beginner",
+    "goals": "weight_loss", "gender": "male", "activity_level": "moderately_active",
+}
+SAMPLE_WORKOUT_USER = {
+    "gender": "female", "age": 28, "height": 165, "weight": 60, "fitness_level": "beginner",
+    "activity_level": "lightly_active", "schedule": "morning weekdays", "nutrition": "balanced",
+}
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class ModelRegistry:
+    """Load-once, thread-safe cache of model instances keyed by name."""
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # one load at a time, so each model's memory delta is its own
+        self._load_lock = threading.Lock()
+
+    def get(self, name: str, loader: Callable[[], Any],
+            warmup: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Return the model called ``name``, calling ``loader`` (then ``warmup``) only the first time.
+
+        A loader that raises leaves nothing cached, so the next call retries.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._load_lock:
+            model = self._models.get(name)
+            if model is not None:
+                return model
+            rss = rss_bytes()
+            start = time.perf_counter()
+            model = loader()
+            loaded = time.perf_counter()
+            if warmup is not None:
+                warmup(model)
+            stats = {
+                "load_seconds": round(loaded - start, 4),
+                "warmup_seconds": round(time.perf_counter() - loaded, 4),
+                "rss_mb": round((rss_bytes() - rss) / 2**20, 2),
+                "loaded_at": time.time(),
+            }
+            with self._lock:
+                self._models[name] = model
+                self._stats[name] = stats
+            logger.info(f"Loaded {name} in {stats['load_seconds']}s (+{stats['rss_mb']} MB)")
+            return model
+
+    def loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def clear(self):
+        """Forget every model (the next ``get`` reloads)."""
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+
+
+registry = ModelRegistry()
+
+
+def get_meal_predictor(model_dir: str = DEFAULT_MEAL_MODEL_DIR, warm: bool = True, fused: bool = False):
+    """Shared MealPredictor for ``model_dir`` (a pickle directory or meal bundle).
+
+    ``fused`` scores all meals with one merged booster (a separate instance).
+    """
+    def load():
+        from src.nutritions_model.predict_meals import MealPredictor
+        # progress and errors go to the logger; missing files raise RuntimeError
+        return MealPredictor(model_dir=model_dir, fused=fused, verbose=False)
+
+    def warmup(predictor):
+        if predictor.predict_meals(SAMPLE_MEAL_USER) is None:
+            raise RuntimeError(f"Warm-up prediction failed for meal models in {model_dir}")
+
+    name = f"meals:{os.path.abspath(model_dir)}" + (":fused" if fused else "")
+    return registry.get(name, load, warmup if warm else None)
+
+
+def get_workout_model(path: str = DEFAULT_WORKOUT_MODEL, warm: bool = True):
+    """Shared WorkoutRecommendationModel for ``path`` (a joblib file or workout bundle)."""
+    def load():
+        from src.planner.workout_recommender import WorkoutRecommendationModel
+        model = WorkoutRecommendationModel()
+        model.load_model(path)
+        return model
+
+    def warmup(model):
+        model.predict_workout_plan(SAMPLE_WORKOUT_USER)
+        model.predict_workout_plan_batch([SAMPLE_WORKOUT_USER])
+
+    return registry.get(f"workout:{os.path.abspath(path)}", load, warmup if warm else None)
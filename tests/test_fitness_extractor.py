@@ -0,0 +1,258 @@
+import os
+import json
+import sys
+import random
+import pytest
+from dataclasses import asdict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src.extractions.fitness_extractor import FitnessProfile, FitnessProfileExtractor, get_extractor
+
+FRAGMENTS = [
+    "30 years old", "aged 25", "age: 40", "I'm 22 yo", "45 yrs", "0 years",
+    "weigh 180 lbs", "weight 70kg", "70 kg", "154 pounds", "bodyweight80kg", "1000 kg",
+    "5'10\"", "6 ft 2 in", "1.75 m", "1.8M", "180 cm", "height: 175 cm", "tall 170cm",
+    "1 m 80 cm", "heightall 170cm", "x180cm",
+    "male", "Female", "woman", "boy", "girl", "man", "male5", "_male",
+    "beginner", "INTERMEDIATE", "advanced",
+    "sedentary", "lightly active", "moderately active", "very active", "extra active",
+    "lose weight loss", "fat loss", "slim down", "build muscle", "muscle gain", "bulking",
+    "endurance", "cardiovascular", "stamina", "stretching", "mobility",
+    "general fitness", "overall fitness", "get fit", "get stronger", "power",
+    "average", "package", "installed", "ſtrength", "١٢ years",
+]
+SEPARATORS = [" ", ", ", ". ", "\n", "", ";", "-", "_", "'", ":"]
+
+
+def random_paragraph(rng):
+    text = "".join(rng.choice(FRAGMENTS) + rng.choice(SEPARATORS) for _ in range(rng.randint(0, 10)))
+    return text.upper() if rng.random() < 0.2 else text
+
+
+def test_scanner_matches_individual_extractors():
+    extractor = FitnessProfileExtractor()
+    assert extractor.scanner.supported
+    rng = random.Random(7)
+    for _ in range(5000):
+        text = random_paragraph(rng)
+        expected = extractor.extract_fields(text)
+        scanned = extractor.scanner.scan(text)
+        if scanned is not None:
+            assert scanned == expected, text
+        assert asdict(extractor.extract(text)) == asdict(FitnessProfile(**expected))
+
+
+def test_extract_profile():
+    text = ("I am a 30 year old male, I weigh 180 lbs and I'm 5'10\" tall. I am an intermediate lifter, "
+            "moderately active, and I want to build muscle and get stronger.")
+    profile = get_extractor().extract(text)
+    assert profile.age == 30
+    assert profile.weight == 81.6
+    assert profile.height == 177.8
+    assert profile.gender == "male"
+    assert profile.fitness_level == "intermediate"
+    assert profile.activity_level == "moderately active"
+    assert profile.goals == "muscle building,strength"
+
+
+def test_get_extractor_is_shared():
+    assert get_extractor() is get_extractor()
+
+
+def test_extract_frame_matches_extract():
+    pd = pytest.importorskip("pandas")
+    extractor = get_extractor()
+    rng = random.Random(11)
+    texts = [random_paragraph(rng) for _ in range(500)] + [None]
+    texts = [t for t in texts if t is None or t.isascii()]
+    frame = extractor.extract_frame(pd.Series(texts))
+    assert len(frame) == len(texts)
+    for (_, row), text in zip(frame.iterrows(), texts):
+        profile = extractor.extract(text or "")
+        assert (None if pd.isna(row["age"]) else int(row["age"])) == profile.age
+        for column, value in (("weight_kg", profile.weight), ("height_cm", profile.height), ("bmi", profile.bmi)):
+            assert (None if pd.isna(row[column]) else row[column]) == pytest.approx(value), (text, column)
+        for column in ("bmi_category", "gender", "fitness_level", "activity_level"):
+            assert (None if pd.isna(row[column]) else row[column]) == getattr(profile, column), (text, column)
+        assert extractor.goals_extractor.goals_from_mask(int(row["goals"])) == profile.goals
+
+
+def test_extract_corpus_writes_ordered_shards(tmp_path):
+    from src.extractions.extract_corpus import run
+
+    corpus = tmp_path / "corpus.jsonl"
+    lines = [json.dumps({"id": f"u{i}", "text": f"I am {20 + i} years old and weigh {60 + i} kg"}) for i in range(25)]
+    lines.insert(3, "{not json")
+    corpus.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    for workers in (1, 2):
+        out = tmp_path / f"out{workers}"
+        report = run(str(corpus), str(out), workers=workers, chunk_size=4, max_in_flight=2, shard_size=10)
+        assert report["records"] == 26
+        assert report["errors"] == 1
+        assert len(report["shards"]) == 3
+        rows = [json.loads(line) for shard in report["shards"] for line in open(shard, encoding="utf-8")]
+        assert rows[3] == {"id": 4, "error": "unreadable record"}
+        rows = rows[:3] + rows[4:]
+        assert [row["id"] for row in rows] == [f"u{i}" for i in range(25)]
+        assert [row["age"] for row in rows] == [20 + i for i in range(25)]
+
+
+def test_extraction_cache_tiers_and_invalidation(tmp_path, monkeypatch):
+    from src.extractions import fitness_extractor
+
+    path = str(tmp_path / "cache.sqlite3")
+    text = "I am a 30 year old male and weigh 70 kg"
+    cache = fitness_extractor.ExtractionCache(maxsize=1, path=path)
+    first = cache.extract(text)
+    first.medical_conditions.append("asthma")
+    assert cache.extract(text + "\n") == get_extractor().extract(text)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    cache.extract("aged 40")
+    assert cache.stats()["memory_entries"] == 1
+    cache.close()
+
+    reopened = fitness_extractor.ExtractionCache(path=path)
+    assert reopened.extract(text).age == 30
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
+
+    monkeypatch.setattr(fitness_extractor, "rules_fingerprint", lambda extractor: "changed")
+    changed = fitness_extractor.ExtractionCache(path=path)
+    changed.extract(text)
+    assert changed.stats()["misses"] == 1
+    changed.close()
+    monkeypatch.undo()
+
+    limits = fitness_extractor.ExtractionLimits(window_chars=50, window_overlap=10, time_budget=0)
+    limited = fitness_extractor.FitnessProfileExtractor(limits)
+    assert fitness_extractor.rules_fingerprint(limited) != fitness_extractor.rules_fingerprint(get_extractor())
+    # the budget runs out after the first window: returned, but never cached
+    long_text = "I like to run. " * 10 + text
+    partial = fitness_extractor.ExtractionCache(limited, path=str(tmp_path / "limited.sqlite3"))
+    assert partial.extract(long_text).age is None
+    partial.extract(long_text)
+    assert partial.stats()["misses"] == 2 and partial.stats()["memory_entries"] == 0
+    partial.close()
+
+
+def test_profile_store_appends_and_indexes(tmp_path):
+    from src.extractions.fitness_extractor import extract_fitness_profile
+    from src.extractions.profile_store import open_profile_store
+
+    legacy = tmp_path / "fitness_profiles.json"
+    legacy.write_text(json.dumps([{"age": 50}]), encoding="utf-8")
+    first = extract_fitness_profile("aged 25", str(legacy), session_id="s1")
+    extract_fitness_profile("aged 35", str(legacy), user_id="u1", session_id="s2")
+    extract_fitness_profile("aged 45", str(legacy), session_id="s1")
+
+    store = open_profile_store(str(legacy))
+    assert store.path.endswith("fitness_profiles.sqlite3")
+    assert json.loads(legacy.read_text(encoding="utf-8")) == [{"age": 50}]
+    assert len(store) == 4
+    assert [p["age"] for p in store] == [50, 25, 35, 45]
+    assert store.latest()["age"] == 45
+    assert store.latest(session_id="s1")["age"] == 45
+    assert store.latest(user_id="u1")["age"] == 35
+    assert [p["age"] for p in store.history(session_id="s1")] == [25, 45]
+    assert store.get(2) == first
+    assert store.latest(user_id="nobody") is None
+
+
+def test_profile_store_imports_legacy_json_into_existing_store(tmp_path):
+    import threading
+    from src.extractions import profile_store
+    from src.extractions.profile_store import open_profile_store
+
+    # a store created before the JSON history was ever imported
+    open_profile_store(str(tmp_path / "fitness_profile.sqlite3")).append({"age": 20})
+    profile_store._stores.clear()
+    legacy = tmp_path / "fitness_profile.json"
+    legacy.write_text(json.dumps([{"age": 50}, {"age": 51}]), encoding="utf-8")
+    store = open_profile_store(str(legacy))
+    profile_store._stores.clear()
+    assert open_profile_store(str(legacy)) is not store
+    store = open_profile_store(str(legacy))
+    assert sorted(p["age"] for p in store) == [20, 50, 51]
+
+    # reads and appends from many threads share one connection
+    errors = []
+
+    def work(i):
+        try:
+            for j in range(20):
+                store.append({"age": i * 100 + j}, session_id=str(i))
+                assert store.latest(session_id=str(i))["age"] == i * 100 + j
+                assert len(list(store.history(session_id=str(i)))) == j + 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(store) == 3 + 8 * 20
+
+
+def test_profile_batch_round_trips():
+    pd = pytest.importorskip("pandas")
+    from src.extractions.fitness_extractor import ProfileBatch, profile_record
+
+    extractor = get_extractor()
+    rng = random.Random(5)
+    texts = [t for t in (random_paragraph(rng) for _ in range(500)) if t.isascii()]
+    profiles = extractor.extract_batch(texts)
+    assert not hasattr(profiles[0], "__dict__")
+
+    batch = extractor.extract_profile_batch(texts)
+    assert list(batch) == profiles
+    assert batch.to_dicts() == [profile_record(p) for p in profiles]
+    assert list(ProfileBatch.from_dicts(batch.to_dicts())) == profiles
+    unknown = dict(batch.to_dicts()[0], activity_level="couch_potato")
+    with pytest.raises(ValueError, match="activity_level 'couch_potato'"):
+        ProfileBatch.from_dicts([unknown])
+
+    frame = extractor.extract_frame(pd.Series(texts))
+    pd.testing.assert_frame_equal(batch.to_frame(), frame, check_dtype=False)
+    assert list(ProfileBatch.from_frame(frame)) == profiles
+
+
+def test_benchmark_corpus_is_seeded_and_scored():
+    from benchmarks.paragraphs import generate_paragraphs
+    from benchmarks.bench_extraction import compare, run
+
+    assert generate_paragraphs(50, seed=3) == generate_paragraphs(50, seed=3)
+    assert generate_paragraphs(50, seed=3) != generate_paragraphs(50, seed=4)
+    report = run(n=300, seed=1, repeat=1)
+    assert report["accuracy"]["age"] == 1.0
+    assert set(report["extractor_us_per_paragraph"]) == set(report["accuracy"])
+    assert compare(report, report) == []
+    worse = json.loads(json.dumps(report))
+    worse["accuracy"]["goals"] -= 0.1
+    assert compare(worse, report) == [f"accuracy[goals] {report['accuracy']['goals']} -> {worse['accuracy']['goals']}"]
+
+
+def test_long_inputs_are_windowed_truncated_and_linear():
+    import time
+    from src.extractions.fitness_extractor import ExtractionLimits
+
+    filler = "nothing to see here. " * 5000
+    text = "I am 30 years old. " + filler + " I weigh 70 kg and want to build muscle. " + filler + " beginner"
+    windowed = FitnessProfileExtractor(ExtractionLimits(window_chars=10_000, window_overlap=100))
+    profile = windowed.extract(text)
+    assert (profile.age, profile.weight, profile.goals, profile.fitness_level) == (30, 70.0, "muscle building", "beginner")
+
+    truncated = FitnessProfileExtractor(ExtractionLimits(max_chars=len(filler)))
+    assert truncated.extract(text).weight is None
+
+    budgeted = FitnessProfileExtractor(ExtractionLimits(window_chars=10_000, time_budget=0))
+    assert budgeted.extract(text).age == 30 and budgeted.extract(text).weight is None
+
+    start = time.perf_counter()
+    for blob in ("1" * 100_000, "5 " + " " * 100_000, "1'" * 50_000):
+        get_extractor().extract_fields(blob)
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,112 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from benchmarks.bench_models import meal_profiles
+
+MODEL_DIR = os.path.join(PROJECT_ROOT, "src", "nutritions_model")
+
+
+@pytest.fixture(scope="module")
+def meals():
+    pytest.importorskip("xgboost")
+    from src.nutritions_model.predict_meals import MealPredictor
+
+    return MealPredictor(model_dir=MODEL_DIR, verbose=False)
+
+
+def test_fused_meal_inference_ranks_like_a_stable_sort(meals):
+    probs = np.array([0.2, 0.3, 0.3, 0.1, 0.1], dtype=np.float32)
+    assert meals.top_k(probs, 2).tolist() == [1, 2]
+    assert meals.top_k(probs, 4).tolist() == [1, 2, 0, 3]
+    assert meals.top_k(probs, 9).tolist() == [1, 2, 0, 3, 4]
+
+    user = {"age": 30, "weight": 80, "height": 180, "bmi": 24.7, "fitness_level": "beginner",
+            "goals": "weight_loss", "gender": "male", "activity_level": "sedentary"}
+    plan = meals.predict_meals(user, top_alternatives=2)
+    X = meals.preprocess_user_data(user)
+    for meal in plan["meal_plan"]:
+        model = meals.models[meal["meal"]]
+        ranked = meals.get_prediction_probabilities(X, meal["meal"])
+        assert meal["recommended"] == meals.food_encoders[f"{meal['meal']}_food"].inverse_transform(model.predict(X))[0]
+        assert [meal["recommended"]] + [alt["dish"] for alt in meal["alternatives"]] == [d for d, _ in ranked[:3]]
+        assert meal["main_confidence"] == f"{ranked[0][1]:.2%}"
+
+
+def test_batch_meal_plans_match_single_users(meals, tmp_path):
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+
+    users = meal_profiles(30, seed=2)
+    users[4]["gender"] = "robot"
+    frame = pd.DataFrame(users)
+    frame.insert(0, "user_id", [f"u{i}" for i in range(len(users))])
+
+    plans = meals.predict_meals_batch(frame, top_alternatives=2)
+    for user, (_, row) in zip(users, plans.iterrows()):
+        for meal in meals.predict_meals(user, top_alternatives=2)["meal_plan"]:
+            name = meal["meal"]
+            assert row[f"{name}_recommended"] == meal["recommended"]
+            assert f"{row[f'{name}_confidence']:.2%}" == meal["main_confidence"]
+            assert [row[f"{name}_alternative_{i}"] for i in (1, 2)] == [alt["dish"] for alt in meal["alternatives"]]
+
+    frame.to_json(tmp_path / "users.jsonl", orient="records", lines=True)
+    assert meals.plan_meals_file(tmp_path / "users.jsonl", tmp_path / "plans.parquet", chunk_size=7,
+                                 top_alternatives=2) == 30
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "plans.parquet"), plans.reset_index(drop=True))
+
+
+def test_feature_vectorizer_matches_encoders_and_scaler(meals):
+    import pandas as pd
+
+    users = meal_profiles(20, seed=4)
+    users[0]["goals"] = "sleep more"
+    users[1] = dict(reversed(list(users[1].items())))
+
+    # reference: the sklearn transforms on a DataFrame in model column order
+    frame = pd.DataFrame(users)
+    for col in meals.categorical_cols:
+        known = frame[col].where(frame[col].isin(meals.encoders[col].classes_), "unknown")
+        frame[col] = meals.encoders[col].transform(known)
+    frame[["age", "weight", "height", "bmi"]] = meals.scaler.transform(frame[["age", "weight", "height", "bmi"]])
+    expected = frame[meals.feature_names].to_numpy(dtype=float)
+
+    assert np.array_equal(meals.preprocess_batch(pd.DataFrame(users)), expected)
+    rows = np.vstack([meals.preprocess_user_data(user) for user in users])
+    assert np.array_equal(rows, expected)
+    assert meals.predict_meals(users[1]) == meals.predict_meals(dict(reversed(list(users[1].items()))))
+
+    # an encoder without an "unknown" class only fails when a value needs it
+    from sklearn.preprocessing import LabelEncoder
+    from src.nutritions_model.feature_vectorizer import FeatureVectorizer
+    encoders = dict(meals.encoders, gender=LabelEncoder().fit(["female", "male", "other"]))
+    strict = FeatureVectorizer(meals.feature_names, encoders, meals.scaler, meals.categorical_cols)
+    assert np.array_equal(strict.transform(users[2:]), expected[2:])
+    with pytest.raises(ValueError, match="no 'unknown' class"):
+        strict.transform(dict(users[2], gender="x"))
+
+
+def test_native_boosters_match_predict_proba(meals):
+    from src.nutritions_model.booster_inference import BoosterPredictor
+
+    X = meals.vectorizer.transform(meal_profiles(300, seed=5))
+    expected = {meal_type: model.predict_proba(X) for meal_type, model in meals.models.items()}
+
+    native = meals.boosters.predict_proba(X)
+    single_thread = meals.boosters.predict_proba(X, nthread=1)
+    fused = BoosterPredictor(meals.models, fused=True, nthread=1).predict_proba(X)
+    for meal_type, probabilities in expected.items():
+        assert np.array_equal(native[meal_type], probabilities)
+        assert np.array_equal(single_thread[meal_type], probabilities)
+        # fused: same margins, NumPy softmax within a float32 ulp
+        assert np.allclose(fused[meal_type], probabilities, rtol=0, atol=1e-6)
+        assert np.array_equal(np.argmax(fused[meal_type], axis=1), np.argmax(probabilities, axis=1))
+
+    # booster copies per thread count are bounded
+    for nthread in range(1, 10):
+        meals.boosters.predict_proba(X[:1], nthread=nthread)
+    assert len(meals.boosters._boosters) == meals.boosters.max_thread_configs
@@ -0,0 +1,188 @@
+import os
+import sys
+import asyncio
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src.service.batching import MicroBatcher
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    seen = []
+
+    def handler(items):
+        seen.append(list(items))
+        return [ValueError("odd") if item % 2 else item * 10 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)), return_exceptions=True)
+        await batcher.close()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert [len(batch) for batch in seen] == [4, 4, 2]
+    assert [r for r in results if not isinstance(r, Exception)] == [0, 20, 40, 60, 80]
+    assert all(isinstance(r, ValueError) for r in results[1::2])
+    assert stats["batches"] == 3 and stats["items"] == 10
+
+
+def test_http_service_extracts_and_validates():
+    pytest.importorskip("aiohttp")
+    from aiohttp.test_utils import TestClient, TestServer
+    from src.service.http_service import ScoringService
+
+    async def scenario():
+        service = ScoringService(meal_model_dir=None, workout_model_path=None, max_wait_ms=20)
+        async with TestClient(TestServer(service.create_app())) as client:
+            texts = [f"I am {20 + i} years old" for i in range(8)]
+            responses = await asyncio.gather(*(client.post("/extract", json={"text": t}) for t in texts))
+            ages = [(await r.json())["profile"]["age"] for r in responses]
+            many = await (await client.post("/extract", json={"texts": texts[:2]})).json()
+            bad = await client.post("/extract", json={"text": 5})
+            missing = await client.post("/meals", json={"profile": {}})
+            health = await (await client.get("/health")).json()
+        return ages, many, bad.status, missing.status, health
+
+    ages, many, bad, missing, health = asyncio.run(scenario())
+    assert ages == [20 + i for i in range(8)]
+    assert [p["age"] for p in many["profiles"]] == [20, 21]
+    assert (bad, missing) == (400, 503)
+    assert health["batchers"]["extract"]["items"] == 10
+    assert health["batchers"]["extract"]["batches"] < 10
+
+
+def test_meal_batches_are_scored_together_and_isolate_bad_rows(monkeypatch):
+    pytest.importorskip("xgboost")
+    from benchmarks.bench_models import meal_profiles
+    from src.service.http_service import RequestError, ScoringService
+    from src.service.model_registry import get_meal_predictor
+
+    service = ScoringService(workout_model_path=None)
+    service.meal_predictor = predictor = get_meal_predictor()
+    profiles = meal_profiles(6, seed=2)
+    expected = [predictor.predict_meals(profile) for profile in profiles]
+
+    calls = []
+    score = predictor.boosters.predict_proba
+    monkeypatch.setattr(predictor.boosters, "predict_proba", lambda X, *a: calls.append(len(X)) or score(X, *a))
+    assert service.meal_plans(profiles) == expected
+    assert calls == [6]
+
+    profiles[2] = dict(profiles[2], weight="heavy")
+    results = service.meal_plans(profiles)
+    assert isinstance(results[2], RequestError)
+    assert results[:2] + results[3:] == expected[:2] + expected[3:]
+
+
+
+def test_invalid_workout_profile_fails_alone_in_its_batch():
+    pytest.importorskip("aiohttp")
+    pytest.importorskip("joblib")
+    from aiohttp.test_utils import TestClient, TestServer
+    from src.service.http_service import ScoringService
+    from src.service.model_registry import SAMPLE_WORKOUT_USER
+
+    valid = dict(SAMPLE_WORKOUT_USER)
+    invalid = {k: v for k, v in valid.items() if k != "schedule"}
+
+    async def scenario():
+        service = ScoringService(meal_model_dir=None, max_wait_ms=50)
+        async with TestClient(TestServer(service.create_app())) as client:
+            responses = await asyncio.gather(*(client.post("/workouts", json={"profile": p}) for p in (valid, invalid)))
+            bodies = [await r.json() for r in responses]
+            health = await (await client.get("/health")).json()
+        return [r.status for r in responses], bodies, health
+
+    statuses, (plan, error), health = asyncio.run(scenario())
+    assert statuses == [200, 400]
+    assert plan["workout_plan"]["goal"] and "schedule" in error["error"]
+    assert health["batchers"]["workouts"]["batches"] == 1
+
+
+def test_responses_refuse_non_json_numbers():
+    pytest.importorskip("aiohttp")
+    from src.service.http_service import dumps
+
+    assert dumps({"score": 0.5}) == '{"score": 0.5}'
+    with pytest.raises(ValueError):
+        dumps({"score": float("nan")})
+
+def test_model_bundles_round_trip(tmp_path):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("joblib")
+    import numpy as np
+    from src.service.model_bundle import BundleError, ModelBundle
+    from src.planner.workout_recommender import WorkoutRecommendationModel
+
+    model = WorkoutRecommendationModel()
+    model.load_model(os.path.join(PROJECT_ROOT, "src", "planner", "workout_model.joblib"))
+    path = model.save_bundle(tmp_path / "workout")
+    bundled = WorkoutRecommendationModel()
+    bundled.load_model(path)
+    assert isinstance(bundled.compiled.value.base, np.memmap)
+    users = model.create_synthetic_data(n_samples=50).drop(columns=["goal"])
+    assert bundled.predict_proba_batch(users).equals(model.predict_proba_batch(users))
+
+    with open(os.path.join(path, "arrays", "forest.threshold.npy"), "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"\x01")
+    with pytest.raises(BundleError):
+        ModelBundle(path)
+
+    pytest.importorskip("xgboost")
+    from src.nutritions_model.predict_meals import MealPredictor
+
+    meals = MealPredictor(model_dir=os.path.join(PROJECT_ROOT, "src", "nutritions_model"), verbose=False)
+    bundled_meals = MealPredictor(model_dir=meals.save_bundle(tmp_path / "meals"), verbose=False)
+    user = {"age": 30, "weight": 80, "height": 180, "bmi": 24.7, "fitness_level": "beginner",
+            "goals": "weight_loss", "gender": "female", "activity_level": "sedentary"}
+    assert bundled_meals.predict_meals(user) == meals.predict_meals(user)
+
+
+def test_model_registry_loads_once_across_threads():
+    import threading
+    import time
+    from src.service.model_registry import ModelRegistry, get_workout_model, registry
+
+    models = ModelRegistry()
+    calls, warmed = [], []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(models.get("m", loader, warmed.append)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and len(warmed) == 1 and len({id(m) for m in results}) == 1
+    assert set(models.stats()["m"]) >= {"load_seconds", "warmup_seconds", "rss_mb"}
+
+    def broken():
+        raise OSError("missing")
+
+    with pytest.raises(OSError):
+        models.get("bad", broken)
+    assert not models.loaded("bad")
+
+    pytest.importorskip("joblib")
+    workout = get_workout_model()
+    assert get_workout_model() is workout
+    assert any(name.startswith("workout:") for name in registry.stats())
+
+
+def test_missing_meal_models_raise_quietly(tmp_path, capsys):
+    pytest.importorskip("xgboost")
+    from src.service.model_registry import get_meal_predictor, registry
+
+    with pytest.raises(RuntimeError, match="Could not find model files"):
+        get_meal_predictor(str(tmp_path))
+    assert capsys.readouterr().out == ""
+    assert not registry.loaded(f"meals:{tmp_path}")
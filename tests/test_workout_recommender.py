@@ -0,0 +1,232 @@
+import os
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "src", "planner", "workout_model.joblib")
+
+
+@pytest.fixture(scope="module")
+def model():
+    pytest.importorskip("sklearn")
+    pytest.importorskip("joblib")
+    from src.planner.workout_recommender import WorkoutRecommendationModel
+
+    model = WorkoutRecommendationModel()
+    model.load_model(MODEL_PATH)
+    return model
+
+
+def test_batch_predictions_match_single_rows(model):
+    users = model.create_synthetic_data(n_samples=60).drop(columns=["goal"])
+    records = users.to_dict("records")
+    records[3] = {**records[3], "schedule": "never"}
+    del records[5]["bmi"]
+
+    plans = model.predict_workout_plan_batch(records)
+    assert plans == [model.predict_workout_plan(user) for user in records]
+
+    probs = model.predict_proba_batch(users)
+    assert probs.index.equals(users.index)
+    for i in (0, 17, 59):
+        assert probs.iloc[i].to_dict() == pytest.approx(model.predict_proba(records[i]))
+
+
+def test_batch_rejects_incomplete_profiles_like_single_rows(model):
+    valid = model.create_synthetic_data(n_samples=2).drop(columns=["goal"]).to_dict("records")[0]
+    for field in ("schedule", "fitness_level"):
+        incomplete = {k: v for k, v in valid.items() if k != field}
+        with pytest.raises(ValueError, match=f"Missing features: \\['{field}'\\]"):
+            model.predict_workout_plan(incomplete)
+        with pytest.raises(ValueError, match=f"row 1: \\['{field}'\\]"):
+            model.predict_workout_plan_batch([valid, incomplete])
+        with pytest.raises(ValueError, match="Missing features"):
+            model.predict_proba_batch([valid, incomplete])
+    assert model.missing_features({k: v for k, v in valid.items() if k != "bmi"}) == []
+
+
+def test_encoding_leaves_encoders_untouched(model):
+    classes = {col: list(le.classes_) for col, le in model.label_encoders.items()}
+    users = model.create_synthetic_data(n_samples=20)
+    users.loc[::3, "schedule"] = "never"
+    users.loc[::4, "goal"] = "yoga"
+
+    X, y = model.preprocess_data(users, impute=False)
+    assert {col: list(le.classes_) for col, le in model.label_encoders.items()} == classes
+    unseen = len(classes["schedule"])
+    assert (X["schedule"].iloc[::3] == unseen).all()
+    assert (y[::4] == len(classes["goal"])).all()
+
+
+def test_compiled_forest_is_bit_exact(model, tmp_path):
+    import numpy as np
+    import pandas as pd
+    from src.planner.compiled_forest import CompiledForest
+
+    users = model.create_synthetic_data(n_samples=500).drop(columns=["goal"])
+    X, _ = model.preprocess_data(users, impute=False)
+    X = X.astype(float)
+    X.iloc[::7, 3] = np.nan
+    # rows sitting exactly on (and one ulp either side of) the folded thresholds
+    forest = model.compiled
+    splits = np.flatnonzero(np.isfinite(forest.threshold))[:300]
+    edges = X.iloc[np.arange(len(splits)) % len(X)].to_numpy()
+    for k, node in enumerate(splits):
+        t = forest.threshold[node]
+        edges[k, forest.feature[node]] = (t, np.nextafter(t, np.inf), np.nextafter(t, -np.inf))[k % 3]
+    X = pd.concat([X, pd.DataFrame(edges, columns=X.columns)], ignore_index=True)
+
+    expected = model.model.predict_proba(X)
+    assert np.array_equal(forest.predict_proba(X), expected)
+    assert np.array_equal(forest.predict_proba(X.iloc[3].to_numpy())[0], expected[3])
+
+    forest.save(tmp_path / "forest.npz")
+    assert np.array_equal(CompiledForest.load(tmp_path / "forest.npz").predict_proba(X), expected)
+
+
+def test_halving_search_reuses_cached_folds(tmp_path, monkeypatch):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("joblib")
+    from src.planner import workout_recommender
+    from src.planner.workout_recommender import WorkoutRecommendationModel
+
+    monkeypatch.setattr(workout_recommender, "PARAM_GRID", {
+        "classifier__n_estimators": [10, 20], "classifier__max_depth": [3, 5], "classifier__max_features": ["sqrt"],
+    })
+    data = WorkoutRecommendationModel().create_synthetic_data(n_samples=300)
+    first = WorkoutRecommendationModel()
+    results = first.train_model(data, search="halving", n_candidates=3, cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    second = WorkoutRecommendationModel()
+    second.preprocess_data = None  # a cache hit must not preprocess again
+    assert second.train_model(data, search="halving", n_candidates=3, cache_dir=tmp_path) == results
+    assert second.compiled is not None and results["best_params"]
+
+
+def test_synthetic_data_chunks_and_shards(tmp_path):
+    pytest.importorskip("sklearn")
+    import pandas as pd
+    from src.planner.workout_recommender import WorkoutRecommendationModel
+
+    model = WorkoutRecommendationModel()
+    assert model.create_synthetic_data(500).equals(model.create_synthetic_data(500))
+
+    chunks = list(model.iter_synthetic_data(2500, chunk_size=1000, seed=7))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    data = pd.concat(chunks, ignore_index=True)
+    older = data[(data.bmi > 25) & (data.age > 30)]
+    assert set(older.goal) == {"weight_loss", "cardio"}
+
+    pytest.importorskip("pyarrow")
+    paths = model.write_synthetic_parquet(tmp_path, 2500, chunk_size=1000, seed=7)
+    assert len(paths) == 3
+    shards = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    pd.testing.assert_frame_equal(shards, data, check_dtype=False)
+
+
+def test_decision_table_serves_grid_and_falls_back(model):
+    import numpy as np
+
+    grid = {"age": (24.5, 34.5, 1.0), "height": (160.0, 190.0, 10.0), "weight": (50.0, 90.0, 10.0)}
+    try:
+        table = model.build_decision_table(grid=grid, min_margin=0.0)
+        users = model.create_synthetic_data(n_samples=400, seed=3).drop(columns=["goal"])
+        X, _ = model.preprocess_data(users, impute=False)
+        X = X[model.compiled.feature_names].to_numpy(dtype=float)
+
+        goals = table.lookup(X)
+        assert [table.lookup_row(row) for row in X] == goals.tolist()
+        served = goals >= 0
+        on_grid = ((X[:, 0] >= 24.5) & (X[:, 0] < 34.5) & (X[:, 1] >= 160) & (X[:, 1] < 190)
+                   & (X[:, 2] >= 50) & (X[:, 2] < 90))
+        assert served.any() and (served == on_grid).all()
+
+        # a served row gets the forest's answer for its cell centre
+        centre = X[served][0].copy()
+        centre[:3] = [np.floor(centre[0] - 24.5) + 25, np.floor(centre[1] / 10) * 10 + 5, np.floor(centre[2] / 10) * 10 + 5]
+        centre[3] = centre[2] / (centre[1] / 100) ** 2
+        assert goals[served][0] == model.compiled.predict(centre)[0]
+
+        records = users.to_dict("records")
+        assert model.predict_workout_plan_batch(records) == [model.predict_workout_plan(u) for u in records]
+        assert table.report["rows"] == 20000 and table.stats()["hits"] > 0
+    finally:
+        model.decision_table = None
+
+
+def test_compressed_model_is_smaller_and_round_trips(model, tmp_path):
+    import numpy as np
+    from src.planner.workout_recommender import WorkoutRecommendationModel
+
+    users = model.create_synthetic_data(n_samples=300, seed=5)
+    X, _ = model.preprocess_data(users, impute=False)
+    X = X[model.compiled.feature_names].to_numpy(dtype=float)
+    assert np.array_equal(model.compiled.compress().predict_proba(X), model.compiled.predict_proba(X))
+
+    small = WorkoutRecommendationModel()
+    small.load_model(MODEL_PATH)
+    report = small.compress_model(n_trees=10, max_depth=4, data=users)
+    assert report["size_ratio"] > 5 and report["after"]["n_nodes"] < report["before"]["n_nodes"]
+    assert small.compiled.depth == 4 and small.compiled.value.dtype == np.uint8
+    assert np.allclose(small.compiled.predict_proba(X).sum(axis=1), 1, atol=0.01)
+
+    records = users.drop(columns=["goal"]).to_dict("records")
+    plans = small.predict_workout_plan_batch(records)
+    assert plans == [small.predict_workout_plan(user) for user in records]
+    small.save_model(tmp_path / "small.joblib")
+    reloaded = WorkoutRecommendationModel()
+    reloaded.load_model(tmp_path / "small.joblib")
+    assert reloaded.predict_workout_plan_batch(records) == plans
+
+
+def test_incremental_training_resumes_from_checkpoint(tmp_path, monkeypatch):
+    pytest.importorskip("joblib")
+    from src.planner.workout_recommender import WorkoutRecommendationModel
+
+    # sorted by goal, so most chunks lack some classes
+    data = WorkoutRecommendationModel().create_synthetic_data(n_samples=2000, seed=9).sort_values("goal")
+    users = data.drop(columns=["goal"]).head(50).to_dict("records")
+
+    full = WorkoutRecommendationModel()
+    summary = full.train_incremental(data, chunk_size=400, trees_per_chunk=2)
+    assert summary["chunks"] == 5 and summary["n_trees"] == 10
+    assert len(full.compiled.classes) == data["goal"].nunique()
+
+    # stop after three chunks, then pick up from the checkpoint
+    interrupted = WorkoutRecommendationModel()
+    chunks = interrupted.iter_training_chunks
+
+    def stop_after_three(source, chunk_size, columns=None):
+        for i, chunk in enumerate(chunks(source, chunk_size, columns)):
+            if columns is None and i == 3:
+                raise KeyboardInterrupt
+            yield chunk
+
+    monkeypatch.setattr(interrupted, "iter_training_chunks", stop_after_three)
+    with pytest.raises(KeyboardInterrupt):
+        interrupted.train_incremental(data, chunk_size=400, trees_per_chunk=2, checkpoint_dir=tmp_path)
+
+    resumed = WorkoutRecommendationModel()
+    assert resumed.train_incremental(data, chunk_size=400, trees_per_chunk=2, checkpoint_dir=tmp_path) == summary
+    assert resumed.predict_workout_plan_batch(users) == full.predict_workout_plan_batch(users)
+
+
+def test_model_benchmark_reports_serving_cost():
+    import json
+    pytest.importorskip("xgboost")
+    from benchmarks.bench_models import DEFAULT_MEALS, compare, run
+
+    report = run(workout=[MODEL_PATH], meals=[DEFAULT_MEALS], n=40, batch_sizes=(1, 8), isolate=False)
+    workout = report["artifacts"]["workout:src/planner/workout_model.joblib"]
+    assert len(report["artifacts"]) == 2 and workout["agreement"] == 1.0
+    assert 0 < workout["accuracy"] <= 1 and set(workout["rows_per_second"]) == {"1", "8"}
+    assert workout["single_row"]["p50_ms"] <= workout["single_row"]["p99_ms"]
+    assert compare(report, report) == []
+    worse = json.loads(json.dumps(report))
+    worse["artifacts"]["meals:src/nutritions_model"]["rows_per_second"]["8"] /= 2
+    assert compare(worse, report) == [f"meals:src/nutritions_model: rows_per_second[8] "
+                                      f"{report['artifacts']['meals:src/nutritions_model']['rows_per_second']['8']} -> "
+                                      f"{worse['artifacts']['meals:src/nutritions_model']['rows_per_second']['8']}"]